@@ -0,0 +1,307 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Benchmark the tests/ hull scripts without rendering
+#
+#   python benchmark_tests.py [prefix] [--runs 3] [--blender blender]
+#       [--results benchmark_results.json] [--baseline benchmark_baseline.json]
+#       [--threshold 0.1] [--save-baseline] [--mesh-cache cold]
+#
+# Each script is run --runs times in a fresh "blender -b" (this file is passed to
+# blender with -P and measures one run). Every run gets its own empty mesh cache
+# directory (--mesh-cache cold) or runs without the mesh cache (--mesh-cache off) so
+# runs don't measure parts cached by earlier runs or other checkouts. The median of each measurement is saved to
+# --results and compared with --baseline - a script is a regression when its median
+# generation time or peak memory grows more than --threshold (10%).
+# Exits with 1 if there are regressions or failed runs.
+
+import os
+import sys
+import json
+import time
+import glob
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+test_path="tests"
+
+# measurements compared with the baseline - the rest are reported only
+compared_measurements=["generation_time","peak_rss_mb"]
+
+# environment variable passing --mesh-cache to the measured run
+mesh_cache_mode_variable="HULLGEN_BENCHMARK_MESH_CACHE"
+
+
+def measure_run(target_file,output_file):
+    import bpy
+
+    from bpyhullgen.hullgen import hull_maker
+    from bpyhullgen.hullgen import profile_helper
+
+    # integrate_components records operator / depsgraph / boolean counts
+    hull_maker.hull_maker.profile=True
+
+    mesh_cache_mode=os.environ.get(mesh_cache_mode_variable,"cold")
+
+    if mesh_cache_mode=="off":
+        hull_maker.hull_maker.use_mesh_cache=False
+
+    start_time=time.time()
+
+    exec(open(target_file).read(),{ "__name__": "__main__" })
+
+    generation_time=time.time()-start_time
+
+    objects=0
+    vertices=0
+    faces=0
+    booleans=0
+
+    for obj in bpy.data.objects:
+        if obj.type=="MESH":
+            objects+=1
+            vertices+=len(obj.data.vertices)
+            faces+=len(obj.data.polygons)
+
+            for modifier in obj.modifiers:
+                if modifier.type=='BOOLEAN':
+                    booleans+=1
+
+    result={
+        "generation_time": generation_time,
+        "peak_rss_mb": get_peak_rss_mb(),
+        "objects": objects,
+        "vertices": vertices,
+        "faces": faces,
+        "booleans": booleans,
+        "mesh_cache": mesh_cache_mode
+    }
+
+    if profile_helper.the_profiler.root!=None:
+        totals=profile_helper.the_profiler.root.get_totals()
+
+        for counter_name in ["operators","depsgraph_updates","booleans_kept","booleans_pruned","mesh_cache_hits"]:
+            result[counter_name]=totals.get(counter_name,0)
+
+    with open(output_file,"w") as result_file:
+        json.dump(result,result_file)
+
+def get_peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak_rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # bytes on macOS, kilobytes on linux
+    if sys.platform=="darwin":
+        return peak_rss/(1024*1024)
+
+    return peak_rss/1024
+
+# runs target_file once in blender - returns dict of measurements or None if it failed
+def run_blender(blender,target_file,mesh_cache_mode):
+    output_file="%s.benchmark.json"%os.path.splitext(os.path.basename(target_file))[0]
+
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
+    environment=dict(os.environ)
+    environment[mesh_cache_mode_variable]=mesh_cache_mode
+
+    # empty cache for every run - the default cache is shared with other sessions
+    cache_directory=tempfile.mkdtemp(prefix="hullgen_benchmark_cache_")
+    environment["HULLGEN_MESH_CACHE"]=cache_directory
+
+    try:
+        process=subprocess.run([blender,"-b","--factory-startup","-P",os.path.abspath(__file__),
+            "--","--measure",target_file,output_file],
+            env=environment,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT)
+    finally:
+        shutil.rmtree(cache_directory,ignore_errors=True)
+
+    if process.returncode!=0 or not os.path.exists(output_file):
+        print(process.stdout.decode(errors="replace"))
+        return None
+
+    with open(output_file) as result_file:
+        result=json.load(result_file)
+
+    os.remove(output_file)
+
+    return result
+
+def get_median_result(runs):
+    result={ "runs": len(runs) }
+
+    for measurement in runs[0]:
+        # same for every run (mesh_cache mode)
+        if isinstance(runs[0][measurement],str):
+            result[measurement]=runs[0][measurement]
+            continue
+
+        values=[run[measurement] for run in runs if run[measurement]!=None]
+
+        if len(values)>0:
+            result[measurement]=statistics.median(values)
+        else:
+            result[measurement]=None
+
+    return result
+
+# returns list of (script, measurement, baseline value, value) that grew more than threshold
+def compare_results(results,baseline,threshold):
+    regressions=[]
+
+    for script_name,result in results.items():
+        if script_name not in baseline:
+            continue
+
+        # results with a different mesh cache mode aren't comparable
+        if result.get("mesh_cache")!=baseline[script_name].get("mesh_cache","cold"):
+            print("%s: baseline mesh cache %s - not compared"%(script_name,baseline[script_name].get("mesh_cache","cold")))
+            continue
+
+        for measurement in compared_measurements:
+            value=result.get(measurement)
+            baseline_value=baseline[script_name].get(measurement)
+
+            if value==None or baseline_value==None or baseline_value==0:
+                continue
+
+            if value>baseline_value*(1+threshold):
+                regressions.append((script_name,measurement,baseline_value,value))
+
+    return regressions
+
+def run_benchmarks(arguments):
+    target_files=sorted(glob.glob(os.path.join(test_path,arguments.prefix+"*.py")))
+
+    results={}
+    failed=[]
+
+    for target_file in target_files:
+        script_name=os.path.basename(target_file)
+
+        runs=[]
+
+        for run_index in range(arguments.runs):
+            print("Benchmark: %s run %d/%d"%(script_name,run_index+1,arguments.runs))
+
+            result=run_blender(arguments.blender,target_file,arguments.mesh_cache)
+
+            if result==None:
+                failed.append(script_name)
+                break
+
+            runs.append(result)
+
+        if len(runs)==arguments.runs:
+            results[script_name]=get_median_result(runs)
+
+    with open(arguments.results,"w") as results_file:
+        json.dump(results,results_file,indent=1)
+
+    print("Saved results: %s"%arguments.results)
+
+    baseline={}
+
+    if os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as baseline_file:
+            baseline=json.load(baseline_file)
+
+    for script_name,result in results.items():
+        baseline_time=baseline.get(script_name,{}).get("generation_time")
+
+        if baseline_time==None:
+            baseline_text="no baseline"
+        else:
+            baseline_text="baseline %.2fs %+.1f%%"%(baseline_time,(result["generation_time"]/baseline_time-1)*100)
+
+        print("%-36s %8.2fs %8s MB %6d objects %8d vertices %5d booleans mesh cache %s (%s)"%(
+            script_name,
+            result["generation_time"],
+            "%.0f"%result["peak_rss_mb"] if result["peak_rss_mb"]!=None else "-",
+            result["objects"],
+            result["vertices"],
+            result["booleans"],
+            result["mesh_cache"],
+            baseline_text))
+
+    regressions=compare_results(results,baseline,arguments.threshold)
+
+    for script_name,measurement,baseline_value,value in regressions:
+        print("REGRESSION %s %s: %.2f -> %.2f (%+.1f%%)"%(
+            script_name,
+            measurement,
+            baseline_value,
+            value,
+            (value/baseline_value-1)*100))
+
+    for script_name in failed:
+        print("FAILED %s"%script_name)
+
+    if arguments.save_baseline:
+        baseline.update(results)
+
+        with open(arguments.baseline,"w") as baseline_file:
+            json.dump(baseline,baseline_file,indent=1)
+
+        print("Saved baseline: %s"%arguments.baseline)
+
+    if len(regressions)>0 or len(failed)>0:
+        return 1
+
+    return 0
+
+def main():
+    # blender passes its own arguments - ours come after "--"
+    if "--" in sys.argv:
+        arguments=sys.argv[sys.argv.index("--")+1:]
+    else:
+        arguments=sys.argv[1:]
+
+    if len(arguments)==3 and arguments[0]=="--measure":
+        measure_run(arguments[1],arguments[2])
+        return 0
+
+    parser=argparse.ArgumentParser(description="Benchmark the tests/ hull scripts")
+    parser.add_argument("prefix",nargs="?",default="",help="only scripts starting with prefix")
+    parser.add_argument("--runs",type=int,default=3)
+    parser.add_argument("--blender",default="blender")
+    parser.add_argument("--results",default="benchmark_results.json")
+    parser.add_argument("--baseline",default="benchmark_baseline.json")
+    parser.add_argument("--threshold",type=float,default=0.1,help="allowed growth before a regression is flagged")
+    parser.add_argument("--save-baseline",action="store_true",help="store these results as the new baseline")
+    parser.add_argument("--mesh-cache",choices=["cold","off"],default="cold",help="empty mesh cache for each run or no mesh cache")
+
+    return run_benchmarks(parser.parse_args(arguments))
+
+
+if __name__=="__main__":
+    exit_code=main()
+
+    # blender ignores the exit code of -P scripts unless we exit ourselves
+    if exit_code!=0:
+        sys.exit(exit_code)
@@ -999,7 +999,8 @@ def update_properties_from_hull(the_hull,context):
 
 def update_hull_from_properties(the_hull,context):
 
-	the_hull.clear_all()
+	# objects of the current build are kept until regenerate knows what changed
+	the_hull.begin_update()
 
 	hull_properties = context.scene.hull_properties 
 
@@ -1115,9 +1116,7 @@ class LIST_OT_GenHull(Operator):
 
 		update_hull_from_properties(the_hull,context)
 
-		the_hull.make_hull_object()
-
-		time_string = the_hull.integrate_components()
+		time_string = the_hull.regenerate()
 
 		bpy.context.workspace.status_text_set("Generate Hull - %s"%time_string)	
 		
@@ -0,0 +1,167 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Bezier curve sampling with NumPy - no bpy.
+#
+# Samples the curves built by curve_helper.Curve_Helper.define_curve the same way
+# blender converts a bezier curve to a mesh: resolution points per segment and the
+# last point of the curve. A curve with extrude (curve_height) becomes a ribbon
+# from -extrude to +extrude along Z, rotated around the tangent by the tilt (curve_twist).
+#
+# coordinates is a list of [ point, handle_left, handle_right ] like Curve_Helper.coordinates
+
+import math
+from math import radians
+import numpy as np
+
+
+# Control points for the 3 point curve used for chines and longitudals
+# returns list of [ point, handle_left, handle_right ] - see Curve_Helper.define_curve
+def define_curve_coordinates(length,width,curve_angle=35,asymmetry=[0,0]):
+
+	coordinates=[]
+
+	handle_width=length/6
+	half_length=length/2
+
+	# Curve handle = point, handle_left of point, handle right of point
+
+	# Left handle
+	asymetric_width=-(asymmetry[0]*width)
+	x=handle_width*math.cos(radians(curve_angle*(1-asymmetry[0])))
+	y=handle_width*math.sin(radians(curve_angle*(1-asymmetry[0])))
+
+	coordinates.append([	(-half_length, asymetric_width, 0), 	
+							(-half_length-x, asymetric_width+y, 0),	
+							(-half_length+x, asymetric_width-y, 0)
+						])
+
+	# Center handle
+	coordinates.append([	
+							(0,-width, 0),
+							(-handle_width, -width, 0),  
+							(handle_width,-width, 0)
+						]) 
+
+	asymetric_width=-(asymmetry[1]*width)
+	x=handle_width*math.cos(radians(curve_angle*(1-asymmetry[1])))
+	y=handle_width*math.sin(radians(curve_angle*(1-asymmetry[1])))
+
+	# Right handle
+	coordinates.append([	
+							(half_length, asymetric_width, 0),  
+							(half_length-x, asymetric_width-y, 0),
+							(half_length+x, asymetric_width+y, 0)
+						])
+
+	return coordinates
+
+
+# returns (points (N,3), tangents (N,3), tilts (N,)) - tilts in radians
+def sample_bezier(coordinates,resolution,tilts=None):
+
+	control=np.asarray(coordinates,dtype=np.float64)
+
+	segment_count=len(control)-1
+
+	if tilts is None:
+		tilts=[0]*len(control)
+
+	tilts=np.asarray(tilts,dtype=np.float64)
+
+	# t for every sample of a segment - the last point is added at the end
+	t=np.arange(resolution,dtype=np.float64)/resolution
+	t=t[:,None]
+	s=1-t
+
+	points=[]
+	tangents=[]
+	sample_tilts=[]
+
+	for segment in range(segment_count):
+		p0=control[segment,0]
+		p1=control[segment,2]
+		p2=control[segment+1,1]
+		p3=control[segment+1,0]
+
+		points.append(s*s*s*p0+3*s*s*t*p1+3*s*t*t*p2+t*t*t*p3)
+		tangents.append(3*s*s*(p1-p0)+6*s*t*(p2-p1)+3*t*t*(p3-p2))
+
+		# linear tilt interpolation (blender default)
+		sample_tilts.append(tilts[segment]+(tilts[segment+1]-tilts[segment])*t[:,0])
+
+	points.append(control[-1:,0])
+	tangents.append((control[-1:,0]-control[-1:,1])*3)
+	sample_tilts.append(tilts[-1:])
+
+	return (np.concatenate(points),np.concatenate(tangents),np.concatenate(sample_tilts))
+
+
+# Direction the curve is extruded in at each sample - Z rotated around the tangent by tilt
+def get_extrude_directions(tangents,tilts):
+
+	length=np.linalg.norm(tangents,axis=1)
+	length[length==0]=1
+
+	axis=tangents/length[:,None]
+
+	up=np.array([0,0,1.0])
+
+	cos_tilt=np.cos(tilts)[:,None]
+	sin_tilt=np.sin(tilts)[:,None]
+
+	# Rodrigues rotation of up around axis
+	return (up*cos_tilt
+		+np.cross(axis,up)*sin_tilt
+		+axis*(axis@up)[:,None]*(1-cos_tilt))
+
+
+# returns (verts, edges, faces) for mesh.from_pydata
+# extrude=0 gives a polyline, otherwise a ribbon of quads
+def sample_curve_mesh(coordinates,resolution,extrude=0,tilts=None):
+
+	points,tangents,sample_tilts=sample_bezier(coordinates,resolution,tilts)
+
+	point_count=len(points)
+
+	if extrude==0:
+		edges=np.stack([np.arange(point_count-1),np.arange(1,point_count)],axis=1)
+		return (points,edges,np.zeros((0,4),dtype=np.int64))
+
+	if tilts is None:
+		directions=np.tile([0,0,1.0],(point_count,1))
+	else:
+		directions=get_extrude_directions(tangents,sample_tilts)
+
+	verts=np.concatenate([points-directions*extrude,points+directions*extrude])
+
+	index=np.arange(point_count-1)
+	faces=np.stack([index,index+1,index+point_count+1,index+point_count],axis=1)
+
+	return (verts,np.zeros((0,2),dtype=np.int64),faces)
+
+
+# Points (len(factors),3) at factors of the length of the polyline points (N,3) - the
+# position a FOLLOW_PATH constraint with offset_factor gives on the sampled curve
+def get_path_points(points,factors):
+
+	lengths=np.concatenate([[0],np.cumsum(np.linalg.norm(np.diff(points,axis=0),axis=1))])
+
+	distances=np.clip(np.asarray(factors,dtype=np.float64),0,1)*lengths[-1]
+
+	return np.stack([np.interp(distances,lengths,points[:,axis]) for axis in range(3)],axis=1)
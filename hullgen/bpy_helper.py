@@ -1,7 +1,9 @@
 import bpy
 import time
 import functools
+import hashlib
 import bmesh
+import numpy as np
 
 class ElapsedTimer:
 
@@ -59,6 +61,48 @@ def bmesh_recalculate_normals(obj):
 	mesh.update()
 	bm.free()
 
+# Batch vertex edits - all vertex coordinates of a mesh object as one (N,3) array
+# read and written with foreach_get / foreach_set. world_space transforms with the
+# object matrix (and its inverse when writing) once for all vertices.
+
+def get_matrix_array(obj):
+	return np.array([list(row) for row in obj.matrix_world],dtype=np.float64)
+
+def get_vertex_coordinates(obj,world_space=False):
+	coordinates=np.empty(len(obj.data.vertices)*3,dtype=np.float32)
+	obj.data.vertices.foreach_get("co",coordinates)
+
+	coordinates=coordinates.reshape(-1,3).astype(np.float64)
+
+	if world_space:
+		matrix=get_matrix_array(obj)
+		coordinates=coordinates@matrix[:3,:3].T+matrix[:3,3]
+
+	return coordinates
+
+def set_vertex_coordinates(obj,coordinates,world_space=False):
+
+	if world_space:
+		inverse=np.linalg.inv(get_matrix_array(obj))
+		coordinates=coordinates@inverse[:3,:3].T+inverse[:3,3]
+
+	obj.data.vertices.foreach_set("co",np.ascontiguousarray(coordinates,dtype=np.float32).ravel())
+	obj.data.update()
+
+# calls transform with the (N,3) coordinates and writes back the array it returns
+def transform_vertices(obj,transform,world_space=False):
+	coordinates=transform(get_vertex_coordinates(obj,world_space))
+	set_vertex_coordinates(obj,coordinates,world_space)
+
+# moves vertices below world height min_z up to min_z
+def clamp_vertices_z(obj,min_z):
+
+	def clamp(coordinates):
+		coordinates[:,2]=np.maximum(coordinates[:,2],min_z)
+		return coordinates
+
+	transform_vertices(obj,clamp,world_space=True)
+
 def find_and_remove_object_by_name(objname):
 	ob = bpy.data.objects.get(objname)
 	if ob is not None:
@@ -119,4 +163,11 @@ def parent_objects_keep_transform(parent,child):
 
 def secondsToStr(t):
 	rediv = lambda ll,b : list(divmod(ll[0],b)) + ll[1:]
-	return "%d:%02d:%02d.%03d" % tuple(functools.reduce(rediv,[[t*1000,],1000,60,60]))
\ No newline at end of file
+	return "%d:%02d:%02d.%03d" % tuple(functools.reduce(rediv,[[t*1000,],1000,60,60]))
+
+
+# md5 of a list of definition values - used to detect which hull definitions changed
+# between generations. bpy property arrays must be converted with list() first or
+# their repr is the property path instead of the values
+def get_definition_hash(values):
+	return hashlib.md5(repr(values).encode()).hexdigest()
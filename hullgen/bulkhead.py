@@ -17,9 +17,14 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import bpy
+import bmesh
+from mathutils import Vector
 
 from ..hullgen import curve_helper
 from ..hullgen import bpy_helper
+from ..hullgen import geometry_helper
+from ..hullgen import mesh_cache
+from ..hullgen import profile_helper
 
 class bulkhead_definition:
     station=0
@@ -33,6 +38,12 @@ class bulkhead_definition:
         self.floor_height=floor_height
         self.thickness=thickness
 
+    def get_definition_hash(self):
+        return bpy_helper.get_definition_hash([self.station,
+            self.watertight,
+            self.floor_height,
+            self.thickness])
+
 class bulkhead:
 
     the_hull_definition=None
@@ -54,38 +65,84 @@ class bulkhead:
         self.bulkhead_collection=bpy_helper.make_collection("bulkheads",bpy.context.scene.collection.children)
 
     def move_verts_z(self,ob,new_val):
+        bpy_helper.clamp_vertices_z(ob,new_val)
 
-        vert_list=[]
+    # the hull shape is the expensive part - everything it depends on is in get_hull_hash
+    def get_cache_key(self):
+        return mesh_cache.get_key(["bulkhead",
+            self.the_hull_definition.get_hull_hash(),
+            self.bulkhead_definition.get_definition_hash(),
+            self.the_hull_definition.analytic_sections])
 
-        for v in ob.data.vertices:
-            
-            vert_list.append([v.index,v.co.z])
-            
-            
+    def make_bulkhead_shape(self):
 
-        def secondVal(val):
-            return val[1]
+        if self.the_hull_definition.analytic_sections:
+            section=self.the_hull_definition.get_hull_section(self.bulkhead_definition.station)
 
-        vert_list.sort(key=secondVal)
+            if section!=None and self.make_bulkhead_shape_from_section(section):
+                return
 
-        mat_world = ob.matrix_world
+        self.make_bulkhead_shape_ops()
 
-            
-        for i in range(0,len(vert_list)):
+    # Bulkhead from the hull section at the station (hull_maker.get_hull_section)
+    # extruded to the bulkhead thickness - returns False if the section has no faces
+    def make_bulkhead_shape_from_section(self,section):
+        station=self.bulkhead_definition.station
+        thickness=self.bulkhead_definition.thickness
 
-            vert=ob.data.vertices[vert_list[i][0]].co
-            
-            pos_world = mat_world @ vert
-            
-            if pos_world.z<new_val:
-                pos_world.z=new_val
-            
-            new_vert=mat_world.inverted() @ pos_world
-            
-            vert.z=new_vert.z
-        
+        bm=bmesh.new()
 
-    def make_bulkhead(self):
+        edges=[]
+
+        for loop in section:
+            loop_verts=[bm.verts.new((station-thickness/2,y,z)) for y,z in loop]
+
+            for index in range(len(loop_verts)):
+                edges.append(bm.edges.new((loop_verts[index],loop_verts[(index+1)%len(loop_verts)])))
+
+        # fills between the outer loops and the loops inside them (holes)
+        bmesh.ops.triangle_fill(bm,use_beauty=True,use_dissolve=False,edges=edges)
+
+        if len(bm.faces)==0:
+            bm.free()
+            return False
+
+        extruded=bmesh.ops.extrude_face_region(bm,geom=bm.faces[:])
+        extruded_verts=[element for element in extruded["geom"] if isinstance(element,bmesh.types.BMVert)]
+
+        bmesh.ops.translate(bm,vec=(thickness,0,0),verts=extruded_verts)
+        bmesh.ops.recalc_face_normals(bm,faces=bm.faces[:])
+
+        # origin at the median of the vertices like origin_set(type='ORIGIN_GEOMETRY', center='MEDIAN')
+        center=Vector((0,0,0))
+
+        for vert in bm.verts:
+            center+=vert.co
+
+        center/=len(bm.verts)
+
+        bmesh.ops.translate(bm,vec=-center,verts=bm.verts[:])
+
+        name="Bulkhead.s%06.2f"%(station)
+
+        mesh=bpy.data.meshes.new(name)
+        bm.to_mesh(mesh)
+        bm.free()
+
+        self.bulkhead_object=bpy.data.objects.new(name,mesh)
+        self.bulkhead_object.location=center
+
+        bpy.context.collection.objects.link(self.bulkhead_object)
+
+        bpy_helper.select_object(self.bulkhead_object,True)
+
+        # dimensions of the void need an evaluated bounding box
+        bpy.context.view_layer.update()
+
+        return True
+
+    # Bulkhead from a cube intersected with the hull object (evaluates the whole hull)
+    def make_bulkhead_shape_ops(self):
         bpy.ops.mesh.primitive_cube_add(size=2.0, 
             enter_editmode=False, 
             location=(  self.bulkhead_definition.station, 0, 0))
@@ -99,13 +156,47 @@ class bulkhead:
         bpy_helper.select_object(self.bulkhead_object,True)
 
         bool_new = self.bulkhead_object.modifiers.new(type="BOOLEAN", name="hull_slice")
-        bool_new.object = self.the_hull_definition.hull_object
+        bool_new.object = self.the_hull_definition.get_hull_operand()
         bool_new.operation = 'INTERSECT'
         bool_new.name="bool.hull_shape"
 
         bpy.ops.object.modifier_apply(modifier="bool.hull_shape")
         bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='MEDIAN')
 
+    def make_bulkhead(self):
+
+        with profile_helper.stage("bulkhead %06.2f"%self.bulkhead_definition.station) as node:
+            self.make_bulkhead_objects()
+
+            node.add_object(self.bulkhead_object)
+            node.add_object(self.bulkhead_overcut_object)
+            node.add_object(self.bulkhead_void_object)
+
+        return self.bulkhead_object
+
+    def make_bulkhead_objects(self):
+
+        cache=None
+        cached_arrays=None
+
+        if self.the_hull_definition.use_mesh_cache:
+            cache=self.the_hull_definition.get_mesh_cache()
+            cache_key=self.get_cache_key()
+            cached_arrays=cache.get(cache_key)
+
+        if cached_arrays is None:
+            self.make_bulkhead_shape()
+
+            if cache!=None:
+                cache.put(cache_key,mesh_cache.get_mesh_arrays(self.bulkhead_object.data,self.bulkhead_object.matrix_basis))
+        else:
+            profile_helper.the_profiler.count("mesh_cache_hits")
+
+            self.bulkhead_object=geometry_helper.make_object_from_arrays("Bulkhead.s%06.2f"%(self.bulkhead_definition.station),cached_arrays)
+
+            # dimensions of the void below need an evaluated bounding box
+            bpy.context.view_layer.update()
+
         if self.the_hull_definition.slicer_overcut_ratio>0:
             
             bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, 
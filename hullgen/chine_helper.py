@@ -17,12 +17,17 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import bpy 
+import bmesh
 import math
 from math import radians, degrees
+import numpy as np
 
 from ..hullgen import curve_helper
+from ..hullgen import bezier_helper
 from ..hullgen import material_helper
 from ..hullgen import bpy_helper
+from ..hullgen import mesh_cache
+from ..hullgen import profile_helper
 from ..hullgen import geometry_helper
 from ..hullgen import bpy_helper
 
@@ -55,6 +60,16 @@ class longitudal_definition:
 		self.thickness=thickness
 		self.slicer_ratio=slicer_ratio
 
+	def get_definition_hash(self):
+		return bpy_helper.get_definition_hash([self.z_offset,
+			self.width,
+			self.thickness,
+			self.slicer_ratio,
+			self.bend_radius,
+			self.curve_angle,
+			self.limit_x_min,
+			self.limit_x_max])
+
 
 class chine_instance_definition:
 	curve_object=None
@@ -66,6 +81,9 @@ class chine_instance_definition:
 
 	longitudal_slicers_slot_gap_objects=None
 
+	# hash of everything the curve_object mesh is made from - see make_single_chine
+	curve_hash=None
+
 	def __init__(self,curve_object,curve_backup,inverted):
 		self.curve_object=curve_object
 		self.curve_backup=curve_backup
@@ -100,11 +118,21 @@ class chine_helper:
 
 	asymmetry=[0,0]
 
+	# curve twist in degrees [start,middle,end] - mirrored on the inverted side
+	twist=None
+
 	# amount of distance slicer is poking through skin to ensure clean geometry
 	skin_pokethrough=0.01
 
+	# build slicer planes by writing mesh data directly (bmesh / from_pydata) instead of
+	# edit mode bpy.ops calls - each operator call costs a depsgraph update and undo push
+	direct_mesh=True
+
 	longitudal_definitions=None
 
+	# only build the longitudal definitions with these indices (parallel_helper workers)
+	longitudal_indices=None
+
 
 	chine_instances=None
 
@@ -125,6 +153,24 @@ class chine_helper:
 	def add_longitudal_definition(self,new_element):
 		self.longitudal_definitions.append(new_element)
 
+	# includes the longitudal definitions - stringers are built together with the chine
+	def get_definition_hash(self):
+		return bpy_helper.get_definition_hash([self.name,
+			self.curve_length,
+			self.curve_width,
+			self.curve_height,
+			self.extrude_width,
+			list(self.rotation),
+			list(self.offset),
+			list(self.asymmetry),
+			self.symmetrical,
+			self.longitudal_thickness,
+			self.skin_pokethrough,
+			[longitudal.get_definition_hash() for longitudal in self.longitudal_definitions],
+			list(self.longitudal_screw_positions),
+			self.the_hull.target_screw_size,
+			self.the_hull.hull_output_scale])
+
 
 	
 	def __init__(self,the_hull,name,length,width,rotation=[0,0,0],offset=[0,0,0],asymmetry=[0,0],symmetrical=True):
@@ -229,71 +275,13 @@ class chine_helper:
 		back_group = newCurve.vertex_groups.new()
 		back_group.name = "back"
 		
-		y_min=0
-		y_max=0
-
-		for vert in newCurve.data.vertices:
-			if vert.co.y>y_max:
-				y_max=vert.co.y
-
-			if vert.co.y<y_min:
-				y_min=vert.co.y
-
-		y_diff=y_max-y_min
-		y_half=0
-
-		if y_diff>0:
-			y_half=y_min+y_diff/2
-
-		front_verts=[]
-		back_verts=[]
-
+		vertex_y=bpy_helper.get_vertex_coordinates(newCurve)[:,1]
 
-		# for some reason vector math type if vert.co.y==0 equals false negative because of some rounding issue so I'm using -1 as cutoff for comparison
+		# this is messy hack... will refactor after easier way to identify
+		# modified vertices in new exact boolean modifier.
+		# for now there is no easy solution to identify newly created geometry
+		front_verts,back_verts=self.get_front_back_verts(vertex_y,inverted_curves)
 
-		#print("+++++++++++++++")
-		#print("name: %s width: %f inverted: %d"%(name,self.curve_width,inverted_curves))
-
-		for vert in newCurve.data.vertices:
-			#print("X: %f Y: %f Z: %f"%(vert.co.x,vert.co.y,vert.co.z),end =" ")
-			
-			# this is messy hack... will refactor after easier way to identify
-			# modified vertices in new exact boolean modifier.
-			# for now there is no easy solution to identify newly created geometry
-			if self.curve_width<0:
-				if vert.co.y<y_half:
-					if inverted_curves==0:
-						front_verts.append(vert.index)
-						#print("front")
-					else:
-						back_verts.append(vert.index)
-						#print("back")
-
-				if vert.co.y>=y_half:
-					if inverted_curves==0:
-						back_verts.append(vert.index)
-						#print("back")
-					else:
-						front_verts.append(vert.index)
-						#print("front")
-			else:
-				if vert.co.y<y_half:
-					if inverted_curves==1:
-						front_verts.append(vert.index)
-						#print("front")
-					else:
-						back_verts.append(vert.index)
-						#print("back")
-
-				if vert.co.y>=y_half:
-					if inverted_curves==1:
-						back_verts.append(vert.index)
-						#print("back")
-					else:
-						front_verts.append(vert.index)
-						#print("front")
-
-			
 		front_group.add(front_verts, 1.0, 'ADD')
 		back_group.add(back_verts, 1.0, 'ADD')
 
@@ -315,6 +303,11 @@ class chine_helper:
 	# =====================================
 
 	def select_and_extrude_slicer(self,slicer,amount):
+
+		if self.direct_mesh:
+			self.extrude_slicer_direct(slicer,amount)
+			return
+
 		bpy.ops.object.mode_set(mode='OBJECT')
 		bpy.ops.object.select_all(action='DESELECT')
 		bpy.context.view_layer.objects.active = slicer
@@ -332,8 +325,216 @@ class chine_helper:
 		bpy_helper.bmesh_recalculate_normals(slicer)
 		
 
+	# =====================================
+	# Direct mesh versions of create_slicer_plane_mesh / make_slicer_plane / select_and_extrude_slicer
+	# Same geometry and vertex groups but written with from_pydata and bmesh - no edit mode
+	# =====================================
+
+	# returns (front vertex indices, back vertex indices) of slicer plane vertices with Y
+	# coordinates y - used by create_slicer_plane_mesh and create_slicer_plane_mesh_direct
+	def get_front_back_verts(self,y,inverted_curves):
+
+		y_min=0
+		y_max=0
+
+		if len(y)>0:
+			y_min=min(0,y.min())
+			y_max=max(0,y.max())
+
+		y_diff=y_max-y_min
+		y_half=0
+
+		if y_diff>0:
+			y_half=y_min+y_diff/2
+
+		# vertices below y_half are the front unless the curve is flipped by
+		# either a negative width or inverted_curves (but not both)
+		below_half=y<y_half
+
+		if (self.curve_width<0)==(inverted_curves==0):
+			front_mask=below_half
+		else:
+			front_mask=~below_half
+
+		return (np.flatnonzero(front_mask).tolist(),np.flatnonzero(~front_mask).tolist())
+
+	def create_slicer_plane_mesh_direct(self,name,height,longitudal_element,inverted_curves):
+
+		theCurveHelper = curve_helper.Curve_Helper(curve_resolution=self.the_hull.curve_resolution)
+
+		theCurveHelper.curve_angle=longitudal_element.curve_angle
+
+		theCurveHelper.define_curve(length=self.curve_length,width=longitudal_element.bend_radius)
+		theCurveHelper.curve_height=0
+
+		points,curve_edges,curve_faces=theCurveHelper.sample_curve()
+		point_count=len(points)
+
+		# rotate 90 degrees around X (same as applying rotation [90,0,0])
+		points=np.stack([points[:,0],-points[:,2],points[:,1]],axis=1)
+
+		# extrude thickness along Y axis - one row of quads between the curve and its copy
+		overlap_factor=self.curve_width*4
+		extrude_amount=self.curve_width*overlap_factor
+
+		verts=np.concatenate([points,points+np.array([0,extrude_amount,0])])
+
+		faces=[(i,i+1,point_count+i+1,point_count+i) for i in range(0,point_count-1)]
+
+		front_verts,back_verts=self.get_front_back_verts(verts[:,1],inverted_curves)
+
+		# centre on Y
+		verts[:,1]-=extrude_amount/2
+
+		bpy_helper.find_and_remove_object_by_name(name)
+
+		slicer_mesh=bpy.data.meshes.new(name)
+		slicer_mesh.from_pydata(verts.tolist(),[],faces)
+		slicer_mesh.update()
+
+		newCurve=bpy.data.objects.new(name,slicer_mesh)
+		bpy.context.scene.collection.objects.link(newCurve)
+
+		front_group = newCurve.vertex_groups.new()
+		front_group.name = "front"
+
+		back_group = newCurve.vertex_groups.new()
+		back_group.name = "back"
+
+		front_group.add(front_verts, 1.0, 'ADD')
+		back_group.add(back_verts, 1.0, 'ADD')
+
+		newCurve.location.z=height
+
+		return newCurve
+
+	# Evaluates the boolean modifiers of slicer into a bmesh and removes all vertices
+	# that are not in vertex_group_name (delete_all_except_vertex_group)
+	def get_slicer_part(self,slicer,depsgraph,vertex_group_name):
+
+		part=bmesh.new()
+		part.from_object(slicer,depsgraph)
+
+		group_index=slicer.vertex_groups[vertex_group_name].index
+		deform_layer=part.verts.layers.deform.active
+
+		if deform_layer==None:
+			delete_verts=list(part.verts)
+		else:
+			delete_verts=[v for v in part.verts if group_index not in v[deform_layer]]
+
+		bmesh.ops.delete(part,geom=delete_verts,context='VERTS')
+
+		return part
+
+	def make_slicer_plane_direct(self,wall_curve,name,thickness,longitudal_element,inverted_curves=False):
+
+		name_prefix="cutter"
+
+		slicer1=self.create_slicer_plane_mesh_direct(name_prefix+name+".a",longitudal_element.z_offset,longitudal_element,inverted_curves)
+		slicer2=self.create_slicer_plane_mesh_direct(name_prefix+name+".b",longitudal_element.z_offset-thickness,longitudal_element,inverted_curves)
+
+		for slicer in [slicer1,slicer2]:
+			bool_cut = slicer.modifiers.new(type="BOOLEAN", name=name_prefix)
+			bool_cut.object = wall_curve
+			bool_cut.operation = 'DIFFERENCE'
+
+		# one depsgraph evaluation for both booleans
+		depsgraph=bpy.context.evaluated_depsgraph_get()
+
+		part1=self.get_slicer_part(slicer1,depsgraph,"back")
+		part2=self.get_slicer_part(slicer2,depsgraph,"back")
+
+		# join - slicer1 ends up thickness above slicer2 in slicer2 space
+		bmesh.ops.translate(part1,verts=part1.verts,vec=(0,0,thickness))
+
+		part1_mesh=bpy.data.meshes.new(name_prefix+name+".join")
+		part1.to_mesh(part1_mesh)
+		part1.free()
+
+		part2.from_mesh(part1_mesh)
+		bpy.data.meshes.remove(part1_mesh)
+
+		# bridge_edge_loops with faces selected - faces are removed and their boundaries bridged
+		if len(part2.faces)>0:
+			bridge_edges=[e for e in part2.edges if e.is_boundary]
+			bmesh.ops.delete(part2,geom=list(part2.faces),context='FACES_KEEP_BOUNDARY')
+		else:
+			bridge_edges=list(part2.edges)
+
+		bmesh.ops.bridge_loops(part2,edges=bridge_edges)
+
+		slicer2.modifiers.remove(slicer2.modifiers[name_prefix])
+
+		part2.to_mesh(slicer2.data)
+		slicer2.data.update()
+		part2.free()
+
+		slicer1_mesh=slicer1.data
+		bpy.data.objects.remove(slicer1,do_unlink=True)
+		bpy.data.meshes.remove(slicer1_mesh)
+
+		# origin at center of object (thickness/2) - same as join + translate in make_slicer_plane
+		slicer2.location.z+=thickness/2
+
+		slicer2.name=name_prefix+name
+
+		return slicer2
+
+	# extrude_region_move of the whole mesh along Y
+	def extrude_slicer_direct(self,slicer,amount):
+
+		bm=bmesh.new()
+		bm.from_mesh(slicer.data)
+
+		extruded=bmesh.ops.extrude_face_region(bm,geom=list(bm.verts)+list(bm.edges)+list(bm.faces))
+
+		extruded_verts=[element for element in extruded["geom"] if isinstance(element,bmesh.types.BMVert)]
+		bmesh.ops.translate(bm,verts=extruded_verts,vec=(0,amount,0))
+
+		bmesh.ops.recalc_face_normals(bm,faces=bm.faces)
+
+		bm.to_mesh(slicer.data)
+		slicer.data.update()
+		bm.free()
+
+	# Slicer planes are looked up in the mesh cache when wall_curve_hash
+	# (chine_instance_definition.curve_hash) is known
+	def make_slicer_plane(self,wall_curve,name,thickness,longitudal_element,inverted_curves=False,wall_curve_hash=None):
+
+		cache=None
+
+		if wall_curve_hash!=None and self.the_hull.use_mesh_cache:
+			cache=self.the_hull.get_mesh_cache()
+
+			cache_key=mesh_cache.get_key(["slicer",
+				wall_curve_hash,
+				list(wall_curve.location),
+				list(wall_curve.rotation_euler),
+				list(wall_curve.scale),
+				longitudal_element.get_definition_hash(),
+				thickness,
+				inverted_curves,
+				self.direct_mesh])
+
+			cached_arrays=cache.get(cache_key)
+
+			if cached_arrays is not None:
+				profile_helper.the_profiler.count("mesh_cache_hits")
+				return geometry_helper.make_object_from_arrays("cutter"+name,cached_arrays,bpy.context.scene.collection)
+
+		if self.direct_mesh:
+			slicer=self.make_slicer_plane_direct(wall_curve,name,thickness,longitudal_element,inverted_curves)
+		else:
+			slicer=self.make_slicer_plane_ops(wall_curve,name,thickness,longitudal_element,inverted_curves)
+
+		if cache!=None:
+			cache.put(cache_key,mesh_cache.get_mesh_arrays(slicer.data,slicer.matrix_basis))
+
+		return slicer
+
 	# for symmetrical chines - if there is any curve in slicer plane - it needs to be inverted for opposite side (symmetrical)
-	def make_slicer_plane(self,wall_curve,name,thickness,longitudal_element,inverted_curves=False):
+	def make_slicer_plane_ops(self,wall_curve,name,thickness,longitudal_element,inverted_curves=False):
 
 		name_prefix="cutter"
 
@@ -400,6 +601,14 @@ class chine_helper:
 	
 
 	def make_longitudal_element(self,chine_instance,longitudal_element,index):
+
+		with profile_helper.stage("stringer %s.%02d"%(chine_instance.curve_object.name,index)) as node:
+			self.make_longitudal_objects(chine_instance,longitudal_element,index)
+
+			node.add_object(chine_instance.longitudal_objects[-1])
+			node.add_object(chine_instance.longitudal_slicers[-1])
+
+	def make_longitudal_objects(self,chine_instance,longitudal_element,index):
 		longitudal_plane=None
 
 		longitudal_name="%s.longitudal.%02d"%(chine_instance.curve_object.name,index)
@@ -413,8 +622,8 @@ class chine_helper:
 			name=longitudal_name,
 			longitudal_element=longitudal_element,
 			thickness=longitudal_element.thickness,
-
-			inverted_curves=chine_instance.inverted)
+			inverted_curves=chine_instance.inverted,
+			wall_curve_hash=chine_instance.curve_hash)
 
 		material_helper.assign_material(longitudal_plane,material_helper.get_material_stringer())
 
@@ -438,7 +647,8 @@ class chine_helper:
 			name=slicer_name,
 			longitudal_element=longitudal_element,
 			thickness=slicer_thickness,
-			inverted_curves=chine_instance.inverted)
+			inverted_curves=chine_instance.inverted,
+			wall_curve_hash=chine_instance.curve_hash)
 
 		
 		material_helper.assign_material(slicer_plane,material_helper.get_material_support())
@@ -605,11 +815,17 @@ class chine_helper:
 
 		chine_instance=chine_instance_definition(curve_object,theCurveHelper.curve_backup,inverted)
 
+		chine_instance.curve_hash=bpy_helper.get_definition_hash([self.get_definition_hash(),
+			self.the_hull.curve_resolution,
+			list(theCurveHelper.curve_twist),
+			inverted])
+
 		self.add_chine_instance(chine_instance)
 
 		for i in range(len(self.longitudal_definitions)):
 			if self.longitudal_elements_enabled==True:
-				self.make_longitudal_element(chine_instance,self.longitudal_definitions[i],i)
+				if self.longitudal_indices==None or i in self.longitudal_indices:
+					self.make_longitudal_element(chine_instance,self.longitudal_definitions[i],i)
 
 		# Can only do rotation after we generate the longitudal elements because the slicers
 		# depend on zero rotation 
@@ -634,10 +850,14 @@ class chine_helper:
 
 	def make_chine(self,twist=None):
 
+		# keep the twist on the chine so kernel_adapter sees the same curve
+		if twist!=None:
+			self.twist=twist
+
 		# ================================================================================================ 
 		# First curve is Left Side or non-symmetrical "single side"
 		# ================================================================================================
-		newcurve=self.make_single_chine(twist,False)
+		newcurve=self.make_single_chine(self.twist,False)
 
 
 
@@ -645,7 +865,7 @@ class chine_helper:
 		# Second curve is Right Side
 		# ================================================================================================
 		if self.symmetrical:
-			newcurve=self.make_single_chine(twist,True)
+			newcurve=self.make_single_chine(self.twist,True)
 			#self.curve_objects.append(newcurve)
 
 
@@ -761,50 +981,57 @@ class chine_helper:
 
 		#print("target screw: %f scaleup factor: %f scaled_screw size: %f hull output scale: %f"%(self.target_screw_size,scaleup_factor,self.scaled_screw_size,self.the_hull.hull_output_scale))
 
-		screw_objects=[]
+		if len(self.longitudal_screw_positions)==0:
+			return
 
-		for chine_curve in self.curve_backups:
-			for screw_position in self.longitudal_screw_positions:
-				bpy.ops.mesh.primitive_cylinder_add(radius=self.scaled_screw_size/2, depth=5, enter_editmode=False, location=[0,0,0])
-				screw_object=bpy.context.view_layer.objects.active
-				screw_object.name="screw_object_%d_%s"%(screw_position,self.name)
-				
-				screw_object.location.y=0.065
-				screw_object.hide_viewport=True
-				screw_objects.append(screw_object)
+		# screw positions are sampled from the same bezier as the chine curve - the screws of
+		# each side are copies of one cylinder in a single cutter parented to the curve so
+		# they follow it and each longitudal gets one boolean
+		curve_length=self.curve_length
+		curve_hull_ratio=curve_length/self.the_hull.hull_length
 
-				bpy_helper.move_object_to_collection(self.view_collection_longitudals,screw_object)
+		translated_hull_start=curve_length*(curve_hull_ratio-1)/2
 
-				path_follow = screw_object.constraints.new(type='FOLLOW_PATH')
-				path_follow.target=chine_curve
-				path_follow.use_fixed_location=True
+		offset_factors=[]
 
-				#curve_overlap=new_chine.curve_length-the_hull.hull_length
+		for screw_position in self.longitudal_screw_positions:
+			translated_screw_position=(curve_length/2)+(screw_position*curve_hull_ratio)
+			offset_translated_position=translated_screw_position+translated_hull_start
 
-				
-				curve_length=self.curve_length
-				curve_hull_ratio=curve_length/self.the_hull.hull_length
-				
-				translated_screw_position=(curve_length/2)+(screw_position*curve_hull_ratio)
-				translated_hull_start=curve_length*(curve_hull_ratio-1)/2
-				offset_translated_position=translated_screw_position+translated_hull_start
-
-				#print("curve length: %f curve extra ratio: %f"%(curve_length,curve_hull_ratio))
-				#print("screw position: %f tr_screw_pos: %f tr hull start: %f offset tr screw: %f"%(
-				#										screw_position,
-				#										translated_screw_position,
-				#										translated_hull_start,												
-				#										offset_translated_position))
-
-				offset_factor=offset_translated_position/curve_length
-				
-				path_follow.offset_factor=offset_factor
+			offset_factors.append(offset_translated_position/curve_length)
+
+		coordinates=bezier_helper.define_curve_coordinates(self.curve_length,
+			self.curve_width,
+			asymmetry=self.asymmetry)
+
+		curve_points,curve_edges,curve_faces=bezier_helper.sample_curve_mesh(coordinates,self.the_hull.curve_resolution)
+
+		screw_locations=bezier_helper.get_path_points(curve_points,offset_factors)
+		screw_locations[:,1]+=0.065
+
+		screw_transforms=[]
+
+		for location in screw_locations:
+			screw_transform=np.identity(4)
+			screw_transform[:3,3]=location
+			screw_transforms.append(screw_transform)
+
+		screw_template=geometry_helper.get_cylinder_template(self.scaled_screw_size/2,5)
+
+		for chine_instance in self.chine_instances:
+			screw_object=geometry_helper.make_instanced_mesh_object("screw_object_%s"%chine_instance.curve_object.name,
+				screw_template,
+				screw_transforms)
+
+			# curve space like the FOLLOW_PATH constraint - no parent inverse
+			screw_object.parent=chine_instance.curve_backup
+			screw_object.hide_viewport=True
 
-		for longitudal_element_object in self.longitudal_element_objects:
+			bpy_helper.move_object_to_collection(self.view_collection_longitudals,screw_object)
 
-			for screw_object in screw_objects:
+			for longitudal_object in chine_instance.longitudal_objects:
 				modifier_name="screwhole_%s"%screw_object.name
 
-				bool_new = longitudal_element_object.modifiers.new(type="BOOLEAN", name=modifier_name)
+				bool_new = longitudal_object.modifiers.new(type="BOOLEAN", name=modifier_name)
 				bool_new.object = screw_object
 				bool_new.operation = 'DIFFERENCE'
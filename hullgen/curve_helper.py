@@ -22,6 +22,7 @@ import math
 from math import radians, degrees
 
 from ..hullgen import bpy_helper
+from ..hullgen import bezier_helper
 
 def cleanup_shape(ob):
 	if bpy.context.active_object.mode=="OBJECT":
@@ -73,6 +74,10 @@ class Curve_Helper:
 
 	make_backup=False
 
+	# sample the bezier with bezier_helper and write the mesh directly instead of
+	# converting a curve object with bpy.ops.object.convert
+	direct_mesh=True
+
 	curve_backup=None
 
 	asymmetry=[0,0]
@@ -91,55 +96,36 @@ class Curve_Helper:
 		self.curve_length=length
 		self.curve_width=width
 
-		handle_width=self.curve_length/6
-		half_length=self.curve_length/2
-		angle=radians(self.curve_angle)
+		self.coordinates.extend(bezier_helper.define_curve_coordinates(length=self.curve_length,
+			width=self.curve_width,
+			curve_angle=self.curve_angle,
+			asymmetry=self.asymmetry))
 
-		# Curve handle = point, handle_left of point, handle right of point
+	def has_twist(self):
+		for t in self.curve_twist:
+			if t!=0:
+				return True
 
-		# Left handle
-		asymetric_width=-(self.asymmetry[0]*self.curve_width)
-		x=handle_width*math.cos(radians(self.curve_angle*(1-self.asymmetry[0])))
-		y=handle_width*math.sin(radians(self.curve_angle*(1-self.asymmetry[0])))
+		return False
 
-		self.coordinates.append([	(-half_length, asymetric_width, 0), 	
-									(-half_length-x, asymetric_width+y, 0),	
-									(-half_length+x, asymetric_width-y, 0)
-								])
+	# returns (verts, edges, faces) of the curve converted to a mesh - see bezier_helper
+	def sample_curve(self):
+		tilts=None
 
-		# Center handle
-		self.coordinates.append([	
-										(0,-self.curve_width, 0),
-										(-handle_width, -self.curve_width, 0),  
-										(handle_width,-self.curve_width, 0)
-								]) 
+		if self.has_twist():
+			tilts=[math.radians(t) for t in self.curve_twist]
 
+		return bezier_helper.sample_curve_mesh(self.coordinates,
+			self.curve_resolution,
+			extrude=self.curve_height,
+			tilts=tilts)
 
-		asymetric_width=-(self.asymmetry[1]*self.curve_width)
-		x=handle_width*math.cos(radians(self.curve_angle*(1-self.asymmetry[1])))
-		y=handle_width*math.sin(radians(self.curve_angle*(1-self.asymmetry[1])))
+	# bezier curve datablock (self.curvedata) for self.coordinates
+	def make_curve_data(self,name):
 
-		# Right handle
-		self.coordinates.append([	
-									(half_length, asymetric_width, 0),  
-									(half_length-x, asymetric_width-y, 0),
-									(half_length+x, asymetric_width+y, 0)
-								])
+		self.curvedata = bpy.data.curves.new(name=name, type='CURVE')
 
-	# generates the basic curve
-	def generate_curve(self,curvename):
-
-		# delete it if it already exists
-		bpy_helper.find_and_remove_object_by_name(curvename)
-		origin=(0,0,0)
-  
-		self.curvedata = bpy.data.curves.new(name=curvename, type='CURVE')
-
-		has_twist=False
-
-		for t in self.curve_twist:
-			if t!=0:
-				has_twist=True
+		has_twist=self.has_twist()
 
 		if has_twist==True: 
 			self.curvedata.dimensions = '3D'
@@ -148,12 +134,7 @@ class Curve_Helper:
 
 		self.curvedata.resolution_u=self.curve_resolution  
 		self.curvedata.extrude=self.curve_height
-		
-		self.curve_object = bpy.data.objects.new(curvename, self.curvedata)    
-		self.curve_object.location = origin
-		
-		bpy.context.scene.collection.objects.link(self.curve_object)    
-		
+
 		polyline = self.curvedata.splines.new('BEZIER')    
 		polyline.bezier_points.add(len(self.coordinates)-1)
 		polyline.resolution_u=self.curve_resolution
@@ -170,6 +151,26 @@ class Curve_Helper:
 				point.tilt=math.radians(self.curve_twist[idx])		
 
 		polyline.use_cyclic_u = False
+
+		return self.curvedata
+
+	# generates the basic curve
+	def generate_curve(self,curvename):
+
+		if self.direct_mesh:
+			self.generate_curve_direct(curvename)
+			return
+
+		# delete it if it already exists
+		bpy_helper.find_and_remove_object_by_name(curvename)
+		origin=(0,0,0)
+  
+		self.make_curve_data(curvename)
+		
+		self.curve_object = bpy.data.objects.new(curvename, self.curvedata)    
+		self.curve_object.location = origin
+		
+		bpy.context.scene.collection.objects.link(self.curve_object)    
 		
 		if self.make_backup:
 			bpy_helper.select_object(self.curve_object,True)
@@ -183,6 +184,33 @@ class Curve_Helper:
 		bpy.ops.object.shade_flat()
 		
 
+	# Same result as generate_curve but the mesh is written from bezier_helper samples
+	# A real curve object is only made for the backup
+	def generate_curve_direct(self,curvename):
+
+		# delete it if it already exists
+		bpy_helper.find_and_remove_object_by_name(curvename)
+
+		verts,edges,faces=self.sample_curve()
+
+		mesh=bpy.data.meshes.new(curvename)
+		mesh.from_pydata(verts.tolist(),edges.tolist(),faces.tolist())
+		mesh.update()
+
+		self.curve_object = bpy.data.objects.new(curvename, mesh)
+		self.curve_object.location = (0,0,0)
+
+		bpy.context.scene.collection.objects.link(self.curve_object)
+
+		if self.make_backup:
+			self.make_curve_data(curvename+"_backup")
+
+			self.curve_backup=bpy.data.objects.new(curvename+"_backup", self.curvedata)
+			bpy.context.scene.collection.objects.link(self.curve_backup)
+			self.curve_backup.parent=self.curve_object
+
+		bpy_helper.select_object(self.curve_object,True)
+
 	def extrude_curve(self,extrude_width):
 
 		bpy.ops.object.select_all(action='DESELECT')
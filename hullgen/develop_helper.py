@@ -0,0 +1,723 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Plate development (flat pattern of a plate) as sparse least squares - no bpy.
+#
+# Each connected part of a plate is unfolded in one solve for all triangles with
+# least squares conformal maps (LSCM) instead of laying out triangles one by one.
+# A few as rigid as possible (ARAP) iterations then bring the edges back to true
+# length. ARAP solves the same sparse system every iteration so it is factorized once.
+#
+# The per triangle area and edge length distortion of the flat pattern tell if a plate
+# is developable - can be cut flat and bent into shape without stretching.
+#
+# scipy factorizes the systems when it is installed, without it the normal equations
+# are solved with preconditioned conjugate gradients in NumPy. Jacobi alone needs more
+# iterations the finer the mesh is, so the vertices are also grouped in a grid and a
+# coarse solve over the groups is added to the preconditioner (two level, additive).
+# The coarse space of ARAP is a constant per group, LSCM also gets the local rotation
+# and scale of each group - the low energy modes of a conformal map.
+# Solves that stop at max_cg_iterations are counted in develop_result.
+
+import time
+import numpy as np
+
+try:
+	import scipy.sparse
+	import scipy.sparse.linalg
+	import scipy.sparse.csgraph
+except ImportError:
+	scipy=None
+
+# triangles with less area are left out of the solves (zero distortion)
+area_epsilon=1e-12
+
+# edge length distortion a developable plate may have (0.5%)
+developable_tolerance=0.005
+
+# conjugate gradients stop here even if the tolerance isn't reached
+max_cg_iterations=1000
+
+# relative residual of the conformal map when ARAP iterations follow it
+lscm_arap_tolerance=1e-6
+
+# vertices per coarse group of the two level preconditioner and the most groups
+# (the coarse system is inverted as a dense matrix)
+coarse_group_size=16
+max_coarse_groups=384
+
+
+# Sparse least squares min |A x - b| - A given as coordinate lists (duplicates add up)
+class sparse_least_squares:
+
+	rows=None
+	columns=None
+	values=None
+
+	row_count=0
+	column_count=0
+
+	# scipy: A as csr matrix and solver of the factorized normal equations
+	matrix=None
+	normal_solver=None
+
+	# numpy: normal equations A^T A as coordinate lists and their diagonal (Jacobi preconditioner)
+	normal_rows=None
+	normal_columns=None
+	normal_values=None
+	normal_diagonal=None
+
+	# numpy: coarse space of the two level preconditioner - column i is basis[i,k] in
+	# coarse column groups[i]*K+k - and the inverse of A^T A projected on it
+	groups=None
+	basis=None
+	coarse_inverse=None
+
+	# conjugate gradient solves that stopped at max_iterations, iterations of all solves
+	# and the largest relative residual a solve finished with
+	unconverged_solves=0
+	iterations=0
+	max_residual=0
+
+	# groups (column_count,) optional coarse group label of each column and basis
+	# (column_count,K) the values of the column in the K coarse columns of its group
+	def __init__(self,rows,columns,values,row_count,column_count,groups=None,basis=None):
+		self.rows=rows
+		self.columns=columns
+		self.values=values
+		self.row_count=row_count
+		self.column_count=column_count
+
+		self.unconverged_solves=0
+		self.iterations=0
+		self.max_residual=0
+
+		if scipy!=None:
+			self.matrix=scipy.sparse.csr_matrix((values,(rows,columns)),shape=(row_count,column_count))
+			self.normal_solver=scipy.sparse.linalg.factorized((self.matrix.T@self.matrix).tocsc())
+		else:
+			self.make_normal_matrix()
+
+			if groups is not None:
+				self.make_coarse_inverse(groups,basis)
+
+	# products of all pairs of entries in the same row of A - entries are sorted by row
+	# and paired with the entry offset places further on while the row is the same
+	def make_normal_matrix(self):
+		order=np.argsort(self.rows,kind="stable")
+
+		rows=self.rows[order]
+		columns=self.columns[order]
+		values=self.values[order]
+
+		max_row_length=np.bincount(rows).max() if len(rows)>0 else 0
+
+		first_columns=[columns]
+		second_columns=[columns]
+		products=[values*values]
+
+		for offset in range(1,max_row_length):
+			same_row=np.flatnonzero(rows[:-offset]==rows[offset:])
+
+			pair_product=values[same_row]*values[same_row+offset]
+
+			first_columns+=[columns[same_row],columns[same_row+offset]]
+			second_columns+=[columns[same_row+offset],columns[same_row]]
+			products+=[pair_product,pair_product]
+
+		keys=np.concatenate(first_columns)*self.column_count+np.concatenate(second_columns)
+		unique_keys,inverse=np.unique(keys,return_inverse=True)
+
+		self.normal_rows=unique_keys//self.column_count
+		self.normal_columns=unique_keys%self.column_count
+		self.normal_values=np.bincount(inverse.ravel(),np.concatenate(products),minlength=len(unique_keys))
+
+		diagonal=self.normal_rows==self.normal_columns
+		self.normal_diagonal=np.bincount(self.normal_rows[diagonal],self.normal_values[diagonal],minlength=self.column_count)
+
+	# P^T A^T A P for P the coarse space (groups, basis) - small enough to invert
+	def make_coarse_inverse(self,groups,basis=None):
+		if basis is None:
+			basis=np.ones((len(groups),1))
+
+		basis_size=basis.shape[1]
+		coarse_size=(int(groups.max())+1)*basis_size if len(groups)>0 else 0
+
+		if coarse_size<2:
+			return
+
+		coarse_columns=groups[:,None]*basis_size+np.arange(basis_size)
+
+		coarse=np.zeros(coarse_size*coarse_size)
+
+		for first in range(basis_size):
+			for second in range(basis_size):
+				keys=coarse_columns[self.normal_rows,first]*coarse_size+coarse_columns[self.normal_columns,second]
+				products=self.normal_values*basis[self.normal_rows,first]*basis[self.normal_columns,second]
+
+				coarse+=np.bincount(keys,products,minlength=coarse_size*coarse_size)
+
+		coarse=coarse.reshape(coarse_size,coarse_size)
+
+		# basis columns that are all zero (one vertex groups) stay out of the corrections
+		coarse[np.diag_indices(coarse_size)]+=1e-12*max(coarse.diagonal().max(),1e-30)
+
+		try:
+			self.coarse_inverse=np.linalg.inv(coarse)
+		except np.linalg.LinAlgError:
+			return
+
+		self.groups=coarse_columns
+		self.basis=basis
+
+	# A^T y
+	def multiply_transposed(self,y):
+		return np.bincount(self.columns,self.values*y[self.rows],minlength=self.column_count)
+
+	# A^T A x
+	def multiply_normal(self,x):
+		return np.bincount(self.normal_rows,self.normal_values*x[self.normal_columns],minlength=self.column_count)
+
+	# x0 is the starting point of conjugate gradients (previous solution) and tolerance
+	# the residual it stops at relative to A^T rhs
+	def solve(self,rhs,x0=None,tolerance=1e-9):
+		if self.normal_solver!=None:
+			return self.normal_solver(self.matrix.T@rhs)
+
+		return self.solve_conjugate_gradients(self.multiply_transposed(rhs),x0,tolerance)
+
+	def solve_conjugate_gradients(self,b,x0=None,tolerance=1e-9,max_iterations=None):
+
+		if max_iterations==None:
+			max_iterations=min(max(100,self.column_count),max_cg_iterations)
+
+		if x0 is None:
+			x=np.zeros(self.column_count)
+		else:
+			x=np.array(x0,dtype=np.float64)
+
+		inverse_diagonal=1/np.maximum(self.normal_diagonal,1e-30)
+
+		if self.coarse_inverse is not None:
+			coarse_keys=self.groups.ravel()
+			coarse_size=len(self.coarse_inverse)
+
+		def precondition(r):
+			z=inverse_diagonal*r
+
+			if self.coarse_inverse is not None:
+				coarse_r=np.bincount(coarse_keys,(self.basis*r[:,None]).ravel(),minlength=coarse_size)
+				z+=np.einsum('ij,ij->i',self.basis,(self.coarse_inverse@coarse_r)[self.groups])
+
+			return z
+
+		r=b-self.multiply_normal(x)
+		z=precondition(r)
+		p=z.copy()
+		rz=r@z
+
+		b_norm=max(np.linalg.norm(b),1e-30)
+
+		converged=False
+
+		for iteration in range(max_iterations):
+
+			if np.linalg.norm(r)<=tolerance*b_norm:
+				converged=True
+				break
+
+			normal_p=self.multiply_normal(p)
+
+			alpha=rz/(p@normal_p)
+
+			x+=alpha*p
+			r-=alpha*normal_p
+
+			z=precondition(r)
+			next_rz=r@z
+
+			p=z+(next_rz/rz)*p
+			rz=next_rz
+
+			self.iterations+=1
+
+		residual=np.linalg.norm(r)/b_norm
+
+		if not converged and residual>tolerance:
+			self.unconverged_solves+=1
+
+		self.max_residual=max(self.max_residual,residual)
+
+		return x
+
+
+class develop_result:
+
+	# (N,2) flat pattern coordinates of the vertices - parts are placed side by side
+	uvs=None
+
+	# (M,) flat area / area - 1 of each triangle
+	area_distortion=None
+
+	# (M,) largest |flat length / length - 1| of the edges of each triangle
+	edge_distortion=None
+
+	# same for each face when develop_plate was given triangle_faces
+	# (area weighted mean of the area distortion, largest edge distortion)
+	face_area_distortion=None
+	face_edge_distortion=None
+
+	parts=0
+
+	# parts without a boundary (closed) can't be unfolded
+	closed_parts=0
+
+	# triangles that are mirrored in the flat pattern (folded over)
+	flipped_triangles=0
+
+	solve_time=0
+
+	# conjugate gradient solves (no scipy) that stopped at max_cg_iterations before the
+	# tolerance, their iterations and the largest relative residual left by a solve
+	unconverged_solves=0
+	cg_iterations=0
+	max_residual=0
+
+	def add_solve_stats(self,system):
+		self.unconverged_solves+=system.unconverged_solves
+		self.cg_iterations+=system.iterations
+		self.max_residual=max(self.max_residual,system.max_residual)
+
+	def get_max_edge_distortion(self):
+		if self.edge_distortion is None or len(self.edge_distortion)==0:
+			return 0
+
+		return float(self.edge_distortion.max())
+
+	def get_max_area_distortion(self):
+		if self.area_distortion is None or len(self.area_distortion)==0:
+			return 0
+
+		return float(np.abs(self.area_distortion).max())
+
+	def is_developable(self,tolerance=developable_tolerance):
+		return self.closed_parts==0 and self.flipped_triangles==0 and self.get_max_edge_distortion()<=tolerance
+
+	def get_summary(self):
+		summary="developable: %s parts: %d closed: %d flipped: %d max edge distortion: %.2f%% max area distortion: %.2f%% (%.3fs)"%(
+			self.is_developable(),
+			self.parts,
+			self.closed_parts,
+			self.flipped_triangles,
+			self.get_max_edge_distortion()*100,
+			self.get_max_area_distortion()*100,
+			self.solve_time)
+
+		if self.unconverged_solves>0:
+			summary+=" - %d solves not converged (residual %.1e)"%(self.unconverged_solves,self.max_residual)
+
+		return summary
+
+
+# Coordinates of each triangle in its own plane - (M,3,2) with the first vertex at the
+# origin and the second on the X axis, and (M,) triangle areas
+def get_triangle_frames(vertices,triangles):
+	a=vertices[triangles[:,0]]
+	b=vertices[triangles[:,1]]
+	c=vertices[triangles[:,2]]
+
+	ab=b-a
+	ac=c-a
+
+	ab_length=np.linalg.norm(ab,axis=1)
+	normal=np.cross(ab,ac)
+	double_area=np.linalg.norm(normal,axis=1)
+
+	x_axis=ab/np.maximum(ab_length,1e-30)[:,None]
+	y_axis=np.cross(normal/np.maximum(double_area,1e-30)[:,None],x_axis)
+
+	frames=np.zeros((len(triangles),3,2))
+	frames[:,1,0]=ab_length
+	frames[:,2,0]=np.einsum('ij,ij->i',ac,x_axis)
+	frames[:,2,1]=np.einsum('ij,ij->i',ac,y_axis)
+
+	return frames,double_area/2
+
+# component label of each vertex - vertices connected through triangles share a label
+def get_vertex_components(vertex_count,triangles):
+	a=triangles.ravel()
+	b=np.roll(triangles,1,axis=1).ravel()
+
+	if scipy!=None:
+		graph=scipy.sparse.coo_matrix((np.ones(len(a)),(a,b)),shape=(vertex_count,vertex_count))
+		component_count,labels=scipy.sparse.csgraph.connected_components(graph,directed=False)
+		return labels
+
+	# hook the lower label of each edge onto the root of the other and jump pointers
+	labels=np.arange(vertex_count)
+
+	while True:
+		previous_labels=labels.copy()
+
+		lowest=np.minimum(labels[a],labels[b])
+		np.minimum.at(labels,labels[a],lowest)
+		np.minimum.at(labels,labels[b],lowest)
+
+		while True:
+			jumped=labels[labels]
+
+			if np.array_equal(jumped,labels):
+				break
+
+			labels=jumped
+
+		if np.array_equal(labels,previous_labels):
+			return np.unique(labels,return_inverse=True)[1]
+
+def get_boundary_vertices(triangles):
+	edges=np.sort(np.stack([triangles,np.roll(triangles,-1,axis=1)],axis=2).reshape(-1,2),axis=1)
+	unique_edges,counts=np.unique(edges,axis=0,return_counts=True)
+
+	return np.unique(unique_edges[counts==1])
+
+# signed area of flat triangles (M,3,2)
+def get_signed_areas(flat):
+	ab=flat[:,1]-flat[:,0]
+	ac=flat[:,2]-flat[:,0]
+
+	return (ab[:,0]*ac[:,1]-ab[:,1]*ac[:,0])/2
+
+# coarse group (0..) of each point (N,2) - cells of a grid over the points with about
+# group_count cells, empty cells are left out
+def get_grid_groups(points,group_count):
+	extent=np.maximum(np.ptp(points,axis=0),1e-30)
+
+	x_cells=max(1,int(round(np.sqrt(group_count*extent[0]/extent[1]))))
+	y_cells=max(1,int(round(group_count/x_cells)))
+
+	cells=np.floor((points-points.min(axis=0))/extent*[x_cells,y_cells]).astype(np.int64)
+	cells=np.minimum(cells,[x_cells-1,y_cells-1])
+
+	return np.unique(cells[:,0]*y_cells+cells[:,1],return_inverse=True)[1].ravel()
+
+# coarse groups of the vertices of a part for the two level preconditioner - None when
+# scipy solves directly or the part is small enough for Jacobi alone
+def get_coarse_groups(points):
+	group_count=min(len(points)//coarse_group_size,max_coarse_groups)
+
+	if scipy!=None or group_count<2:
+		return None
+
+	return get_grid_groups(points,group_count)
+
+# Least squares conformal map of one part - vertices (N,3) and triangles of the part
+# pinned are two vertex indices placed at (0,0) and (pin_distance,0)
+# result (optional develop_result) gets the solver statistics
+def solve_lscm(vertices,triangles,frames,areas,pinned,pin_distance,result=None,tolerance=1e-9):
+	vertex_count=len(vertices)
+	triangle_count=len(triangles)
+
+	# W_j=(x_l-x_k)+i(y_l-y_k) for each corner j with (j,k,l) cyclic
+	w=np.roll(frames,-2,axis=1)-np.roll(frames,-1,axis=1)
+	w=w/np.sqrt(2*areas)[:,None,None]
+
+	# sum_j W_j (u_j+i v_j)=0 - real and imaginary rows of each triangle
+	# columns are u of each vertex followed by v of each vertex
+	real_rows=np.repeat(np.arange(triangle_count)*2,6)
+	imaginary_rows=real_rows+1
+
+	u_columns=triangles
+	v_columns=triangles+vertex_count
+
+	real_columns=np.concatenate([u_columns,v_columns],axis=1).ravel()
+	real_values=np.concatenate([w[:,:,0],-w[:,:,1]],axis=1).ravel()
+	imaginary_values=np.concatenate([w[:,:,1],w[:,:,0]],axis=1).ravel()
+
+	rows=np.concatenate([real_rows,imaginary_rows])
+	columns=np.concatenate([real_columns,real_columns])
+	values=np.concatenate([real_values,imaginary_values])
+
+	pinned_values=np.zeros(vertex_count*2)
+	pinned_values[pinned[1]]=pin_distance
+
+	pinned_columns=np.zeros(vertex_count*2,dtype=bool)
+	pinned_columns[[pinned[0],pinned[1],pinned[0]+vertex_count,pinned[1]+vertex_count]]=True
+
+	# conjugate gradients start from the plate projected on its plane
+	initial_uvs=get_projected_uvs(vertices,triangles,pinned,pin_distance)
+	initial=np.concatenate([initial_uvs[:,0],initial_uvs[:,1]])
+
+	vertex_groups=get_coarse_groups(initial_uvs)
+
+	groups=None
+	basis=None
+
+	if vertex_groups is not None:
+		# u and v of a group move together: translation, rotation and scale around its center
+		group_count=vertex_groups.max()+1
+
+		centers=np.stack([np.bincount(vertex_groups,initial_uvs[:,axis])/np.bincount(vertex_groups) for axis in range(2)],axis=1)
+		local=initial_uvs-centers[vertex_groups]
+		local/=max(np.abs(local).max(),1e-30)
+
+		zero=np.zeros(vertex_count)
+		one=np.ones(vertex_count)
+
+		groups=np.concatenate([vertex_groups,vertex_groups])
+		basis=np.concatenate([np.stack([one,zero,-local[:,1],local[:,0]],axis=1),
+			np.stack([zero,one,local[:,0],local[:,1]],axis=1)])
+
+	system,free_columns,pinned_rhs=get_pinned_system(rows,columns,values,triangle_count*2,vertex_count*2,
+		pinned_columns,pinned_values,groups,basis)
+
+	solution=pinned_values.copy()
+	solution[free_columns]=system.solve(pinned_rhs,initial[free_columns],tolerance)
+
+	if result!=None:
+		result.add_solve_stats(system)
+
+	return np.stack([solution[:vertex_count],solution[vertex_count:]],axis=1)
+
+# Vertices projected on the best fit plane, same orientation as the triangles and
+# moved so the pinned vertices are at (0,0) and (pin_distance,0)
+def get_projected_uvs(vertices,triangles,pinned,pin_distance):
+	centered=vertices-vertices.mean(axis=0)
+
+	axes=np.linalg.svd(centered,full_matrices=False)[2]
+	projected=centered@axes[:2].T
+
+	if get_signed_areas(projected[triangles]).sum()<0:
+		projected[:,1]*=-1
+
+	# similarity transform as complex numbers
+	points=projected[:,0]+1j*projected[:,1]
+	pin_span=points[pinned[1]]-points[pinned[0]]
+
+	if abs(pin_span)<1e-30:
+		return np.zeros((len(vertices),2))
+
+	points=(points-points[pinned[0]])/pin_span*pin_distance
+
+	return np.stack([points.real,points.imag],axis=1)
+
+# the system of the free columns and the right hand side the pinned columns add
+# groups and basis (optional) are the coarse space - see sparse_least_squares
+def get_pinned_system(rows,columns,values,row_count,column_count,pinned_columns,pinned_values,groups=None,basis=None):
+	is_pinned=pinned_columns[columns]
+
+	pinned_rhs=-np.bincount(rows[is_pinned],values[is_pinned]*pinned_values[columns[is_pinned]],minlength=row_count)
+
+	free_columns=np.flatnonzero(~pinned_columns)
+
+	column_map=np.full(column_count,-1)
+	column_map[free_columns]=np.arange(len(free_columns))
+
+	free_groups=None
+	free_basis=None
+
+	if groups is not None:
+		free_groups=np.unique(groups[free_columns],return_inverse=True)[1].ravel()
+
+		if basis is not None:
+			free_basis=basis[free_columns]
+
+	system=sparse_least_squares(rows[~is_pinned],
+		column_map[columns[~is_pinned]],
+		values[~is_pinned],
+		row_count,
+		len(free_columns),
+		free_groups,
+		free_basis)
+
+	return system,free_columns,pinned_rhs
+
+# As rigid as possible iterations - uvs (N,2) are moved so each triangle is a rotated
+# copy of its frame. Edges are weighted by the cotangent of the opposite angle.
+# Every solve starts from the uvs of the previous iteration.
+def solve_arap(vertex_count,triangles,frames,uvs,iterations,pinned,result=None):
+	triangle_count=len(triangles)
+
+	# edge k of a triangle goes from corner k to corner k+1, opposite corner k+2
+	start_corner=np.array([0,1,2])
+	end_corner=np.array([1,2,0])
+	opposite_corner=np.array([2,0,1])
+
+	edge_vectors=frames[:,end_corner]-frames[:,start_corner]
+
+	first=frames[:,start_corner]-frames[:,opposite_corner]
+	second=frames[:,end_corner]-frames[:,opposite_corner]
+
+	cross=np.abs(first[:,:,0]*second[:,:,1]-first[:,:,1]*second[:,:,0])
+	cotangents=np.einsum('ijk,ijk->ij',first,second)/np.maximum(cross,1e-30)
+
+	weights=np.sqrt(np.maximum(cotangents/2,1e-4))
+
+	# row per triangle edge: weight*(u_end-u_start)=weight*(R edge)
+	rows=np.repeat(np.arange(triangle_count*3),2)
+	columns=np.stack([triangles[:,end_corner],triangles[:,start_corner]],axis=2).ravel()
+	values=(weights[:,:,None]*np.array([1.0,-1.0])).ravel()
+
+	pinned_columns=np.zeros(vertex_count,dtype=bool)
+	pinned_columns[pinned]=True
+
+	# inverse of the frame edge matrix for the jacobians of the flat triangles
+	frame_edges=np.stack([frames[:,1]-frames[:,0],frames[:,2]-frames[:,0]],axis=2)
+	inverse_frame_edges=np.linalg.inv(frame_edges)
+
+	for iteration in range(iterations):
+
+		# closest rotation to the jacobian of each triangle
+		flat=uvs[triangles]
+		flat_edges=np.stack([flat[:,1]-flat[:,0],flat[:,2]-flat[:,0]],axis=2)
+		jacobians=flat_edges@inverse_frame_edges
+
+		left,singular,right=np.linalg.svd(jacobians)
+
+		reflected=np.linalg.det(left@right)<0
+		left[reflected,:,1]*=-1
+
+		rotations=left@right
+
+		targets=np.einsum('ijk,ilk->ilj',rotations,edge_vectors)*weights[:,:,None]
+		targets=targets.reshape(-1,2)
+
+		if iteration==0:
+			system,free_columns,pinned_factor=get_pinned_system(rows,columns,values,
+				triangle_count*3,vertex_count,pinned_columns,np.ones(vertex_count),
+				get_coarse_groups(uvs))
+
+		for axis in range(2):
+			pinned_values=np.zeros(vertex_count)
+			pinned_values[pinned]=uvs[pinned,axis]
+
+			# pinned_factor is the pinned column contribution for pinned values of 1
+			solution=uvs[:,axis].copy()
+			solution[free_columns]=system.solve(targets[:,axis]+pinned_factor*uvs[pinned,axis],
+				uvs[free_columns,axis])
+
+			uvs[:,axis]=solution
+
+	if iterations>0 and result!=None:
+		result.add_solve_stats(system)
+
+	return uvs
+
+# Develop (unfold) a plate - vertices (N,3) triangles (M,3)
+# triangle_faces (M,) optional face index of each triangle for per face distortion
+def develop_plate(vertices,triangles,triangle_faces=None,arap_iterations=5,part_margin=0.05):
+
+	start_time=time.time()
+
+	vertices=np.asarray(vertices,dtype=np.float64).reshape(-1,3)
+	triangles=np.asarray(triangles,dtype=np.int64).reshape(-1,3)
+
+	result=develop_result()
+	result.uvs=np.zeros((len(vertices),2))
+
+	frames,areas=get_triangle_frames(vertices,triangles)
+
+	valid=areas>area_epsilon
+
+	labels=get_vertex_components(len(vertices),triangles[valid])
+	triangle_labels=labels[triangles[:,0]]
+
+	boundary=np.zeros(len(vertices),dtype=bool)
+	boundary[get_boundary_vertices(triangles[valid])]=True
+
+	part_offset=0
+
+	for label in np.unique(triangle_labels[valid]):
+
+		part_triangles=valid&(triangle_labels==label)
+
+		part_vertices=np.unique(triangles[part_triangles])
+
+		vertex_map=np.zeros(len(vertices),dtype=np.int64)
+		vertex_map[part_vertices]=np.arange(len(part_vertices))
+
+		local_triangles=vertex_map[triangles[part_triangles]]
+		local_vertices=vertices[part_vertices]
+
+		result.parts+=1
+
+		if not boundary[part_vertices].any():
+			result.closed_parts+=1
+
+		# pins at the ends of the longest side of the bounding box
+		extent_axis=np.argmax(np.ptp(local_vertices,axis=0))
+		pinned=[int(np.argmin(local_vertices[:,extent_axis])),int(np.argmax(local_vertices[:,extent_axis]))]
+		pin_distance=np.linalg.norm(local_vertices[pinned[1]]-local_vertices[pinned[0]])
+
+		# ARAP moves every vertex again - the conformal map is only its starting point
+		lscm_tolerance=1e-9
+
+		if arap_iterations>0:
+			lscm_tolerance=lscm_arap_tolerance
+
+		uvs=solve_lscm(local_vertices,local_triangles,frames[part_triangles],areas[part_triangles],pinned,pin_distance,
+			result,lscm_tolerance)
+
+		# the conformal map is right up to scale and may be mirrored
+		flat_areas=get_signed_areas(uvs[local_triangles])
+
+		if flat_areas.sum()<0:
+			uvs[:,1]*=-1
+
+		uvs*=np.sqrt(areas[part_triangles].sum()/max(np.abs(flat_areas).sum(),1e-30))
+
+		if arap_iterations>0:
+			uvs=solve_arap(len(part_vertices),local_triangles,frames[part_triangles],uvs,arap_iterations,pinned[0],result)
+
+		# parts side by side along X
+		uvs-=uvs.min(axis=0)
+		uvs[:,0]+=part_offset
+
+		part_size=uvs.max(axis=0)-uvs.min(axis=0)
+		part_offset=uvs[:,0].max()+part_margin*max(part_size.max(),1e-6)
+
+		result.uvs[part_vertices]=uvs
+
+	flat=result.uvs[triangles]
+	flat_areas=get_signed_areas(flat)
+
+	safe_areas=np.where(valid,areas,1)
+
+	result.area_distortion=np.where(valid,np.abs(flat_areas)/safe_areas-1,0)
+	result.flipped_triangles=int(np.count_nonzero(valid&(flat_areas<0)))
+
+	lengths=np.linalg.norm(vertices[np.roll(triangles,-1,axis=1)]-vertices[triangles],axis=2)
+	flat_lengths=np.linalg.norm(np.roll(flat,-1,axis=1)-flat,axis=2)
+
+	edge_distortion=np.abs(flat_lengths/np.maximum(lengths,1e-30)-1).max(axis=1)
+	result.edge_distortion=np.where(valid,edge_distortion,0)
+
+	if triangle_faces is not None:
+		triangle_faces=np.asarray(triangle_faces,dtype=np.int64)
+		face_count=triangle_faces.max()+1 if len(triangle_faces)>0 else 0
+
+		face_areas=np.bincount(triangle_faces,areas,minlength=face_count)
+		weighted_distortion=np.bincount(triangle_faces,areas*result.area_distortion,minlength=face_count)
+
+		result.face_area_distortion=weighted_distortion/np.maximum(face_areas,1e-30)
+
+		result.face_edge_distortion=np.zeros(face_count)
+		np.maximum.at(result.face_edge_distortion,triangle_faces,result.edge_distortion)
+
+	result.solve_time=time.time()-start_time
+
+	return result
@@ -1,6 +1,17 @@
 import bpy
 import bmesh
 import math
+import heapq
+import numpy as np
+
+from ..hullgen import develop_helper
+
+# print the unfolding of every face and loop - very slow on large plates
+verbose=False
+
+def log(*args,**kwargs):
+	if verbose:
+		print(*args,**kwargs)
 
 def get_bmvert_coords_text(bmvert):
 	text="%f,%f,%f"%(bmvert.co[0],bmvert.co[1],bmvert.co[2])
@@ -99,7 +110,7 @@ def measure_angle_between_verts(verts):
 		diffX,diffY,
 		flipped)
 
-	print(status)
+	log(status)
 
 	return angle
 
@@ -116,10 +127,10 @@ def getThirdPoint(v0, v1, l01, l12, l20):
 	v2trans0 = (v2rotx * math.cos(theta) - v2roty0 * math.sin(theta), v2rotx * math.sin(theta) + v2roty0 * math.cos(theta), 0)
 	v2trans1 = (v2rotx * math.cos(theta) - v2roty1 * math.sin(theta), v2rotx * math.sin(theta) + v2roty1 * math.cos(theta), 0)
 
-	print("trans0:",end=" ")
-	print(v2trans0)        
-	print("trans1:",end=" ")
-	print(v2trans1)
+	log("trans0:",end=" ")
+	log(v2trans0)        
+	log("trans1:",end=" ")
+	log(v2trans1)
 	
 	ret = ((v2trans0[0]+v0[0],v2trans0[1]+v0[1],v2trans0[2]+v0[2]),
 		(v2trans1[0]+v0[0],v2trans1[1]+v0[1],v2trans1[2]+v0[2]))
@@ -242,7 +253,7 @@ class mapped_face:
 
 		if vert_count==0:
 			# New Face
-			print("Reference Zero Vert")
+			log("Reference Zero Vert")
 			new_vert=bm_new.verts.new([0,0,0])
 			#self.increment_angle(angle)
 		else:
@@ -257,7 +268,7 @@ class mapped_face:
 				newpos=[-self.last_distance,0]
 				#angle_used=math.radians(angle)
 			else:
-				print("generate_remapped_bmvert - vert count: %d"%vert_count,end=" ")
+				log("generate_remapped_bmvert - vert count: %d"%vert_count,end=" ")
 
 
 				# TODO - increment actual angle 
@@ -284,13 +295,13 @@ class mapped_face:
 					#self.increment_angle(self.last_angle)
 				self.increment_angle(self.last_angle)
 
-				print("last angle: %d %s ld: %f"%(
+				log("last angle: %d %s ld: %f"%(
 					round(math.degrees(self.last_angle)),
 					reciprocal_text,
 					self.last_distance),
 					end=" ")
 
-				print("total angle: %d"%(round(math.degrees(self.total_angle))))
+				log("total angle: %d"%(round(math.degrees(self.total_angle))))
 
 				newpos=get_vector_position(x,y,
 					self.total_angle,
@@ -317,13 +328,17 @@ class mapped_mesh:
 	# a list of new mapped verts that have been newly generated
 	mapped_verts=None
 
-	# a list of faces from bm_old that have been process already
+	# mapped verts by coordinates of the original vert (get_vert_key)
+	mapped_vert_lookup=None
+
+	# a set of faces from bm_old that have been process already
 	processed_faces=None
 
 	def __init__(self,bm_new):
 		self.mapped_faces=[]
 		self.mapped_verts=[]
-		self.processed_faces=[]
+		self.mapped_vert_lookup={}
+		self.processed_faces=set()
 
 		self.bm_new=bm_new
 
@@ -361,8 +376,8 @@ class mapped_mesh:
 		newface = mapped_face(flipped=flipped)
 		center_median=f.calc_center_median()
 
-		print("=============================================================")
-		print("New Face starting: %d Normal: %s center_median: %s"%(f.index,f.normal,center_median))
+		log("=============================================================")
+		log("New Face starting: %d Normal: %s center_median: %s"%(f.index,f.normal,center_median))
 
 		self.mapped_faces.append(newface)
 
@@ -381,7 +396,7 @@ class mapped_mesh:
 
 			continue_search=True
 
-			print("Searching for subsequent mapped loop pairs...",end="")
+			log("Searching for subsequent mapped loop pairs...",end="")
 
 			while continue_search:
 
@@ -396,7 +411,7 @@ class mapped_mesh:
 					eval_loop=next_loop
 
 					if eval_loop==start_loop:
-						print("No pairs found!")
+						log("No pairs found!")
 						continue_search=False
 
 				else:
@@ -406,14 +421,14 @@ class mapped_mesh:
 
 					verts=[]
 
-					print("Found pair")
+					log("Found pair")
 
 					verts.append( [ first_mapping.mapped_vert.co[0],  first_mapping.mapped_vert.co[1]  ] )
 					verts.append( [ second_mapping.mapped_vert.co[0], second_mapping.mapped_vert.co[1] ] )
 
 					angle_diff=measure_angle_between_verts(verts)
 
-					print(" diff angle: %d"%round(math.degrees(angle_diff)))
+					log(" diff angle: %d"%round(math.degrees(angle_diff)))
 
 					newface.increment_angle(angle_diff)
 
@@ -438,7 +453,7 @@ class mapped_mesh:
 			angle=eval_loop.calc_angle()
 			#angle=edge_angle(eval_loop.edge,next_loop.edge,normal)
 
-			print("Edge Corner", eval_loop.edge.index, next_loop.edge.index, "Angle:", round(math.degrees(angle)))
+			log("Edge Corner", eval_loop.edge.index, next_loop.edge.index, "Angle:", round(math.degrees(angle)))
 
 
 
@@ -498,19 +513,20 @@ class mapped_mesh:
 
 			newface.add_vert(mapped_vert,is_reused_vert)
 
-			vert_info="Original: (%f,%f,%f) Mapped: (%f,%f,%f) %s  total: %d"%(
+			if verbose:
+				vert_info="Original: (%f,%f,%f) Mapped: (%f,%f,%f) %s  total: %d"%(
+					
+					mapped_vert.original_vert.co[0],
+					mapped_vert.original_vert.co[1],
+					mapped_vert.original_vert.co[2],
+
+					mapped_vert.mapped_vert.co[0],
+					mapped_vert.mapped_vert.co[1],
+					mapped_vert.mapped_vert.co[2],
+					status,
+					round(math.degrees(newface.total_angle)))
 				
-				mapped_vert.original_vert.co[0],
-				mapped_vert.original_vert.co[1],
-				mapped_vert.original_vert.co[2],
-
-				mapped_vert.mapped_vert.co[0],
-				mapped_vert.mapped_vert.co[1],
-				mapped_vert.mapped_vert.co[2],
-				status,
-				round(math.degrees(newface.total_angle)))
-			
-			print("loop angle: %d length: %f - %s"%(round(angle_degrees),length,vert_info))
+				log("loop angle: %d length: %f - %s"%(round(angle_degrees),length,vert_info))
 
 			eval_loop=next_loop
 
@@ -518,16 +534,37 @@ class mapped_mesh:
 			if eval_loop==start_loop:
 				continue_search=False
 
-		self.processed_faces.append(f)
+		self.processed_faces.add(f)
+
+		#flipped=not flipped
 
-		# recursively process connected faces
-		for face_edge in f.edges:
-			for linked_face in face_edge.link_faces:
-				self.process_face(linked_face)
+	# Unfold the faces connected to first_face breadth first from a queue ordered by
+	# the angle between the faces - faces across the flattest edges are unfolded
+	# first so the layout spreads over the flat parts of a plate before the bends
+	def process_connected_faces(self,first_face):
 
+		# (angle,order,face) - order keeps faces with the same angle first in first out
+		face_queue=[(0,0,first_face)]
+		queued_count=1
 
+		while len(face_queue)>0:
+			angle,order,f=heapq.heappop(face_queue)
 
-		#flipped=not flipped
+			if f in self.processed_faces:
+				# queued again across another edge
+				continue
+
+			self.process_face(f)
+
+			for face_edge in f.edges:
+
+				# pi for edges that don't join exactly two faces
+				edge_angle=face_edge.calc_face_angle(math.pi)
+
+				for linked_face in face_edge.link_faces:
+					if linked_face not in self.processed_faces:
+						heapq.heappush(face_queue,(edge_angle,queued_count,linked_face))
+						queued_count+=1
 
 	def remap_mesh(self,bm_old):
 
@@ -538,8 +575,8 @@ class mapped_mesh:
 		if len(bm_old.faces)>0:
 			first_face=bm_old.faces[0]
 
-			# this function will recursively add other faces connected to original face
-			self.process_face(first_face)
+			# adds the other faces connected to original face
+			self.process_connected_faces(first_face)
 			
 		#for f in bm_old.faces:
 
@@ -563,14 +600,13 @@ class mapped_mesh:
 				
 
 	
-	def lookup_vert(self,search_vert):
+	# verts are matched by exact coordinates so verts that are split in the
+	# original mesh (same location) map to the same flattened vert
+	def get_vert_key(self,vert):
+		return (vert.co[0],vert.co[1],vert.co[2])
 
-		for v in self.mapped_verts:
-
-			if v.original_vert.co[0]==search_vert.co[0] and v.original_vert.co[1]==search_vert.co[1] and v.original_vert.co[2]==search_vert.co[2]:
-				return v
-
-		return None
+	def lookup_vert(self,search_vert):
+		return self.mapped_vert_lookup.get(self.get_vert_key(search_vert))
 
 
 	def add_mapped_bmvert(self,original_vert,new_mapped_bmvert):
@@ -580,6 +616,9 @@ class mapped_mesh:
 
 		self.mapped_verts.append(new_mapped_vert)
 
+		# first mapping of a location wins like the old linear search
+		self.mapped_vert_lookup.setdefault(self.get_vert_key(original_vert),new_mapped_vert)
+
 		return new_mapped_vert
 
 	def generate_mapped_vert(self,original_vert):
@@ -595,8 +634,55 @@ class mapped_mesh:
 
 
 
+# vertices (object scale applied), triangles and face index of each triangle of obj
+def read_plate_mesh(obj):
+	mesh=obj.data
+	mesh.calc_loop_triangles()
+
+	vertices=np.empty(len(mesh.vertices)*3,dtype=np.float64)
+	mesh.vertices.foreach_get("co",vertices)
+
+	triangles=np.empty(len(mesh.loop_triangles)*3,dtype=np.int64)
+	mesh.loop_triangles.foreach_get("vertices",triangles)
+
+	triangle_faces=np.empty(len(mesh.loop_triangles),dtype=np.int64)
+	mesh.loop_triangles.foreach_get("polygon_index",triangle_faces)
+
+	vertices=vertices.reshape(-1,3)*np.array(obj.scale)
+
+	return vertices,triangles.reshape(-1,3),triangle_faces
+
+# Develops obj with develop_helper and stores the flat pattern in uv layer uv_layer_name
+# (made active) - returns develop_helper.develop_result with per face distortion
+def develop_plate_object(obj,uv_layer_name="hullgen_developed",arap_iterations=5):
+	vertices,triangles,triangle_faces=read_plate_mesh(obj)
+
+	result=develop_helper.develop_plate(vertices,triangles,triangle_faces,arap_iterations=arap_iterations)
+
+	mesh=obj.data
+
+	uv_layer=mesh.uv_layers.get(uv_layer_name)
+
+	if uv_layer==None:
+		uv_layer=mesh.uv_layers.new(name=uv_layer_name)
+
+	mesh.uv_layers.active=uv_layer
+
+	loop_vertices=np.empty(len(mesh.loops),dtype=np.int64)
+	mesh.loops.foreach_get("vertex_index",loop_vertices)
+
+	uv_layer.data.foreach_set("uv",result.uvs[loop_vertices].astype(np.float32).ravel())
+
+	mesh.update()
+
+	return result
+
+
 class flatten_helper():
 
+	# develop plates with develop_helper - False uses the face by face unfolding (mapped_mesh)
+	use_develop=True
+
 	   
 	def print_angles(self):
 		scene = bpy.context.scene
@@ -724,13 +810,55 @@ class flatten_helper():
 
 
 
+	# flat copy of plate obj from the developed uv layer placed above obj like clone_object_faces
+	def develop_object_faces(self,selected_object):
+
+		result=develop_plate_object(selected_object)
+
+		mesh_data=selected_object.data.copy()
+		mesh_data.name="%s_developed"%selected_object.name
+
+		flat_vertices=np.zeros((len(mesh_data.vertices),3),dtype=np.float32)
+		flat_vertices[:,:2]=result.uvs
+
+		mesh_data.vertices.foreach_set("co",flat_vertices.ravel())
+		mesh_data.update()
+
+		mesh_obj = bpy.data.objects.new(mesh_data.name, mesh_data)
+		bpy.context.collection.objects.link(mesh_obj)
+
+		mesh_obj.location=selected_object.location
+		mesh_obj.location.z=selected_object.location.z+1
+
+		print("Develop %s: %s"%(selected_object.name,result.get_summary()))
+
+		return result
+
 	def flatten_plates(self):
 
 		#self.make_shape()
 
 		#return self.measure_angle()
 
+		plates=0
+		not_developable=[]
+
 		for obj in bpy.context.selected_objects:
 			if obj.type=="MESH":
-				self.clone_object_faces(obj)
+				if self.use_develop:
+					result=self.develop_object_faces(obj)
+
+					if not result.is_developable():
+						not_developable.append(obj.name)
+				else:
+					self.clone_object_faces(obj)
+
+				plates+=1
 		#self.print_angles()
+
+		summary="%d plates flattened"%plates
+
+		if len(not_developable)>0:
+			summary+=" not developable: %s"%", ".join(not_developable)
+
+		return summary
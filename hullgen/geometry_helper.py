@@ -18,15 +18,20 @@
 
 import bpy
 import hashlib
+from array import array
+from collections import OrderedDict
 from math import radians, degrees
 from mathutils import Vector, Matrix
 import bmesh
+import time
+import numpy as np
 from mathutils.bvhtree import BVHTree
 
 from ..hullgen import curve_helper
 from ..hullgen import material_helper
 from ..hullgen import measure_helper
 from ..hullgen import bpy_helper
+from ..hullgen import mesh_cache
 
 def separate_active_by_material():
 	selected_object=bpy.context.view_layer.objects.active
@@ -171,17 +176,276 @@ def apply_object_bools(obj):
 			bpy.ops.object.modifier_apply(modifier=modifier.name)
 
 
-def apply_all_bool_modifiers():
+# material for faces cut by boolean_target_object
+def get_slicer_material(boolean_target_object):
+	color_value_list=get_color_from_hash_string(boolean_target_object.name)
+	new_material_name="slicer_%s"%boolean_target_object.name
+
+	if new_material_name in bpy.data.materials:
+		return bpy.data.materials[new_material_name]
+
+	return material_helper.make_subsurf_material(new_material_name,color_value_list)
+
+# modifier_apply one boolean at a time - faces of the cutter are selected in edit mode
+# before the apply so the faces it leaves behind can be found afterwards
+def apply_bool_modifiers_ops(obj):
+	for modifier in obj.modifiers:
+		if modifier.type=='BOOLEAN':
+			boolean_target_object=modifier.object
+			if boolean_target_object!=None:
+				slicer_material=get_slicer_material(boolean_target_object)
+
+				obj.data.materials.append(slicer_material)
+
+				# Material index of new material should be last in list
+				new_material_index=len(obj.data.materials)-1
+
+				bpy.context.view_layer.objects.active = boolean_target_object
+
+				bpy.ops.object.mode_set(mode='EDIT')
+				bpy.ops.mesh.select_mode(type="FACE")
+				bpy.ops.mesh.select_all(action='SELECT')
+				bpy.ops.object.mode_set(mode='OBJECT')
+
+				# select all faces for material assignment to occur
+				#for face in obj.data.polygons:
+				#	face.select=True
+
+				bpy.context.view_layer.objects.active = obj
+				
+				print("Applying object: %s"%obj.name)
+
+				bpy.ops.object.mode_set(mode='EDIT')
+				bpy.ops.mesh.select_mode(type="FACE")
+				bpy.ops.mesh.select_all(action='DESELECT')
+				bpy.ops.object.mode_set(mode='OBJECT')
+
+				#for face in obj.data.polygons:
+				#	face.select=False
+
+				bpy.ops.object.modifier_apply(modifier=modifier.name)
+
+				for f in obj.data.polygons:
+					if f.select:
+						f.material_index=new_material_index
+
+
+# face attribute that tags every face with the id of the object it came from
+cutter_attribute_name="hullgen_cutter"
+
+def get_face_domain():
+	if bpy.app.version>=(2,93,0):
+		return 'FACE'
+
+	return 'POLYGON'
+
+# objects cutting obj with enabled boolean modifiers
+def get_boolean_cutters(obj):
+	cutters=[]
+
+	for modifier in obj.modifiers:
+		if modifier.type=='BOOLEAN' and modifier.show_viewport:
+			if getattr(modifier,"operand_type","OBJECT")=="COLLECTION":
+				if modifier.collection!=None:
+					cutters.extend(modifier.collection.all_objects)
+			elif modifier.object!=None:
+				cutters.append(modifier.object)
+
+	return [cutter for cutter in cutters if cutter.type=="MESH"]
+
+def set_cutter_attribute(obj,value):
+	mesh=obj.data
+
+	attribute=mesh.attributes.get(cutter_attribute_name)
+
+	if attribute==None:
+		attribute=mesh.attributes.new(name=cutter_attribute_name,type='INT',domain=get_face_domain())
+
+	attribute.data.foreach_set("value",np.full(len(mesh.polygons),value,dtype=np.int32))
+
+def remove_cutter_attribute(obj):
+	attribute=obj.data.attributes.get(cutter_attribute_name)
+
+	if attribute!=None:
+		obj.data.attributes.remove(attribute)
+
+# returns per face cutter id array of an evaluated mesh or None if the boolean
+# did not carry the attribute through
+def get_cutter_ids(mesh):
+	attribute=mesh.attributes.get(cutter_attribute_name)
+
+	if attribute==None or len(attribute.data)!=len(mesh.polygons):
+		return None
+
+	cutter_ids=np.zeros(len(mesh.polygons),dtype=np.int32)
+	attribute.data.foreach_get("value",cutter_ids)
+
+	return cutter_ids
+
+# ids that can appear in the evaluated mesh of obj - its own and those of the cutters
+# it is made from, recursively
+def get_cutter_closure(obj,object_ids,closures):
+
+	if obj.name not in closures:
+		# a cutter cycle would recurse forever - blender refuses to evaluate one anyway
+		closures[obj.name]=set([object_ids[obj.name]])
+
+		closure=set([object_ids[obj.name]])
+
+		for cutter in get_boolean_cutters(obj):
+			closure|=get_cutter_closure(cutter,object_ids,closures)
+
+		closures[obj.name]=closure
+
+	return closures[obj.name]
+
+# array mapping every id in the evaluated mesh of target to the id of the cutter of
+# target it came through - faces of a nested cutter belong to the outermost cutter
+def get_cutter_id_map(target,object_ids,closures):
+
+	id_map=np.arange(len(object_ids)+1,dtype=np.int32)
+
+	cutters=get_boolean_cutters(target)
+
+	for cutter in cutters:
+		for object_id in get_cutter_closure(cutter,object_ids,closures):
+			id_map[object_id]=object_ids[cutter.name]
 
-	# faster implementation maybe in future instead of bpy.ops operations?
-	#mesh = your_object.to_mesh(scene = bpy.context.scene, apply_modifiers = True, settings = 'PREVIEW')
+	# direct cutters and the target itself win over a nested cutter with the same id
+	for obj in cutters+[target]:
+		id_map[object_ids[obj.name]]=object_ids[obj.name]
+
+	return id_map
+
+# Applies the boolean modifiers of all objects from one depsgraph evaluation.
+# Every object taking part gets an id in a face attribute - the exact boolean
+# copies it to the faces it takes from each cutter, so after evaluation the faces
+# of each cutter are known without selecting anything in edit mode.
+def apply_all_bool_modifiers_evaluated():
+
+	start_time=time.time()
+
+	targets=[obj for obj in bpy.data.objects if obj.type=="MESH" and len(get_boolean_cutters(obj))>0]
+
+	# a shared mesh would be written for every object using it - targets get their
+	# own mesh like modifier_apply needs, cutters a copy for the evaluation only
+	for target in targets:
+		if target.data.users>1:
+			target.data=target.data.copy()
+
+	object_ids={}
+	cutter_meshes=[]
+
+	for target in targets:
+		for obj in [target]+get_boolean_cutters(target):
+			if obj.name not in object_ids:
+				object_ids[obj.name]=len(object_ids)+1
+
+				if obj.data.users>1:
+					cutter_meshes.append((obj,obj.data))
+					obj.data=obj.data.copy()
+
+				set_cutter_attribute(obj,object_ids[obj.name])
+
+	# only booleans are applied - other modifiers stay on the stack
+	disabled_modifiers=[]
+
+	try:
+		for target in targets:
+			for modifier in target.modifiers:
+				if modifier.type!='BOOLEAN' and modifier.show_viewport:
+					modifier.show_viewport=False
+					disabled_modifiers.append(modifier)
+
+		depsgraph=bpy.context.evaluated_depsgraph_get()
+
+		print("Evaluated %d objects %.3fs"%(len(targets),time.time()-start_time))
+
+		# copy every result before writing any mesh back - writing changes the cutters of others
+		results=[]
+		fallback_targets=[]
+
+		closures={}
+
+		for target in targets:
+			object_start_time=time.time()
+
+			target_eval=target.evaluated_get(depsgraph)
+			mesh_eval=target_eval.to_mesh()
+
+			cutter_ids=get_cutter_ids(mesh_eval)
+
+			if cutter_ids is None:
+				fallback_targets.append(target)
+			else:
+				cutter_ids=get_cutter_id_map(target,object_ids,closures)[cutter_ids]
+
+				result=bmesh.new()
+				result.from_mesh(mesh_eval)
+				results.append((target,result,cutter_ids,time.time()-object_start_time))
+
+			target_eval.to_mesh_clear()
+
+		for modifier in disabled_modifiers:
+			modifier.show_viewport=True
+
+		disabled_modifiers=[]
+
+		id_objects={}
+
+		for name,object_id in object_ids.items():
+			id_objects[object_id]=bpy.data.objects[name]
+
+		for target,result,cutter_ids,evaluation_time in results:
+			object_start_time=time.time()
+
+			result.to_mesh(target.data)
+			result.free()
+
+			material_indices=np.zeros(len(target.data.polygons),dtype=np.int32)
+			target.data.polygons.foreach_get("material_index",material_indices)
+
+			for object_id in np.unique(cutter_ids):
+				if object_id!=0 and object_id!=object_ids[target.name]:
+					target.data.materials.append(get_slicer_material(id_objects[object_id]))
+
+					material_indices[cutter_ids==object_id]=len(target.data.materials)-1
+
+			target.data.polygons.foreach_set("material_index",material_indices)
+			target.data.update()
+
+			for modifier in list(target.modifiers):
+				if modifier.type=='BOOLEAN' and modifier.show_viewport:
+					target.modifiers.remove(modifier)
+
+			print("Applied %s: %d faces %.3fs"%(target.name,len(target.data.polygons),evaluation_time+time.time()-object_start_time))
+
+		for target in fallback_targets:
+			print("Applying %s with modifier_apply"%target.name)
+			apply_bool_modifiers_ops(target)
+
+	finally:
+		for modifier in disabled_modifiers:
+			modifier.show_viewport=True
+
+		for obj,mesh in cutter_meshes:
+			evaluation_mesh=obj.data
+			obj.data=mesh
+			bpy.data.meshes.remove(evaluation_mesh)
+
+		# the attribute is carried into every result - none of it is left behind
+		for name in object_ids:
+			remove_cutter_attribute(bpy.data.objects[name])
+
+	print("Applied booleans of %d objects %.3fs"%(len(targets),time.time()-start_time))
+
+
+def apply_all_bool_modifiers():
 
 	if bpy.context.active_object!=None:
 		if bpy.context.active_object.mode!="OBJECT":
 			bpy.ops.object.mode_set(mode='OBJECT')
 
-	
-
 	hidden_objects=[]
 
 	# unhide all objects
@@ -190,67 +454,105 @@ def apply_all_bool_modifiers():
 			obj.hide_viewport=False
 			hidden_objects.append(obj)
 
+	# face attributes carried through the exact boolean need blender 2.91
+	if bpy.app.version>=(2,91,0):
+		apply_all_bool_modifiers_evaluated()
+	else:
+		for obj in bpy.data.objects:
+			if obj.type=="MESH":
+				apply_bool_modifiers_ops(obj)
 
-	for obj in bpy.data.objects:
-		if obj.type=="MESH":
-			has_boolean=False
-			
-			for modifier in obj.modifiers:
-				if modifier.type=='BOOLEAN':
-					boolean_target_object=modifier.object
-					if boolean_target_object!=None:
-						color_value_list=get_color_from_hash_string(boolean_target_object.name)
-						new_material_name="slicer_%s"%boolean_target_object.name
+	# rehide previously hidden objects
+	for obj in hidden_objects:
+		obj.hide_viewport=True
+
+	print("Finished!")
 
-						slicer_material=None
 
-						if new_material_name in bpy.data.materials:
-							slicer_material=bpy.data.materials[new_material_name]
-						else:
-							slicer_material=material_helper.make_subsurf_material(new_material_name,color_value_list)
+# Apply the whole modifier stack of each object from one depsgraph evaluation - the
+# results are copied (new_from_object) before any object gets its new mesh so the
+# evaluation stays valid. Objects with other than boolean modifiers use apply_object_bools.
+def apply_modifiers_evaluated(objects):
 
-						obj.data.materials.append(slicer_material)
+	start_time=time.time()
 
-						# Material index of new material should be last in list
-						new_material_index=len(obj.data.materials)-1
+	evaluated_objects=[]
 
-						bpy.context.view_layer.objects.active = boolean_target_object
+	for obj in objects:
+		if all(modifier.type=='BOOLEAN' for modifier in obj.modifiers):
+			evaluated_objects.append(obj)
+		else:
+			apply_object_bools(obj)
 
-						bpy.ops.object.mode_set(mode='EDIT')
-						bpy.ops.mesh.select_mode(type="FACE")
-						bpy.ops.mesh.select_all(action='SELECT')
-						bpy.ops.object.mode_set(mode='OBJECT')
+	depsgraph=bpy.context.evaluated_depsgraph_get()
 
-						# select all faces for material assignment to occur
-						#for face in obj.data.polygons:
-						#	face.select=True
+	new_meshes=[]
 
-						bpy.context.view_layer.objects.active = obj
-						
-						print("Applying object: %s"%obj.name)
+	for obj in evaluated_objects:
+		new_meshes.append(bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph)))
 
-						bpy.ops.object.mode_set(mode='EDIT')
-						bpy.ops.mesh.select_mode(type="FACE")
-						bpy.ops.mesh.select_all(action='DESELECT')
-						bpy.ops.object.mode_set(mode='OBJECT')
+	for obj,new_mesh in zip(evaluated_objects,new_meshes):
+		old_mesh=obj.data
 
-						#for face in obj.data.polygons:
-						#	face.select=False
+		new_mesh.name=old_mesh.name
 
-						bpy.ops.object.modifier_apply(modifier=modifier.name)
+		obj.modifiers.clear()
+		obj.data=new_mesh
 
-						for f in obj.data.polygons:
-							if f.select:
-								f.material_index=new_material_index
+		if old_mesh.users==0:
+			bpy.data.meshes.remove(old_mesh)
 
-						has_boolean=True
+	print("Applied modifiers of %d objects %.3fs"%(len(evaluated_objects),time.time()-start_time))
 
-	# rehide previously hidden objects
-	for obj in hidden_objects:
-		obj.hide_viewport=True
+# Closed cylinder along Z centered on the origin like primitive_cylinder_add - returns
+# (vertices (2*segments,3) array, faces) without an operator call or object
+def get_cylinder_template(radius,depth,segments=32):
 
-	print("Finished!")
+	angles=np.arange(segments)*(2*np.pi/segments)
+
+	ring=np.stack([np.cos(angles)*radius,np.sin(angles)*radius],axis=1)
+
+	bottom=np.hstack([ring,np.full((segments,1),-depth/2)])
+	top=np.hstack([ring,np.full((segments,1),depth/2)])
+
+	vertices=np.vstack([bottom,top])
+
+	faces=[]
+
+	for index in range(segments):
+		next_index=(index+1)%segments
+		faces.append([index,next_index,segments+next_index,segments+index])
+
+	faces.append(list(range(segments,segments*2)))
+	faces.append(list(reversed(range(segments))))
+
+	return vertices,faces
+
+# One mesh object holding a copy of template (vertices,faces) for every 4x4 matrix in
+# transforms - used for hole patterns so a part needs one cutter and one boolean
+def make_instanced_mesh_object(name,template,transforms):
+
+	template_vertices,template_faces=template
+
+	template_vertices=np.asarray(template_vertices,dtype=np.float64)
+	matrices=np.array([np.array(transform,dtype=np.float64) for transform in transforms]).reshape(-1,4,4)
+
+	vertices=np.einsum("kij,vj->kvi",matrices[:,:3,:3],template_vertices)+matrices[:,None,:3,3]
+
+	faces=[]
 
+	for offset in range(0,len(matrices)*len(template_vertices),len(template_vertices)):
+		for face in template_faces:
+			faces.append([index+offset for index in face])
+
+	mesh=bpy.data.meshes.new(name)
+	mesh.from_pydata(vertices.reshape(-1,3).tolist(),[],faces)
+	mesh.update()
+
+	new_object=bpy.data.objects.new(name,mesh)
+	bpy.context.collection.objects.link(new_object)
+
+	return new_object
 
 def mesh_deselect_all():
 	old_mode=bpy.context.active_object.mode
@@ -398,17 +700,114 @@ def import_object(path,target_object,location,view_collection=None,rotation=None
 
 
 
-def check_intersect(the_object,the_other_object):
+# Cache of world space BVH trees so repeated intersection checks against the same object
+# only build one tree. Entries are keyed on the object and validated against a hash of
+# its mesh data and world matrix - a changed mesh or moved object builds a new tree.
+# Least recently used trees are dropped when there are more than max_entries trees
+# or the cached trees hold more than max_verts vertices in total.
+class bvh_cache:
+
+	max_entries=256
+	max_verts=4000000
+
+	hits=0
+	misses=0
+
+	def __init__(self,max_entries=256,max_verts=4000000):
+		self.max_entries=max_entries
+		self.max_verts=max_verts
+
+		# key -> (content hash, vertex count, BVHTree)
+		self.entries=OrderedDict()
+		self.cached_verts=0
+
+		self.hits=0
+		self.misses=0
+
+	def get_content_hash(self,the_object):
+		mesh=the_object.data
+
+		vertex_count=len(mesh.vertices)
+		coords=array('f',[0.0])*(vertex_count*3)
+		mesh.vertices.foreach_get("co",coords)
+
+		loop_count=len(mesh.loops)
+		loop_verts=array('i',[0])*loop_count
+		mesh.loops.foreach_get("vertex_index",loop_verts)
+
+		m = hashlib.md5()
+		m.update(coords.tobytes())
+		m.update(loop_verts.tobytes())
+		m.update(array('i',[vertex_count,loop_count,len(mesh.polygons)]).tobytes())
+		m.update(array('f',[value for row in the_object.matrix_world for value in row]).tobytes())
+
+		return m.hexdigest()
+
+	def get_tree(self,the_object):
+		key=(the_object.as_pointer(),the_object.name)
+		content_hash=self.get_content_hash(the_object)
+
+		entry=self.entries.get(key)
+
+		if entry!=None and entry[0]==content_hash:
+			self.hits+=1
+			self.entries.move_to_end(key)
+			return entry[2]
+
+		self.misses+=1
+
+		if entry!=None:
+			self.remove(key)
+
+		the_bmesh = bmesh.new()
+		the_bmesh.from_mesh(the_object.data)
+		the_bmesh.transform(the_object.matrix_world)
+		tree = BVHTree.FromBMesh(the_bmesh)
+		vertex_count=len(the_bmesh.verts)
+		the_bmesh.free()
+
+		self.entries[key]=(content_hash,vertex_count,tree)
+		self.cached_verts+=vertex_count
+
+		while len(self.entries)>1 and (len(self.entries)>self.max_entries or self.cached_verts>self.max_verts):
+			self.remove(next(iter(self.entries)))
+
+		return tree
+
+	def remove(self,key):
+		entry=self.entries.pop(key)
+		self.cached_verts-=entry[1]
 
-	BMESH_1 = bmesh.new()
-	BMESH_1.from_mesh(bpy.context.scene.objects[the_object.name].data)
-	BMESH_1.transform(the_object.matrix_world)
-	BVHtree_1 = BVHTree.FromBMesh(BMESH_1)
+	def clear(self):
+		self.entries.clear()
+		self.cached_verts=0
 
-	BMESH_2 = bmesh.new()
-	BMESH_2.from_mesh(bpy.context.scene.objects[the_other_object.name].data)
-	BMESH_2.transform(the_other_object.matrix_world)
-	BVHtree_2 = BVHTree.FromBMesh(BMESH_2)
+	def get_stats_string(self):
+		return "BVH cache: %d hits %d misses %d trees %d verts"%(
+			self.hits,
+			self.misses,
+			len(self.entries),
+			self.cached_verts)
+
+
+the_bvh_cache=bvh_cache()
+
+
+def check_intersect(the_object,the_other_object,use_cache=True):
+
+	if use_cache:
+		BVHtree_1 = the_bvh_cache.get_tree(bpy.context.scene.objects[the_object.name])
+		BVHtree_2 = the_bvh_cache.get_tree(bpy.context.scene.objects[the_other_object.name])
+	else:
+		BMESH_1 = bmesh.new()
+		BMESH_1.from_mesh(bpy.context.scene.objects[the_object.name].data)
+		BMESH_1.transform(the_object.matrix_world)
+		BVHtree_1 = BVHTree.FromBMesh(BMESH_1)
+
+		BMESH_2 = bmesh.new()
+		BMESH_2.from_mesh(bpy.context.scene.objects[the_other_object.name].data)
+		BMESH_2.transform(the_other_object.matrix_world)
+		BVHtree_2 = BVHTree.FromBMesh(BMESH_2)
 
 	inter = BVHtree_1.overlap(BVHtree_2)
 
@@ -424,6 +823,63 @@ def check_intersect(the_object,the_other_object):
 		
 	#print(inter)
 
+# World space axis aligned bounding box of the_object mesh data - returns (min,max) Vectors
+def get_world_bounds(the_object):
+	corners=[the_object.matrix_world @ Vector(corner) for corner in the_object.bound_box]
+
+	bounds_min=Vector((min(c.x for c in corners),min(c.y for c in corners),min(c.z for c in corners)))
+	bounds_max=Vector((max(c.x for c in corners),max(c.y for c in corners),max(c.z for c in corners)))
+
+	return (bounds_min,bounds_max)
+
+
+def check_bounds_overlap(the_object,the_other_object,margin=0.001):
+	min_1,max_1=get_world_bounds(the_object)
+	min_2,max_2=get_world_bounds(the_other_object)
+
+	for axis in range(0,3):
+		if min_1[axis]>max_2[axis]+margin or min_2[axis]>max_1[axis]+margin:
+			return False
+
+	return True
+
+
+# True if the first vertex of the_object is inside the closed mesh of the_other_object
+def check_inside(the_object,the_other_object):
+
+	if len(the_object.data.vertices)==0:
+		return False
+
+	point=the_object.matrix_world @ the_object.data.vertices[0].co
+
+	tree=the_bvh_cache.get_tree(bpy.context.scene.objects[the_other_object.name])
+
+	location,normal,index,distance=tree.find_nearest(point)
+
+	if location==None:
+		return False
+
+	# surface normals point outwards - inside if the nearest surface is in front of the point
+	return (location-point).dot(normal)>0
+
+
+# Reliable overlap test for deciding if a boolean modifier is needed
+# broad phase: world space bounding boxes, narrow phase: BVH surface overlap
+# plus a containment test because BVH overlap misses an object completely inside another.
+# Uses the mesh data (not evaluated) - hullgen only adds DIFFERENCE / INTERSECT booleans
+# which shrink objects so the unevaluated mesh is a safe superset.
+# Call bpy.context.view_layer.update() first so matrix_world of moved / parented objects is current
+def check_overlap(the_object,the_other_object):
+
+	if check_bounds_overlap(the_object,the_other_object)==False:
+		return False
+
+	if check_intersect(the_object,the_other_object):
+		return True
+
+	return check_inside(the_object,the_other_object) or check_inside(the_other_object,the_object)
+
+
 def inside_shrink(amount=0.1):
 
 	context = bpy.context
@@ -600,6 +1056,50 @@ def make_cube(name,location=[0,0,0],size=[1,1,1],rotation=[0,0,0]):
 
 	return new_object	
 
+# Object from arrays of mesh_cache.get_mesh_arrays - linked to collection
+# (default the active collection like primitive_*_add) and made active
+def make_object_from_arrays(name,arrays,collection=None):
+
+	if collection==None:
+		collection=bpy.context.collection
+
+	bpy_helper.find_and_remove_object_by_name(name)
+
+	new_mesh=bpy.data.meshes.new(name)
+	mesh_cache.set_mesh_arrays(new_mesh,arrays)
+
+	new_object=bpy.data.objects.new(name,new_mesh)
+	new_object.matrix_basis=Matrix(arrays["matrix"].tolist())
+
+	collection.objects.link(new_object)
+
+	bpy_helper.select_object(new_object,True)
+
+	return new_object
+
+# world space vertices (N,3) and triangles (M,3) of obj with its modifiers evaluated
+def read_evaluated_triangles(obj):
+	depsgraph=bpy.context.evaluated_depsgraph_get()
+
+	obj_eval=obj.evaluated_get(depsgraph)
+	mesh_eval=obj_eval.to_mesh()
+
+	mesh_eval.calc_loop_triangles()
+
+	vertices=np.empty(len(mesh_eval.vertices)*3,dtype=np.float32)
+	mesh_eval.vertices.foreach_get("co",vertices)
+
+	triangles=np.empty(len(mesh_eval.loop_triangles)*3,dtype=np.int32)
+	mesh_eval.loop_triangles.foreach_get("vertices",triangles)
+
+	matrix=np.array([list(row) for row in obj_eval.matrix_world],dtype=np.float64)
+
+	obj_eval.to_mesh_clear()
+
+	vertices=vertices.reshape(-1,3)@matrix[:3,:3].T+matrix[:3,3]
+
+	return vertices,triangles.reshape(-1,3)
+
 def find_object_by_name(name):
 	ob = bpy.data.objects.get(name)
 	return ob
\ No newline at end of file
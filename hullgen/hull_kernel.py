@@ -0,0 +1,633 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Headless hull geometry kernel - NumPy only, no bpy.
+#
+# Takes the same definitions as hull_maker (size, chines, bulkheads, keels) and
+# produces sections, outlines, part outlines and volumes without running blender.
+# kernel_adapter.py converts a hull_maker to a kernel_hull and turns kernel parts
+# into blender objects.
+#
+# The hull is the hull box minus the chine cutters like hull_maker.make_chine_hull_booleans.
+# Each chine is a ruled surface (the bezier extruded +-curve_height around the tilted up
+# vector) and everything on the extrude side of it is cut away. A section at a station is
+# the box section clipped by each chine - the boundary between two crossing points is taken
+# as a straight line, which is exact when the chine rulings lie in the section plane
+# (rotation only around X, no twist) and close otherwise.
+# Modshapes, subtractive objects and props are not part of the kernel.
+# Parts are the flat bulkhead and keel plates only - longitudal stringers follow the
+# chine curve and are still built by chine_helper in blender.
+
+import math
+from math import radians
+import xml.etree.ElementTree as ET
+import numpy as np
+
+from ..hullgen import bezier_helper
+from ..hullgen import xml_parse_helper
+
+
+# value of chine_surface.get_keep_value for points the chine doesn't reach
+outside_value=1e9
+
+
+# Euler XYZ rotation matrix (degrees) - same as blender object rotation_euler
+def rotation_matrix(rotation):
+	rx,ry,rz=[radians(r) for r in rotation]
+
+	cx,sx=math.cos(rx),math.sin(rx)
+	cy,sy=math.cos(ry),math.sin(ry)
+	cz,sz=math.cos(rz),math.sin(rz)
+
+	rot_x=np.array([[1,0,0],[0,cx,-sx],[0,sx,cx]])
+	rot_y=np.array([[cy,0,sy],[0,1,0],[-sy,0,cy]])
+	rot_z=np.array([[cz,-sz,0],[sz,cz,0],[0,0,1]])
+
+	return rot_z@rot_y@rot_x
+
+
+def polygon_area(polygon):
+	if len(polygon)<3:
+		return 0
+
+	x=polygon[:,0]
+	y=polygon[:,1]
+
+	return (x*np.roll(y,-1)-np.roll(x,-1)*y).sum()/2
+
+
+def polygon_centroid(polygon):
+	area=polygon_area(polygon)
+
+	if area==0:
+		return np.zeros(2)
+
+	x=polygon[:,0]
+	y=polygon[:,1]
+	cross=x*np.roll(y,-1)-np.roll(x,-1)*y
+
+	return np.array([((x+np.roll(x,-1))*cross).sum(),((y+np.roll(y,-1))*cross).sum()])/(6*area)
+
+
+# polygon (K,2) with samples points along every edge - clip_polygon only looks at
+# the vertices so a chine that crosses the middle of an edge needs points there
+def subdivide_polygon(polygon,samples):
+	t=(np.arange(samples)/samples)[:,None,None]
+
+	next_points=np.roll(polygon,-1,axis=0)
+
+	points=polygon[None,:,:]*(1-t)+next_points[None,:,:]*t
+
+	return points.transpose(1,0,2).reshape(-1,2)
+
+
+# Sutherland-Hodgman clipping of polygon (K,2) by an implicit boundary
+# keep_function(points) returns >=0 for points that are kept
+def clip_polygon(polygon,keep_function,refine_steps=4):
+
+	if len(polygon)==0:
+		return polygon
+
+	values=keep_function(polygon)
+
+	output=[]
+
+	for index in range(len(polygon)):
+		a=polygon[index]
+		b=polygon[(index+1)%len(polygon)]
+		value_a=values[index]
+		value_b=values[(index+1)%len(polygon)]
+
+		if value_a>=0:
+			output.append(a)
+
+		if (value_a>=0)!=(value_b>=0):
+			# regula falsi along the edge
+			low,high=0.0,1.0
+			value_low,value_high=value_a,value_b
+
+			for step in range(refine_steps):
+				t=low+(high-low)*value_low/(value_low-value_high)
+				value_t=keep_function((a+(b-a)*t)[None,:])[0]
+
+				if (value_t>=0)==(value_low>=0):
+					low,value_low=t,value_t
+				else:
+					high,value_high=t,value_t
+
+				if high-low<1e-9 or value_low==value_high:
+					break
+
+			if value_low==value_high:
+				t=low
+			else:
+				t=low+(high-low)*value_low/(value_low-value_high)
+
+			output.append(a+(b-a)*t)
+
+	if len(output)==0:
+		return np.zeros((0,2))
+
+	return np.array(output)
+
+
+# polygon (K,2) clipped to min<=column<=max
+def clip_polygon_range(polygon,column,minimum=None,maximum=None):
+	if minimum!=None:
+		polygon=clip_polygon(polygon,lambda p:p[:,column]-minimum)
+
+	if maximum!=None:
+		polygon=clip_polygon(polygon,lambda p:maximum-p[:,column])
+
+	return polygon
+
+
+class kernel_chine:
+
+	name="chine_"
+
+	curve_length=12
+	curve_width=1.2
+	curve_height=1
+	curve_angle=35
+
+	extrude_width=1
+
+	rotation=None
+	offset=None
+	asymmetry=None
+	twist=None
+
+	symmetrical=True
+
+	def __init__(self,name,length,width,rotation=[0,0,0],offset=[0,0,0],asymmetry=[0,0],symmetrical=True,
+			curve_height=1,extrude_width=1,twist=None,curve_angle=35):
+		self.name=name
+		self.curve_length=length
+		self.curve_width=width
+		self.rotation=list(rotation)
+		self.offset=list(offset)
+		self.asymmetry=list(asymmetry)
+		self.symmetrical=symmetrical
+		self.curve_height=curve_height
+		self.extrude_width=extrude_width
+		self.twist=twist
+		self.curve_angle=curve_angle
+
+	# one chine_surface per generated side - same transforms as chine_helper.make_single_chine
+	def get_surfaces(self,samples_per_segment=64):
+		coordinates=bezier_helper.define_curve_coordinates(self.curve_length,
+			self.curve_width,
+			curve_angle=self.curve_angle,
+			asymmetry=self.asymmetry)
+
+		surfaces=[]
+
+		sides=[False]
+
+		if self.symmetrical:
+			sides.append(True)
+
+		for inverted in sides:
+			tilts=None
+
+			if self.twist!=None:
+				tilts=[radians(t) for t in self.twist]
+
+				if inverted:
+					tilts=[-t for t in tilts]
+
+			if inverted:
+				# mesh rotated 180 around X (applied) then opposite rotation / offset
+				matrix=rotation_matrix([-self.rotation[0],self.rotation[1],self.rotation[2]])@np.diag([1,-1,-1])
+				offset=np.array([self.offset[0],-self.offset[1],self.offset[2]])
+			else:
+				matrix=rotation_matrix(self.rotation)
+				offset=np.array(self.offset,dtype=np.float64)
+
+			surfaces.append(chine_surface(coordinates,samples_per_segment,tilts,
+				self.curve_height,
+				self.curve_width*self.extrude_width,
+				matrix,
+				offset))
+
+		return surfaces
+
+
+# One side of a chine in world space
+class chine_surface:
+
+	def __init__(self,coordinates,resolution,tilts,curve_height,extrude_amount,matrix,offset):
+
+		points,tangents,sample_tilts=bezier_helper.sample_bezier(coordinates,resolution,tilts)
+
+		if tilts is None:
+			up=np.tile([0,0,1.0],(len(points),1))
+		else:
+			up=bezier_helper.get_extrude_directions(tangents,sample_tilts)
+
+		# order by curve X so the curve parameter can be looked up with np.interp
+		order=np.argsort(points[:,0],kind="stable")
+
+		self.points=points[order]
+		self.tangents=tangents[order]
+		self.up=up[order]
+
+		self.curve_height=curve_height
+
+		# cutter is on the -Y side of the curve (curve space) for positive extrude_amount
+		self.cut_sign=1 if extrude_amount>=0 else -1
+
+		self.matrix=matrix
+		self.offset=offset
+
+	# >=0 for world points (N,3) that are kept, <0 for points cut away by this chine
+	def get_keep_value(self,world_points):
+
+		local=(world_points-self.offset)@self.matrix
+
+		x_min=self.points[0,0]
+		x_max=self.points[-1,0]
+
+		index=np.interp(local[:,0],self.points[:,0],np.arange(len(self.points)))
+		lower=np.clip(np.floor(index).astype(np.int64),0,len(self.points)-2)
+		t=(index-lower)[:,None]
+
+		def lerp(values):
+			return values[lower]*(1-t)+values[lower+1]*t
+
+		point=lerp(self.points)
+		tangent=lerp(self.tangents)
+		up=lerp(self.up)
+
+		normal=np.cross(up,tangent)
+		length=np.linalg.norm(normal,axis=1)
+		length[length==0]=1
+		normal/=length[:,None]
+
+		offset=local-point
+
+		value=self.cut_sign*np.einsum('ij,ij->i',offset,normal)
+
+		# the ruled surface only reaches curve_height either side and the curve length
+		outside=(local[:,0]<x_min)|(local[:,0]>x_max)|(np.abs(np.einsum('ij,ij->i',offset,up))>self.curve_height)
+		value[outside]=outside_value
+
+		return value
+
+
+class kernel_bulkhead:
+
+	station=0
+	watertight=False
+	floor_height=0
+	thickness=0.1
+
+	def __init__(self,station,watertight,floor_height,thickness):
+		self.station=station
+		self.watertight=watertight
+		self.floor_height=floor_height
+		self.thickness=thickness
+
+
+class kernel_keel:
+
+	lateral_offset=0
+	top_height=0
+	station_start=0
+	station_end=1
+	thickness=0.1
+
+	def __init__(self,lateral_offset,top_height,station_start,station_end,thickness=0.1):
+		self.lateral_offset=lateral_offset
+		self.top_height=top_height
+		self.station_start=station_start
+		self.station_end=station_end
+		self.thickness=thickness
+
+
+# A flat part - outline (K,2) in the plane normal to axis ("x": (y,z) or "y": (x,z))
+# at position, extruded thickness. voids are polygons cut out of the outline
+class kernel_part:
+
+	name=""
+	axis="x"
+	position=0
+	thickness=0
+
+	outline=None
+	voids=None
+
+	def __init__(self,name,axis,position,thickness,outline,voids=None):
+		self.name=name
+		self.axis=axis
+		self.position=position
+		self.thickness=thickness
+		self.outline=outline
+
+		if voids==None:
+			voids=[]
+
+		self.voids=voids
+
+	def get_area(self):
+		area=abs(polygon_area(self.outline))
+
+		for void in self.voids:
+			area-=abs(polygon_area(void))
+
+		return area
+
+	def get_volume(self):
+		return self.get_area()*self.thickness
+
+
+class kernel_hull:
+
+	hull_length=11.4
+	hull_width=3.9
+	hull_height=3.6
+
+	chine_list=None
+	bulkhead_definitions=None
+	keel_list=None
+
+	# bezier samples per segment used for the chine surfaces
+	samples_per_segment=64
+
+	# points per hull box edge before the chines clip a section
+	section_edge_samples=32
+
+	def __init__(self,length=11.4,width=3.9,height=3.6):
+		self.hull_length=length
+		self.hull_width=width
+		self.hull_height=height
+
+		self.chine_list=[]
+		self.bulkhead_definitions=[]
+		self.keel_list=[]
+
+		self.surfaces=None
+
+	def add_chine(self,chine):
+		self.chine_list.append(chine)
+		self.surfaces=None
+
+	def add_bulkhead_definition(self,bulkhead_definition):
+		self.bulkhead_definitions.append(bulkhead_definition)
+
+	def add_keel(self,keel):
+		self.keel_list.append(keel)
+
+	def get_surfaces(self):
+		if self.surfaces==None:
+			self.surfaces=[]
+
+			for chine in self.chine_list:
+				self.surfaces.extend(chine.get_surfaces(self.samples_per_segment))
+
+		return self.surfaces
+
+	# Hull section at station (X) - polygon (K,2) of (y,z) points
+	def get_section(self,station):
+		half_width=self.hull_width/2
+		half_height=self.hull_height/2
+
+		section=np.array([	[-half_width,-half_height],
+							[half_width,-half_height],
+							[half_width,half_height],
+							[-half_width,half_height]])
+
+		if abs(station)>self.hull_length/2:
+			return np.zeros((0,2))
+
+		section=subdivide_polygon(section,self.section_edge_samples)
+
+		for surface in self.get_surfaces():
+
+			def keep_function(points,surface=surface):
+				world_points=np.column_stack([np.full(len(points),station),points])
+				return surface.get_keep_value(world_points)
+
+			section=clip_polygon(section,keep_function)
+
+			if len(section)==0:
+				break
+
+		return section
+
+	def get_stations(self,station_count):
+		return np.linspace(-self.hull_length/2,self.hull_length/2,station_count)
+
+	# returns (stations, half breadth, z min, z max, area) for station_count stations
+	def get_outline(self,station_count=100):
+		stations=self.get_stations(station_count)
+
+		half_breadth=np.zeros(station_count)
+		z_min=np.zeros(station_count)
+		z_max=np.zeros(station_count)
+		area=np.zeros(station_count)
+
+		for index,station in enumerate(stations):
+			section=self.get_section(station)
+
+			if len(section)==0:
+				continue
+
+			half_breadth[index]=np.abs(section[:,0]).max()
+			z_min[index]=section[:,1].min()
+			z_max[index]=section[:,1].max()
+			area[index]=abs(polygon_area(section))
+
+		return (stations,half_breadth,z_min,z_max,area)
+
+	# returns (volume, center of volume) by integrating section areas (Simpson)
+	def get_volume(self,station_count=101):
+
+		# Simpson needs an odd number of stations
+		if station_count%2==0:
+			station_count+=1
+
+		stations=self.get_stations(station_count)
+
+		areas=np.zeros(station_count)
+		centroids=np.zeros((station_count,2))
+
+		for index,station in enumerate(stations):
+			section=self.get_section(station)
+			areas[index]=abs(polygon_area(section))
+
+			if areas[index]>0:
+				centroids[index]=polygon_centroid(section)
+
+		weights=np.ones(station_count)
+		weights[1:-1:2]=4
+		weights[2:-1:2]=2
+		weights*=(stations[1]-stations[0])/3
+
+		volume=(weights*areas).sum()
+
+		center=np.zeros(3)
+
+		if volume>0:
+			center[0]=(weights*areas*stations).sum()/volume
+			center[1:]=(weights[:,None]*areas[:,None]*centroids).sum(axis=0)/volume
+
+		return (volume,center)
+
+	# Same outline / void as bulkhead.make_bulkhead and hull_maker.make_bulkhead_objects
+	def get_bulkhead_part(self,bulkhead_definition):
+		station=bulkhead_definition.station
+
+		outline=self.get_section(station)
+
+		voids=[]
+
+		if bulkhead_definition.watertight==False and len(outline)>0:
+			minimum_support_size=0.2
+
+			size=outline.max(axis=0)-outline.min(axis=0)
+
+			if size[0]>minimum_support_size*2 and size[1]>minimum_support_size*2:
+				# void is the bulkhead scaled around its vertex median
+				center=outline.mean(axis=0)
+				scale=(size-minimum_support_size*2)/size
+
+				void=(outline-center)*scale+center
+
+				if bulkhead_definition.floor_height!=False:
+					void=clip_polygon_range(void,1,minimum=bulkhead_definition.floor_height)
+
+				if len(void)>=3:
+					voids.append(void)
+
+		return kernel_part("Bulkhead.s%06.2f"%(station),"x",station,bulkhead_definition.thickness,outline,voids)
+
+	# Keel side profile (x,z) at lateral_offset - the hull bottom up to top_height
+	def get_keel_part(self,keel,station_count=50):
+		stations=np.linspace(keel.station_start,keel.station_end,station_count)
+
+		half_thickness=keel.thickness/2
+
+		top=[]
+		bottom=[]
+
+		for station in stations:
+			section=self.get_section(station)
+
+			section=clip_polygon_range(section,0,
+				minimum=keel.lateral_offset-half_thickness,
+				maximum=keel.lateral_offset+half_thickness)
+
+			section=clip_polygon_range(section,1,maximum=keel.top_height)
+
+			if len(section)<3:
+				continue
+
+			top.append([station,section[:,1].max()])
+			bottom.append([station,section[:,1].min()])
+
+		if len(top)==0:
+			outline=np.zeros((0,2))
+		else:
+			outline=np.array(bottom+top[::-1])
+
+		return kernel_part("Keel.s%0.2f"%(keel.lateral_offset),"y",keel.lateral_offset,keel.thickness,outline)
+
+	def get_parts(self):
+		parts=[]
+
+		for bulkhead_definition in self.bulkhead_definitions:
+			parts.append(self.get_bulkhead_part(bulkhead_definition))
+
+		for keel in self.keel_list:
+			parts.append(self.get_keel_part(keel))
+
+		return parts
+
+
+# Reads the hull XML written by xml_helper.write_xml into a kernel_hull
+def read_hull_xml(filename):
+
+	tree = ET.parse(filename)
+	root = tree.getroot()
+
+	newhull=kernel_hull(0,0,0)
+
+	for elem in root:
+
+		if elem.tag=="size":
+			newhull.hull_width=xml_parse_helper.parse_float_val(elem,"width",0)
+			newhull.hull_length=xml_parse_helper.parse_float_val(elem,"length",0)
+			newhull.hull_height=xml_parse_helper.parse_float_val(elem,"height",0)
+
+		if elem.tag=="bulkheads":
+			for bulkhead_elem in elem:
+				newhull.add_bulkhead_definition(kernel_bulkhead(
+					station=xml_parse_helper.parse_float_val(bulkhead_elem,"station",0),
+					watertight=xml_parse_helper.parse_int_val(bulkhead_elem,"watertight",default=True),
+					floor_height=xml_parse_helper.parse_float_val(bulkhead_elem,"floor_height",0),
+					thickness=xml_parse_helper.parse_float_val(bulkhead_elem,"thickness",0)))
+
+		if elem.tag=="keels":
+			for keel_elem in elem:
+				newhull.add_keel(kernel_keel(
+					lateral_offset=xml_parse_helper.parse_float_val(keel_elem,"lateral_offset",0),
+					top_height=xml_parse_helper.parse_float_val(keel_elem,"top_height",0),
+					station_start=xml_parse_helper.parse_float_val(keel_elem,"station_start",0),
+					station_end=xml_parse_helper.parse_float_val(keel_elem,"station_end",0)))
+
+		if elem.tag=="chines":
+			for chine_elem in elem:
+				length=11
+				width=1.2
+				height=1.2
+				extrude_width=1.2
+
+				offset=[0,0,0]
+				rotation=[0,0,0]
+				asymmetry=[0,0]
+
+				for subelem in chine_elem:
+					if subelem.tag=="curve":
+						length=xml_parse_helper.parse_float_val(subelem,"length",length)
+						width=xml_parse_helper.parse_float_val(subelem,"width",width)
+						height=xml_parse_helper.parse_float_val(subelem,"height",height)
+						extrude_width=xml_parse_helper.parse_float_val(subelem,"extrude_width",extrude_width)
+
+					if subelem.tag=="asymmetry":
+						asymmetry=[xml_parse_helper.parse_float_val(subelem,"a0",0),xml_parse_helper.parse_float_val(subelem,"a1",0)]
+
+					if subelem.tag=="offset":
+						offset=[xml_parse_helper.parse_float_val(subelem,axis,0) for axis in ("x","y","z")]
+
+					if subelem.tag=="rotation":
+						rotation=[xml_parse_helper.parse_float_val(subelem,axis,0) for axis in ("x","y","z")]
+
+				newhull.add_chine(kernel_chine(
+					name=xml_parse_helper.parse_str_val(chine_elem,"name"),
+					length=length,
+					width=width,
+					rotation=rotation,
+					offset=offset,
+					asymmetry=asymmetry,
+					symmetrical=xml_parse_helper.parse_int_val(chine_elem,"symmetrical",default=True),
+					curve_height=height,
+					extrude_width=extrude_width))
+
+	return newhull
@@ -18,6 +18,7 @@
 
 import bpy 
 import math
+import time
 from math import radians, degrees
 import bmesh
 
@@ -29,8 +30,24 @@ from ..hullgen import bulkhead
 from ..hullgen import keel_helper
 from ..hullgen import geometry_helper
 from ..hullgen import bpy_helper
+from ..hullgen import mesh_cache
+from ..hullgen import parallel_helper
+from ..hullgen import profile_helper
+from ..hullgen import section_helper
 from bpyhullgen.hullgen import prop_helper
 
+# Objects and definitions of a generated hull - kept by hull_maker.begin_update
+# so hull_maker.regenerate can reuse the parts whose definitions did not change
+class hull_build:
+
+	def __init__(self,the_hull):
+		self.hull_object=the_hull.hull_object
+		self.hull_snapshot=the_hull.hull_snapshot
+		self.chine_list=the_hull.chine_list
+		self.keel_list=the_hull.keel_list
+		self.bulkhead_instances=the_hull.bulkhead_instances
+		self.modshapes=the_hull.modshapes
+
 class hull_maker:
 	hull_length=11.4
 	hull_width=3.9
@@ -49,6 +66,12 @@ class hull_maker:
 
 	hull_object=None
 
+	# hull_object with the chine and modshape booleans applied (bake_hull_snapshot) -
+	# keels and bulkheads are cut by it so the hull modifier stack is evaluated once
+	use_hull_snapshot=True
+	hull_snapshot=None
+	hull_snapshot_suffix="_snapshot"
+
 	curve_resolution=24
 	
 	chine_list=None
@@ -62,6 +85,61 @@ class hull_maker:
 
 	slot_gap=0
 
+	# only add boolean modifiers between parts that overlap (geometry_helper.check_overlap)
+	prune_booleans=True
+
+	# number of boolean modifiers skipped / added by check_boolean_needed
+	booleans_pruned=0
+	booleans_kept=0
+
+	# Cut each bulkhead with one collection boolean holding all keel / longitudal slicers
+	# instead of one DIFFERENCE modifier per slicer (needs blender 2.91 and slot_gap=0)
+	merge_cutters=True
+
+	# evaluate bulkheads with stacked and merged cutters and print the modifier stack
+	# sizes and the time saved for each bulkhead (slow)
+	log_cutter_timing=False
+
+	# target object name -> list of cutter objects waiting for make_merged_cutter_booleans
+	bulkhead_cutters=None
+
+	cutter_collection_prefix="cutters"
+
+	# collections holding the keels merged by merge_keels_evaluated while they are merged
+	keel_merge_collection_prefix="keel_merge"
+
+	# regenerate only rebuilds bulkheads whose definitions changed if nothing else did
+	incremental_update=True
+
+	# custom properties holding the definition hashes an object was built from
+	hash_property_name="hullgen_hash"
+	keel_hash_property_name="hullgen_keel_hash"
+
+	# objects of the last build while new definitions are added (begin_update / regenerate)
+	previous_build=None
+
+	# make bulkhead shapes from sections of one evaluation of the hull mesh (section_helper)
+	# instead of an INTERSECT boolean of a cube with the hull for every bulkhead
+	analytic_sections=True
+
+	# section_helper.hull_sections of the evaluated hull while bulkheads are made
+	hull_sections=None
+
+	# reuse slicer plane and bulkhead meshes stored on disk by earlier generations
+	# default directory is mesh_cache.get_default_directory (HULLGEN_MESH_CACHE)
+	# off unless HULLGEN_MESH_CACHE is set - the cache is limited to mesh_cache.default_max_bytes
+	use_mesh_cache=mesh_cache.get_default_enabled()
+	mesh_cache_directory=None
+
+	# build stringers in this many background blender processes before integrating
+	# (parallel_helper) - 0 builds everything in this session. Needs the mesh cache.
+	parallel_processes=0
+
+	# record a profile_helper profile of integrate_components / integrate_changed_bulkheads
+	# saved as <profile_directory>/<hull_name>_profile.json and _trace.json (chrome://tracing)
+	profile=False
+	profile_directory=None
+
 	bulkhead_instances=None
 	keel_list=None
 	props=None
@@ -88,36 +166,57 @@ class hull_maker:
 	target_screw_size=10 # target size in output model
 
 	
-	def clear_all(self):
+	# returns the objects made for a bulkhead instance
+	def get_bulkhead_objects(self,bh):
+		bulkhead_objects=[]
+
+		for ob in [bh.bulkhead_void_object,bh.bulkhead_object,bh.bulkhead_overcut_object]:
+			if ob!=None:
+				bulkhead_objects.append(ob)
+
+		return bulkhead_objects
+
+	def remove_objects(self,delete_list):
+		if len(delete_list) > 0:
+			#print("Delete:%s"%delete_list)
+			bpy.ops.object.select_all(action='DESELECT')
+
+			objs = bpy.data.objects
+
+			for ob in delete_list:
+
+				try: 
+					objs.remove(ob, do_unlink=True)
+				except:
+					print("Object already removed!")
+
+	# delete the objects of a build - the_build is this hull_maker or a hull_build
+	def delete_objects(self,the_build):
 
 		# A temporary list of things to delete
 		delete_list=[]
 
-		if self.hull_object != None:
-			delete_list.append(self.hull_object)
+		if the_build.hull_object != None:
+			delete_list.append(the_build.hull_object)
 
-		for modshape in self.modshapes:
+		if the_build.hull_snapshot != None:
+			delete_list.append(the_build.hull_snapshot)
+
+		for modshape in the_build.modshapes:
 			for mod_object in modshape.mod_objects:
 				delete_list.append(mod_object)
 
 
-		for bh in self.bulkhead_instances:
-			delete_list.append(bh.bulkhead_void_object)
-			delete_list.append(bh.bulkhead_object)
-
-			if bh.bulkhead_overcut_object!=None:
-				delete_list.append(bh.bulkhead_overcut_object)
+		for bh in the_build.bulkhead_instances:
+			delete_list.extend(self.get_bulkhead_objects(bh))
 
 
-		for chine in self.chine_list:
+		for chine in the_build.chine_list:
 			for chine_instance in chine.chine_instances:
 
 				delete_list.append(chine_instance.curve_object)
 				delete_list.append(chine_instance.curve_backup)
 				
-				for lg in chine_instance.longitudal_slicers:
-					delete_list.append(lg)
-
 				for lg in chine_instance.longitudal_slicers:
 					delete_list.append(lg)
 
@@ -127,28 +226,30 @@ class hull_maker:
 				for lg in chine_instance.longitudal_objects:
 					delete_list.append(lg)
 
-		for keel in self.keel_list:
+		for keel in the_build.keel_list:
 			delete_list.append(keel.keel_slicer_object)
 			delete_list.append(keel.keel_object)
 
 			if keel.keel_slicer_slot_gap_object!=None:
 				delete_list.append(keel.keel_slicer_slot_gap_object)
 
-		
-		if len(delete_list) > 0:
-			#print("Delete:%s"%delete_list)
-			bpy.ops.object.select_all(action='DESELECT')
+		self.remove_objects(delete_list)
 
-			objs = bpy.data.objects
+		# collections used by merged cutter booleans (make_merged_cutter_booleans)
+		for collection in list(bpy.data.collections):
+			if collection.name.startswith(self.cutter_collection_prefix+"."):
+				bpy.data.collections.remove(collection)
 
-			for ob in delete_list:
+	def clear_all(self):
 
-				try: 
-					objs.remove(ob, do_unlink=True)
-				except:
-					print("Object already removed!")
+		if self.previous_build!=None:
+			self.delete_objects(self.previous_build)
+			self.previous_build=None
+
+		self.delete_objects(self)
 
 		self.hull_object=None
+		self.hull_snapshot=None
 
 		self.keel_list.clear()
 		self.bulkhead_definitions.clear()
@@ -158,7 +259,270 @@ class hull_maker:
 		self.subtractive_objects.clear()
 
 		self.modshapes.clear()
-	
+
+	# Start a new set of definitions but keep the objects of the current build
+	# so regenerate can reuse the parts that did not change
+	def begin_update(self):
+
+		# objects of a build that was never regenerated are not reused
+		if self.previous_build!=None:
+			self.delete_objects(self.previous_build)
+
+		self.previous_build=hull_build(self)
+
+		self.hull_object=None
+		self.hull_snapshot=None
+
+		self.keel_list=[]
+		self.bulkhead_definitions=[]
+		self.chine_list=[]
+		self.props=[]
+		self.bulkhead_instances=[]
+		self.subtractive_objects=[]
+
+		self.modshapes=[]
+
+	# hash recorded on an object when it was built - None if it was deleted by the user
+	def get_object_hash(self,ob,property_name=None):
+
+		if property_name==None:
+			property_name=self.hash_property_name
+
+		if ob==None:
+			return None
+
+		try:
+			return ob.get(property_name)
+		except ReferenceError:
+			return None
+
+	# One hash for everything the hull shape depends on. Chines (with their longitudals),
+	# modshapes and subtractive objects all cut the hull object and every part is cut
+	# from the hull object so they can't be rebuilt separately
+	def get_hull_hash(self):
+
+		subtractive_values=[]
+
+		for ob in self.subtractive_objects:
+			subtractive_values.append([ob.name,[list(row) for row in ob.matrix_world]])
+
+		prop_values=[]
+
+		for prop in self.props:
+			prop_values.append([prop.blend_file,prop.library_path,prop.target_object,repr(prop.location),repr(prop.rotation)])
+
+		return bpy_helper.get_definition_hash([self.hull_length,
+			self.hull_width,
+			self.hull_height,
+			self.curve_resolution,
+			self.structural_thickness,
+			self.slicer_overcut_ratio,
+			self.slot_gap,
+			self.make_bulkheads,
+			self.make_keels,
+			self.make_longitudals,
+			self.hide_hull,
+			self.prune_booleans,
+			self.merge_cutters,
+			[chine.get_definition_hash() for chine in self.chine_list],
+			[modshape.get_definition_hash() for modshape in self.modshapes],
+			subtractive_values,
+			prop_values])
+
+	# keels are merged per lateral offset so they are one node
+	def get_keel_hash(self):
+		return bpy_helper.get_definition_hash([keel.get_definition_hash() for keel in self.keel_list])
+
+	# Store the definition hashes on the objects they were built from
+	def record_hashes(self):
+
+		self.hull_object[self.hash_property_name]=self.get_hull_hash()
+		self.hull_object[self.keel_hash_property_name]=self.get_keel_hash()
+
+		for chine in self.chine_list:
+			chine_hash=chine.get_definition_hash()
+
+			for chine_instance in chine.chine_instances:
+				chine_instance.curve_object[self.hash_property_name]=chine_hash
+
+				for lg in chine_instance.longitudal_objects:
+					lg[self.hash_property_name]=chine_hash
+
+		for keel in self.keel_list:
+			if keel.keel_object!=None:
+				keel.keel_object[self.hash_property_name]=keel.get_definition_hash()
+
+	# Generate the hull from the definitions added since begin_update.
+	#
+	# Dependency graph of the definitions:
+	#   hull (size, chines + longitudals, modshapes, subtractive objects, props)
+	#     -> keels (merged per lateral offset)
+	#     -> bulkheads
+	#          -> booleans with keel slicers / keel objects
+	#          -> booleans with longitudal slicers / longitudal objects
+	#
+	# If the hull or keel hashes recorded on the hull object changed everything is rebuilt.
+	# Otherwise only bulkheads with a new hash are built and bulkheads that are gone
+	# are deleted together with the booleans that referenced them.
+	#
+	# With slot_gap>0 the bulkhead notches are applied to keels and longitudals, so a
+	# moved or deleted bulkhead would leave its slots behind - always rebuilt.
+	def regenerate(self):
+
+		previous=self.previous_build
+		self.previous_build=None
+
+		full_rebuild=(self.incremental_update==False or
+			self.slot_gap>0 or
+			previous==None or
+			self.get_object_hash(previous.hull_object)!=self.get_hull_hash() or
+			self.get_object_hash(previous.hull_object,self.keel_hash_property_name)!=self.get_keel_hash())
+
+		if full_rebuild:
+			if previous!=None:
+				self.delete_objects(previous)
+
+			self.make_hull_object()
+
+			return self.integrate_components()
+
+		return self.integrate_changed_bulkheads(previous)
+
+	# remove boolean modifiers whose object was deleted
+	def remove_dangling_booleans(self,objects):
+
+		for ob in objects:
+			for modifier in list(ob.modifiers):
+				if modifier.type=='BOOLEAN':
+					if getattr(modifier,"operand_type","OBJECT")=="OBJECT" and modifier.object==None:
+						ob.modifiers.remove(modifier)
+
+	# Incremental part of regenerate - reuses hull, chines, longitudals and keels of previous
+	def integrate_changed_bulkheads(self,previous):
+
+		print("Integrate changed bulkheads")
+
+		performance_timer = bpy_helper.ElapsedTimer()
+
+		self.booleans_pruned=0
+		self.booleans_kept=0
+		self.bulkhead_cutters=None
+
+		self.hull_object=previous.hull_object
+		self.hull_snapshot=previous.hull_snapshot
+		self.chine_list=previous.chine_list
+		self.keel_list=previous.keel_list
+		self.modshapes=previous.modshapes
+
+		with profile_helper.profiled(self.hull_name,self.profile,self.profile_directory):
+
+			# match bulkheads of the last build with the new definitions by hash
+			new_definitions=list(self.bulkhead_definitions)
+			new_hashes=[bulkhead_definition.get_definition_hash() for bulkhead_definition in new_definitions]
+
+			delete_list=[]
+			removed_count=0
+
+			for bh in previous.bulkhead_instances:
+
+				bulkhead_hash=self.get_object_hash(bh.bulkhead_object)
+
+				if bulkhead_hash!=None and bulkhead_hash in new_hashes:
+					index=new_hashes.index(bulkhead_hash)
+
+					bh.bulkhead_definition=new_definitions[index]
+
+					new_hashes.pop(index)
+					new_definitions.pop(index)
+
+					self.bulkhead_instances.append(bh)
+				else:
+					removed_count+=1
+
+					bulkhead_objects=self.get_bulkhead_objects(bh)
+
+					for ob in bulkhead_objects:
+						try:
+							collection_name="%s.%s"%(self.cutter_collection_prefix,ob.name)
+						except ReferenceError:
+							continue
+
+						if collection_name in bpy.data.collections:
+							bpy.data.collections.remove(bpy.data.collections[collection_name])
+
+					delete_list.extend(bulkhead_objects)
+
+			with profile_helper.stage("remove_bulkheads"):
+				self.remove_objects(delete_list)
+
+			# longitudals and keels were notched by the deleted bulkheads
+			notched_objects=[]
+
+			for chine in self.chine_list:
+				for chine_instance in chine.chine_instances:
+					notched_objects.extend(chine_instance.longitudal_objects)
+
+			for keel in self.keel_list:
+				if keel.keel_object!=None:
+					notched_objects.append(keel.keel_object)
+
+			with profile_helper.stage("remove_dangling_booleans"):
+				self.remove_dangling_booleans(notched_objects)
+
+			reused_count=len(self.bulkhead_instances)
+
+			if self.make_bulkheads and len(new_definitions)>0:
+
+				# the full build cuts bulkheads from the hull before subtractive objects are applied
+				# and boolean apply needs the hull to be visible
+				subtractive_modifiers=[]
+
+				for modifier in self.hull_object.modifiers:
+					if modifier.name.startswith("subtract_") and modifier.show_viewport:
+						modifier.show_viewport=False
+						subtractive_modifiers.append(modifier)
+
+				self.hull_object.hide_viewport=False
+
+				with profile_helper.stage("bulkheads"):
+					new_instances=self.make_bulkhead_objects(new_definitions)
+
+				for modifier in subtractive_modifiers:
+					modifier.show_viewport=True
+
+				if self.make_keels:
+					with profile_helper.stage("keel_booleans"):
+						self.make_keel_booleans(new_instances)
+
+				with profile_helper.stage("bulkhead_booleans"):
+					self.make_bulkhead_booleans(new_instances)
+
+				if self.make_longitudals:
+					with profile_helper.stage("longitudal_booleans"):
+						self.make_longitudal_booleans(new_instances)
+
+				with profile_helper.stage("merged_cutter_booleans"):
+					self.make_merged_cutter_booleans()
+
+				if self.hide_hull:
+					self.hull_object.hide_viewport=True
+
+		print("Bulkheads: %d reused %d built %d removed"%(
+			reused_count,
+			len(self.bulkhead_instances)-reused_count,
+			removed_count))
+
+		if self.profile:
+			print("Booleans: %d added %d pruned"%(self.booleans_kept,self.booleans_pruned))
+
+			if self.use_mesh_cache:
+				print(self.get_mesh_cache().get_stats_string())
+
+		geometry_helper.the_bvh_cache.clear()
+
+		time_string = performance_timer.get_elapsed_string()
+
+		return time_string
 
 	def __init__(self,length=11.4,width=3.9,height=3.6):
 
@@ -176,6 +540,9 @@ class hull_maker:
 		self.hull_length=length
 		self.hull_width=width
 
+	def get_mesh_cache(self):
+		return mesh_cache.get_mesh_cache(self.mesh_cache_directory)
+
 	def add_chine(self,new_chine):
 		self.chine_list.append(new_chine)
 
@@ -183,6 +550,57 @@ class hull_maker:
 		self.subtractive_objects.append(object)
 
 
+	# Copy of the evaluated hull_object as a plain mesh - stamped with the hull hash
+	def bake_hull_snapshot(self):
+
+		with profile_helper.stage("hull_snapshot") as node:
+
+			if self.hull_snapshot!=None:
+				self.remove_objects([self.hull_snapshot])
+				self.hull_snapshot=None
+
+			# hidden objects are not evaluated
+			hull_hidden=self.hull_object.hide_viewport
+			self.hull_object.hide_viewport=False
+
+			depsgraph=bpy.context.evaluated_depsgraph_get()
+			hull_eval=self.hull_object.evaluated_get(depsgraph)
+
+			snapshot_name=self.hull_name+self.hull_snapshot_suffix
+
+			snapshot_mesh=bpy.data.meshes.new_from_object(hull_eval)
+			snapshot_mesh.name=snapshot_name
+
+			self.hull_object.hide_viewport=hull_hidden
+
+			self.hull_snapshot=bpy.data.objects.new(snapshot_name,snapshot_mesh)
+			self.hull_snapshot.matrix_world=self.hull_object.matrix_world.copy()
+
+			view_collection_cleaner=bpy_helper.make_collection(self.cleaner_collection_name,bpy.context.scene.collection.children)
+			view_collection_cleaner.objects.link(self.hull_snapshot)
+
+			self.hull_snapshot.hide_viewport=True
+			self.hull_snapshot.hide_render=True
+			self.hull_snapshot.display_type="WIRE"
+
+			self.hull_snapshot[self.hash_property_name]=self.get_hull_hash()
+
+			node.add_object(self.hull_snapshot)
+
+		return self.hull_snapshot
+
+	# Object keels and bulkheads are cut to - the snapshot is baked again if it is
+	# missing or a chine or modshape changed since (hull hash recorded on it differs)
+	def get_hull_operand(self):
+
+		if self.use_hull_snapshot==False:
+			return self.hull_object
+
+		if self.get_object_hash(self.hull_snapshot)!=self.get_hull_hash():
+			self.bake_hull_snapshot()
+
+		return self.hull_snapshot
+
 	def make_hull_object(self):
 		self.hull_object=geometry_helper.make_cube(self.hull_name,size=(self.hull_length, self.hull_width, self.hull_height))
 
@@ -230,9 +648,29 @@ class hull_maker:
 			#print("add bulkhead %d station: %f watertight: %d floor: %f"%(bulkhead_index,current_bulkhead_location,watertight,floor_height))
 
 
+	# section of the evaluated hull at station - the hull is read on the first call
+	# after make_bulkhead_objects started (bulkheads that are cache hits don't need it)
+	def get_hull_section(self,station):
+
+		if self.hull_sections==None:
+			with profile_helper.stage("hull_sections") as node:
+				vertices,triangles=geometry_helper.read_evaluated_triangles(self.get_hull_operand())
+
+				node.count("triangles",len(triangles))
+
+				self.hull_sections=section_helper.hull_sections(vertices,triangles)
+
+		return self.hull_sections.get_section(station)
+
+	# returns the new bulkhead instances - they are also added to bulkhead_instances
 	def make_bulkhead_objects(self,bulkhead_definitions):
 
-		for bulkhead_definition in self.bulkhead_definitions:
+		new_instances=[]
+
+		# the hull may have changed since the last bulkheads were made
+		self.hull_sections=None
+
+		for bulkhead_definition in bulkhead_definitions:
 
 			bh=bulkhead.bulkhead(self,bulkhead_definition)
 								
@@ -270,6 +708,9 @@ class hull_maker:
 
 		
 			self.bulkhead_instances.append(bh)
+			new_instances.append(bh)
+
+			bh.bulkhead_object[self.hash_property_name]=bulkhead_definition.get_definition_hash()
 
 			material_helper.assign_material(bh.bulkhead_object,material_helper.get_material_bulkhead())
 
@@ -287,6 +728,9 @@ class hull_maker:
 
 			bh.bulkhead_object.parent=self.hull_object
 
+		self.hull_sections=None
+
+		return new_instances
 
 	def add_prop(self, rotation=None,
 						location=None,
@@ -319,6 +763,9 @@ class hull_maker:
 
 		performance_timer = bpy_helper.ElapsedTimer()
 
+		self.booleans_pruned=0
+		self.booleans_kept=0
+		self.bulkhead_cutters=None
 
 		hide_hull=False
 		use_subtractive_objects=False
@@ -331,44 +778,81 @@ class hull_maker:
 		use_props=True
 		#======================================
 		
-		# Longitudal stringers created at same time as chines so as to reuse the curve
-		for chine_object in self.chine_list:
-				chine_object.longitudal_elements_enabled=self.make_longitudals
-				chine_object.make_chine()
+		# stopped even if generation raises - the operator hooks must not stay installed
+		with profile_helper.profiled(self.hull_name,self.profile,self.profile_directory):
 
+			# workers leave the cut slicer planes in the mesh cache for make_chine below
+			if self.parallel_processes>0 and self.use_mesh_cache and self.make_longitudals:
+				with profile_helper.stage("parallel_chines"):
+					parallel_helper.prebuild_chines(self,self.parallel_processes)
+			elif self.parallel_processes>0 and self.use_mesh_cache==False:
+				print("parallel_processes needs the mesh cache - building stringers in this session")
 
-		self.make_chine_hull_booleans()
+			# Longitudal stringers created at same time as chines so as to reuse the curve
+			with profile_helper.stage("chines"):
+				for chine_object in self.chine_list:
+					with profile_helper.stage("chine %s"%chine_object.name):
+						chine_object.longitudal_elements_enabled=self.make_longitudals
+						chine_object.make_chine()
 
-		self.make_modshapes()			
+			with profile_helper.stage("chine_hull_booleans"):
+				self.make_chine_hull_booleans()
 
-		if self.make_keels:
-			for keel in self.keel_list:
-				keel.make_keel()
+			with profile_helper.stage("modshapes"):
+				self.make_modshapes()			
 
-			self.merge_keels()
+			if self.use_hull_snapshot:
+				self.bake_hull_snapshot()
 
-		if self.make_bulkheads:
-			#self.add_auto_bulkheads()
-			self.make_bulkhead_objects(self.bulkhead_definitions)			
+			if self.make_keels:
+				with profile_helper.stage("keels"):
+					for keel in self.keel_list:
+						keel.make_keel()
 
-		if use_props:
-			self.integrate_props()	
+					self.merge_keels()
 
-		if self.make_keels:
-			
-			self.make_keel_booleans()
+			if self.make_bulkheads:
+				#self.add_auto_bulkheads()
+				with profile_helper.stage("bulkheads"):
+					self.make_bulkhead_objects(self.bulkhead_definitions)			
+
+			if use_props:
+				with profile_helper.stage("props"):
+					self.integrate_props()	
+
+			if self.make_keels:
+				with profile_helper.stage("keel_booleans"):
+					self.make_keel_booleans()
+
+			if self.make_bulkheads:
+				with profile_helper.stage("bulkhead_booleans"):
+					self.make_bulkhead_booleans()
+
+			if self.make_longitudals:
+				with profile_helper.stage("longitudal_booleans"):
+					self.make_longitudal_booleans()
 
-		if self.make_bulkheads:
-			self.make_bulkhead_booleans()
+			with profile_helper.stage("merged_cutter_booleans"):
+				self.make_merged_cutter_booleans()
 
-		if self.make_longitudals:
-			self.make_longitudal_booleans()
+			if use_subtractive_objects:
+				with profile_helper.stage("subtractive_objects"):
+					self.apply_subtractive_objects()
 
-		if use_subtractive_objects:
-			self.apply_subtractive_objects()
+			if self.hide_hull:
+				self.hull_object.hide_viewport=True
 
-		if self.hide_hull:
-			self.hull_object.hide_viewport=True
+		self.record_hashes()
+
+		if self.profile:
+			print("Booleans: %d added %d pruned"%(self.booleans_kept,self.booleans_pruned))
+			print(geometry_helper.the_bvh_cache.get_stats_string())
+
+			if self.use_mesh_cache:
+				print(self.get_mesh_cache().get_stats_string())
+
+		# trees are only useful while integrating - objects are regenerated next time
+		geometry_helper.the_bvh_cache.clear()
 
 		time_string = performance_timer.get_elapsed_string()
 
@@ -377,8 +861,119 @@ class hull_maker:
 	def add_keel(self,keel):
 		self.keel_list.append(keel)
 
+	def use_merged_cutters(self):
+		return self.merge_cutters and self.slot_gap==0 and bpy.app.version>=(2,91,0)
+
+	# Subtract cutter from target (a bulkhead) - either now as its own modifier or
+	# later together with all other cutters of target in make_merged_cutter_booleans.
+	# Returns the new modifier or None when the cutter is merged (never with slot_gap>0)
+	def add_bulkhead_cutter(self,target,cutter,modifier_name):
+
+		if self.use_merged_cutters():
+			if self.bulkhead_cutters==None:
+				self.bulkhead_cutters={}
+
+			if target.name not in self.bulkhead_cutters:
+				self.bulkhead_cutters[target.name]=[]
+
+			self.bulkhead_cutters[target.name].append(cutter)
+
+			return None
+
+		modifier=target.modifiers.new(name=modifier_name, type='BOOLEAN')
+		modifier.object=cutter
+		modifier.operation="DIFFERENCE"
+
+		return modifier
+
+	# returns seconds taken to evaluate the modifier stack of target
+	def time_evaluation(self,target):
+		target.data.update()
+
+		start_time=time.time()
+		bpy.context.view_layer.update()
+
+		return time.time()-start_time
+
+	# One DIFFERENCE boolean per target with a collection of all cutters added with add_bulkhead_cutter
+	def make_merged_cutter_booleans(self):
+
+		if self.bulkhead_cutters==None:
+			return
+
+		for target_name,cutters in self.bulkhead_cutters.items():
+
+			target=bpy.data.objects[target_name]
+
+			collection_name="%s.%s"%(self.cutter_collection_prefix,target_name)
+
+			if collection_name in bpy.data.collections:
+				bpy.data.collections.remove(bpy.data.collections[collection_name])
+
+			# not linked to the scene - cutters are already in the scene through their own collection
+			cutter_collection=bpy.data.collections.new(collection_name)
+
+			for cutter in cutters:
+				if cutter.name not in cutter_collection.objects:
+					cutter_collection.objects.link(cutter)
+
+			stacked_time=None
+
+			if self.log_cutter_timing:
+				stacked_modifiers=[]
+
+				for cutter in cutters:
+					modifier=target.modifiers.new(name="stacked_%s"%cutter.name, type='BOOLEAN')
+					modifier.object=cutter
+					modifier.operation="DIFFERENCE"
+					stacked_modifiers.append(modifier)
+
+				stacked_time=self.time_evaluation(target)
+
+				for modifier in stacked_modifiers:
+					target.modifiers.remove(modifier)
+
+			modifier=target.modifiers.new(name="cutters", type='BOOLEAN')
+			modifier.operand_type='COLLECTION'
+			modifier.collection=cutter_collection
+			modifier.operation="DIFFERENCE"
+
+			if stacked_time!=None:
+				merged_time=self.time_evaluation(target)
+
+				print("%s: %d cutters merged modifier stack %d (was %d) evaluation %.3fs (was %.3fs) saved %.3fs"%(
+					target_name,
+					len(cutters),
+					len(target.modifiers),
+					len(target.modifiers)+len(cutters)-1,
+					merged_time,
+					stacked_time,
+					stacked_time-merged_time))
+
+		self.bulkhead_cutters=None
+
+	# returns True if a boolean between the_object and the_other_object can change the result
+	def check_boolean_needed(self,the_object,the_other_object):
+
+		if self.prune_booleans==False:
+			self.booleans_kept+=1
+			return True
+
+		if geometry_helper.check_overlap(the_object,the_other_object):
+			self.booleans_kept+=1
+			profile_helper.the_profiler.count("booleans_kept")
+			return True
+
+		self.booleans_pruned+=1
+		profile_helper.the_profiler.count("booleans_pruned")
+
+		return False
+
 	def apply_subtractive_objects(self):
 
+		# make sure matrix_world is current for the overlap tests
+		bpy.context.view_layer.update()
+
 		for ob in self.subtractive_objects:
 
 			ob.hide_render=True
@@ -393,41 +988,47 @@ class hull_maker:
 			for chine in self.chine_list:
 				for chine_instance in chine.chine_instances:
 					for lg in chine_instance.longitudal_objects:				
-						if geometry_helper.check_intersect(ob,lg):
+						if self.check_boolean_needed(ob,lg):
 							modifier=lg.modifiers.new(type='BOOLEAN',name=bool_name)
 							modifier.object=ob
 							modifier.operation="DIFFERENCE"
 
 
-	def make_bulkhead_booleans(self):
+	# bulkhead_instances limits the booleans to those bulkheads (default all)
+	def make_bulkhead_booleans(self,bulkhead_instances=None):
+
+		if bulkhead_instances==None:
+			bulkhead_instances=self.bulkhead_instances
 	
-		for bh in self.bulkhead_instances:
+		for bh in bulkhead_instances:
 			bool_void = bh.bulkhead_object.modifiers.new(type="BOOLEAN", name="void.center_%d"%bh.bulkhead_definition.station)
 			bool_void.object = bh.bulkhead_void_object
 			bool_void.operation = 'DIFFERENCE'
 
 
-	def make_longitudal_booleans(self):
+	# bulkhead_instances limits the booleans to those bulkheads (default all)
+	def make_longitudal_booleans(self,bulkhead_instances=None):
+
+		if bulkhead_instances==None:
+			bulkhead_instances=self.bulkhead_instances
+
+		# make sure matrix_world is current for the overlap tests
+		bpy.context.view_layer.update()
 
 		for chine in self.chine_list:
 			for chine_instance in chine.chine_instances:
 
 				for longitudal_slicer in chine_instance.longitudal_slicers:
 
-					for bh in self.bulkhead_instances:
+					for bh in bulkhead_instances:
 						#print("bh: %s"%bh.bulkhead_object.name,end=" ")
-						# TODO for some reason interection code not returning correct result
-						if geometry_helper.check_intersect(bh.bulkhead_object,longitudal_slicer) or True:
+						if self.check_boolean_needed(bh.bulkhead_object,longitudal_slicer):
 							modifier_name=longitudal_slicer.name
-							bulkhead_modifier=bh.bulkhead_object.modifiers.new(name=modifier_name, type='BOOLEAN')
-							bulkhead_modifier.object=longitudal_slicer
-							bulkhead_modifier.operation="DIFFERENCE"
+							self.add_bulkhead_cutter(bh.bulkhead_object,longitudal_slicer,modifier_name)
 
 							if self.slicer_overcut_ratio>1:
 								if bh.bulkhead_overcut_object!=None:
-									bulkhead_overcut_modifier=bh.bulkhead_overcut_object.modifiers.new(name=modifier_name, type='BOOLEAN')
-									bulkhead_overcut_modifier.object=longitudal_slicer
-									bulkhead_overcut_modifier.operation="DIFFERENCE"
+									self.add_bulkhead_cutter(bh.bulkhead_overcut_object,longitudal_slicer,modifier_name)
 
 
 							# If we have a slot gap for CNC operations
@@ -438,9 +1039,8 @@ class hull_maker:
 								bpy.ops.object.modifier_apply(modifier=modifier_name)
 
 				for longitudal_object in chine_instance.longitudal_objects:
-						for bh in self.bulkhead_instances:
-							# TODO for some reason interection code not returning correct result
-							if geometry_helper.check_intersect(bh.bulkhead_object,longitudal_object) or True:
+						for bh in bulkhead_instances:
+							if self.check_boolean_needed(bh.bulkhead_object,longitudal_object):
 								modifier_name=bh.bulkhead_object.name
 								chine_modifier=longitudal_object.modifiers.new(name=modifier_name, type='BOOLEAN')
 
@@ -467,10 +1067,9 @@ class hull_maker:
 				if self.slot_gap>0:
 					for lg in chine_instance.longitudal_slicers_slot_gap_objects:
 
-						for bh in self.bulkhead_instances:
+						for bh in bulkhead_instances:
 							#print("bh: %s"%bh.bulkhead_object.name,end=" ")
-							# TODO for some reason interection code not returning correct result
-							if geometry_helper.check_intersect(bh.bulkhead_object,lg) or True:
+							if self.check_boolean_needed(bh.bulkhead_object,lg):
 								modifier_name=lg.name
 								bulkhead_modifier=bh.bulkhead_object.modifiers.new(name=modifier_name, type='BOOLEAN')
 								bulkhead_modifier.object=lg
@@ -497,8 +1096,111 @@ class hull_maker:
 				bool_new.operation = 'DIFFERENCE'
 
 
+	# Merge keels with the same lateral offset into the first keel of each offset
 	def merge_keels(self):
 
+		# collection boolean operands need blender 2.91
+		if bpy.app.version>=(2,91,0):
+			self.merge_keels_evaluated()
+		else:
+			self.merge_keels_ops()
+
+	# The other keels of an offset are the collection operand of one UNION boolean on the
+	# first keel (and on its slicer and slot gap objects). The exact solver unions all of
+	# them in one pass and every merged object is applied from one depsgraph evaluation.
+	def merge_keels_evaluated(self):
+
+		keel_groups={}
+
+		for keel in self.keel_list:
+			if keel.lateral_offset not in keel_groups:
+				keel_groups[keel.lateral_offset]=[]
+
+			keel_groups[keel.lateral_offset].append(keel)
+
+		# (base object, objects merged into it)
+		merges=[]
+
+		for lateral_offset,keels in keel_groups.items():
+			base_keel=keels[0]
+
+			print("Lateral Offset: %f %d keels"%(lateral_offset,len(keels)))
+
+			merges.append((base_keel.keel_object,[keel.keel_object for keel in keels[1:]]))
+			merges.append((base_keel.keel_slicer_object,[keel.keel_slicer_object for keel in keels[1:]]))
+
+			if base_keel.keel_slicer_slot_gap_object!=None:
+				merges.append((base_keel.keel_slicer_slot_gap_object,
+					[keel.keel_slicer_slot_gap_object for keel in keels[1:] if keel.keel_slicer_slot_gap_object!=None]))
+
+		# hidden objects are not evaluated
+		hidden_objects=[]
+
+		merge_collections=[]
+
+		for base_object,merged_objects in merges:
+			for obj in [base_object]+merged_objects:
+				if obj.hide_viewport:
+					obj.hide_viewport=False
+					hidden_objects.append(obj)
+
+			if len(merged_objects)==0:
+				continue
+
+			collection_name="%s.%s"%(self.keel_merge_collection_prefix,base_object.name)
+
+			if collection_name in bpy.data.collections:
+				bpy.data.collections.remove(bpy.data.collections[collection_name])
+
+			# not linked to the scene - keels are already in the scene through their own collection
+			merge_collection=bpy.data.collections.new(collection_name)
+			merge_collections.append(merge_collection)
+
+			for obj in merged_objects:
+				merge_collection.objects.link(obj)
+
+			keel_modifier=base_object.modifiers.new(name="merge_keel", type='BOOLEAN')
+			keel_modifier.operand_type='COLLECTION'
+			keel_modifier.collection=merge_collection
+			keel_modifier.operation="UNION"
+
+		geometry_helper.apply_modifiers_evaluated([base_object for base_object,merged_objects in merges])
+
+		for merge_collection in merge_collections:
+			bpy.data.collections.remove(merge_collection)
+
+		merged_names=set()
+
+		for base_object,merged_objects in merges:
+			for obj in merged_objects:
+				merged_names.add(obj.name)
+
+		for obj in hidden_objects:
+			if obj.name not in merged_names:
+				obj.hide_viewport=True
+
+		# slicers are hidden afterwards whether they were visible or not - same as merge_keels_ops
+		for keels in keel_groups.values():
+			keels[0].keel_slicer_object.hide_viewport=True
+
+			if keels[0].keel_slicer_slot_gap_object!=None:
+				keels[0].keel_slicer_slot_gap_object.hide_viewport=True
+
+		for keels in keel_groups.values():
+			for keel_delete in keels[1:]:
+				bpy.data.objects.remove(keel_delete.keel_object)
+				keel_delete.keel_object=None
+
+				bpy.data.objects.remove(keel_delete.keel_slicer_object)
+				keel_delete.keel_slicer_object=None
+
+				if keel_delete.keel_slicer_slot_gap_object!=None:
+					bpy.data.objects.remove(keel_delete.keel_slicer_slot_gap_object)
+					keel_delete.keel_slicer_slot_gap_object=None
+
+	# One UNION boolean per merged keel applied one at a time
+	def merge_keels_ops(self):
+
 
 		# Iterate through keels to make groupings
 		keel_lateral_offsets=[]
@@ -590,29 +1292,30 @@ class hull_maker:
 							
 
 
-	def make_keel_booleans(self):
+	# bulkhead_instances limits the booleans to those bulkheads (default all)
+	def make_keel_booleans(self,bulkhead_instances=None):
+
+		if bulkhead_instances==None:
+			bulkhead_instances=self.bulkhead_instances
+
+		# make sure matrix_world is current for the overlap tests
+		bpy.context.view_layer.update()
 
 		for keel in self.keel_list:
 
 			if keel.keel_slicer_object!=None:
 
-				for bh in self.bulkhead_instances:
+				for bh in bulkhead_instances:
 
-					# TODO for some reason interection code not returning correct result
-					if geometry_helper.check_intersect(bh.bulkhead_object,keel.keel_slicer_object) or True:
+					if self.check_boolean_needed(bh.bulkhead_object,keel.keel_slicer_object):
 
 						# notch the bulkhead with keel_slicer_object
 						bulkhead_modifier_name="%s_%s"%(bh.bulkhead_object.name,keel.keel_slicer_object.name)
-						bulkhead_modifier=bh.bulkhead_object.modifiers.new(name=bulkhead_modifier_name, type='BOOLEAN')
-						bulkhead_modifier.object=keel.keel_slicer_object
-						bulkhead_modifier.operation="DIFFERENCE"
+						bulkhead_modifier=self.add_bulkhead_cutter(bh.bulkhead_object,keel.keel_slicer_object,bulkhead_modifier_name)
 
 						if self.slicer_overcut_ratio>0:
 							if bh.bulkhead_overcut_object!=None:
-
-								bulkhead_overcut_modifier=bh.bulkhead_overcut_object.modifiers.new(name=bulkhead_modifier_name, type='BOOLEAN')
-								bulkhead_overcut_modifier.object=keel.keel_slicer_object
-								bulkhead_overcut_modifier.operation="DIFFERENCE"
+								self.add_bulkhead_cutter(bh.bulkhead_overcut_object,keel.keel_slicer_object,bulkhead_modifier_name)
 
 
 						#bpy_helper.select_object(bh.bulkhead_object,True)
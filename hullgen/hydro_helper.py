@@ -0,0 +1,1013 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Analytic hydrostatics on a triangle soup.
+#
+# Nothing in here touches bpy - the hull mesh is read into NumPy arrays once
+# (see measure_helper.read_hull_mesh) and every pose after that is pure math.
+#
+# Coordinates are hull local coordinates with the origin at the center of gravity.
+# A pose is (z,pitch,roll) - hull origin height above the waterplane and the
+# rotation around Y and X in radians, same as hull_object.location.z and
+# hull_object.rotation_euler.y / .x
+#
+# The submerged volume is the hull clipped by the half space z<=0. Volume and
+# center of buoyancy are summed as signed tetrahedrons from an apex on the
+# waterplane so the cap polygon (waterplane) contributes nothing and does not
+# need to be built.
+
+import math
+from math import radians
+import numpy as np
+
+import os
+import pickle
+import concurrent.futures
+
+# displaced water 1 cubic meter =1000kg (Aprox - not factoring for temp or saltwater ect..)
+water_density=1000
+
+
+class hull_mesh:
+
+	# (N,3) float array of vertex coordinates (hull local space)
+	verts=None
+
+	# (M,3) int array of triangle vertex indices
+	tris=None
+
+	def __init__(self,verts,tris):
+		self.verts=np.asarray(verts,dtype=np.float64).reshape(-1,3)
+		self.tris=np.asarray(tris,dtype=np.int64).reshape(-1,3)
+
+	def get_triangle_count(self):
+		return len(self.tris)
+
+	def get_volume(self):
+		a,b,c=self.get_triangle_coords(self.verts)
+		return np.einsum('ij,ij->i',a,np.cross(b,c)).sum()/6
+
+	def get_triangle_coords(self,verts):
+		return (verts[self.tris[:,0]],
+				verts[self.tris[:,1]],
+				verts[self.tris[:,2]])
+
+	def get_bounds(self):
+		return (self.verts.min(axis=0),self.verts.max(axis=0))
+
+	def pose_verts(self,z,pitch,roll):
+		return self.verts@pose_matrix(pitch,roll).T+np.array([0,0,z])
+
+
+class buoyancy_state:
+
+	z=0
+	pitch=0
+	roll=0
+
+	displaced_volume=0
+	displaced_weight=0
+
+	# center of buoyancy in world space (hull origin at x=0, y=0)
+	center_of_buoyancy=None
+
+	waterplane_area=0
+
+	# centroid (center of flotation) and second moments of area around it [ Ixx, Iyy ]
+	waterplane_centroid=None
+	waterplane_inertia=None
+
+	def __init__(self,z,pitch,roll):
+		self.z=z
+		self.pitch=pitch
+		self.roll=roll
+		self.center_of_buoyancy=np.zeros(3)
+		self.waterplane_centroid=np.zeros(2)
+		self.waterplane_inertia=np.zeros(2)
+
+	def get_pitch_arm(self):
+		return self.center_of_buoyancy[0]
+
+	def get_roll_arm(self):
+		return self.center_of_buoyancy[1]
+
+	# metacentric heights (transverse, longitudinal) - KB-KG + BM with KG at the hull origin
+	# returns (0,0) when the waterplane is unknown (waterplane_inertia=None)
+	def get_metacentric_heights(self):
+		if self.displaced_volume<=0 or self.waterplane_inertia is None:
+			return (0,0)
+
+		buoyancy_height=self.center_of_buoyancy[2]-self.z
+
+		return (buoyancy_height+self.waterplane_inertia[0]/self.displaced_volume,
+				buoyancy_height+self.waterplane_inertia[1]/self.displaced_volume)
+
+
+# Rotation matrix for blender XYZ euler with no Z rotation
+def pose_matrix(pitch,roll):
+	cp=math.cos(pitch)
+	sp=math.sin(pitch)
+	cr=math.cos(roll)
+	sr=math.sin(roll)
+
+	rot_y=np.array([[cp,0,sp],[0,1,0],[-sp,0,cp]])
+	rot_x=np.array([[1,0,0],[0,cr,-sr],[0,sr,cr]])
+
+	return rot_y@rot_x
+
+
+def interpolate_to_waterplane(p,q):
+	# point on edge p->q where z==0
+	t=p[:,2]/(p[:,2]-q[:,2])
+	return p+(q-p)*t[:,None]
+
+
+# Clips triangles (a,b,c arrays of shape (M,3)) against z<=0
+# returns list of clipped triangles (a,b,c) keeping original winding
+# and the cut segments (p,q) lying on the waterplane
+def clip_triangles_below_waterplane(a,b,c):
+
+	below=np.stack([a[:,2]<=0,b[:,2]<=0,c[:,2]<=0],axis=1)
+	below_count=below.sum(axis=1)
+
+	out_a=[]
+	out_b=[]
+	out_c=[]
+
+	cut_p=[]
+	cut_q=[]
+
+	full=below_count==3
+	out_a.append(a[full])
+	out_b.append(b[full])
+	out_c.append(c[full])
+
+	corners=np.stack([a,b,c],axis=1)
+
+	# one vertex below - rotate triangle so that vertex is first
+	one=np.nonzero(below_count==1)[0]
+
+	if len(one)>0:
+		first=np.argmax(below[one],axis=1)
+		u=corners[one,first]
+		v=corners[one,(first+1)%3]
+		w=corners[one,(first+2)%3]
+
+		puv=interpolate_to_waterplane(u,v)
+		pwu=interpolate_to_waterplane(w,u)
+
+		out_a.append(u)
+		out_b.append(puv)
+		out_c.append(pwu)
+
+		cut_p.append(puv)
+		cut_q.append(pwu)
+
+	# two vertices below - rotate triangle so the vertex above is first
+	two=np.nonzero(below_count==2)[0]
+
+	if len(two)>0:
+		first=np.argmin(below[two],axis=1)
+		u=corners[two,first]
+		v=corners[two,(first+1)%3]
+		w=corners[two,(first+2)%3]
+
+		puv=interpolate_to_waterplane(u,v)
+		pwu=interpolate_to_waterplane(w,u)
+
+		# quad puv -> v -> w -> pwu split into 2 triangles
+		out_a.append(puv)
+		out_b.append(v)
+		out_c.append(w)
+
+		out_a.append(puv)
+		out_b.append(w)
+		out_c.append(pwu)
+
+		cut_p.append(pwu)
+		cut_q.append(puv)
+
+	clipped=(np.concatenate(out_a),np.concatenate(out_b),np.concatenate(out_c))
+
+	if len(cut_p)>0:
+		cut=(np.concatenate(cut_p),np.concatenate(cut_q))
+	else:
+		cut=(np.zeros((0,3)),np.zeros((0,3)))
+
+	return clipped,cut
+
+
+# Volume and first moments of the closed volume below the waterplane
+# apex of every tetrahedron is the world origin which is on the waterplane
+def submerged_volume_moments(clipped):
+	a,b,c=clipped
+
+	tet_volume=np.einsum('ij,ij->i',a,np.cross(b,c))/6
+
+	volume=tet_volume.sum()
+	moment=(tet_volume[:,None]*(a+b+c)).sum(axis=0)/4
+
+	return volume,moment
+
+
+# Area, centroid and second moments of the waterplane from the cut segments (Green's theorem)
+# The cap polygon runs opposite to the cut segments
+def waterplane_properties(cut):
+	p,q=cut
+
+	if len(p)==0:
+		return 0,np.zeros(2),np.zeros(2)
+
+	x1=q[:,0]
+	y1=q[:,1]
+	x2=p[:,0]
+	y2=p[:,1]
+
+	cross=x1*y2-x2*y1
+
+	area=cross.sum()/2
+
+	if abs(area)<1e-12:
+		return 0,np.zeros(2),np.zeros(2)
+
+	centroid=np.array([ ((x1+x2)*cross).sum()/6,
+						((y1+y2)*cross).sum()/6 ])/area
+
+	# second moments about the origin (Ixx around X axis uses y^2)
+	i_yy=((x1*x1+x1*x2+x2*x2)*cross).sum()/12
+	i_xx=((y1*y1+y1*y2+y2*y2)*cross).sum()/12
+
+	return area,centroid,np.array([i_xx,i_yy])
+
+
+def evaluate_pose(the_hull_mesh,z,pitch,roll):
+
+	state=buoyancy_state(z,pitch,roll)
+
+	verts=the_hull_mesh.pose_verts(z,pitch,roll)
+	a,b,c=the_hull_mesh.get_triangle_coords(verts)
+
+	clipped,cut=clip_triangles_below_waterplane(a,b,c)
+
+	volume,moment=submerged_volume_moments(clipped)
+
+	state.displaced_volume=volume
+	state.displaced_weight=volume*water_density
+
+	if volume>0:
+		state.center_of_buoyancy=moment/volume
+
+	area,centroid,inertia=waterplane_properties(cut)
+
+	if area!=0:
+		state.waterplane_area=abs(area)
+		state.waterplane_centroid=centroid
+
+		# parallel axis theorem - move second moments to the center of flotation
+		state.waterplane_inertia=np.abs(inertia-area*np.array([centroid[1]**2,centroid[0]**2]))
+
+	return state
+
+
+class mesh_pose_evaluator:
+
+	the_hull_mesh=None
+
+	# number of poses evaluated so far (for solver reporting)
+	evaluations=0
+
+	def __init__(self,the_hull_mesh):
+		self.the_hull_mesh=the_hull_mesh
+		self.evaluations=0
+
+	def evaluate(self,z,pitch,roll):
+		self.evaluations+=1
+		return evaluate_pose(self.the_hull_mesh,z,pitch,roll)
+
+	# returns (z fully submerged, z fully above water) for this rotation
+	def get_z_limits(self,pitch,roll):
+		rot=pose_matrix(pitch,roll)
+		z_extent=self.the_hull_mesh.verts@rot[2]
+
+		return (-z_extent.max(),-z_extent.min())
+
+	def get_triangle_count(self):
+		return self.the_hull_mesh.get_triangle_count()
+
+
+class solver_result:
+
+	state=None
+	converged=False
+
+	iterations=0
+	evaluations=0
+
+	# list of [ displacement_diff, pitch_arm, roll_arm ] for each iteration
+	residuals=None
+
+	def __init__(self):
+		self.residuals=[]
+
+	def add_residual(self,state,weight):
+		self.residuals.append([state.displaced_weight-weight,state.get_pitch_arm(),state.get_roll_arm()])
+
+	def get_summary(self):
+		residual=[0,0,0]
+
+		if len(self.residuals)>0:
+			residual=self.residuals[-1]
+
+		return "converged: %s iterations: %d evaluations: %d residual(weight: %f pitch_arm: %f roll_arm: %f)"%(
+			self.converged,
+			self.iterations,
+			self.evaluations,
+			residual[0],
+			residual[1],
+			residual[2])
+
+
+# Finds the hull height (z) where displaced weight equals weight at a fixed pitch and roll
+# displacement is monotonic in z so bisection always converges
+def solve_draft(evaluator,weight,pitch,roll,tolerance=0.5,max_iterations=60):
+
+	z_low,z_high=evaluator.get_z_limits(pitch,roll)
+
+	state=None
+	iterations=0
+
+	for iterations in range(1,max_iterations+1):
+		z=(z_high+z_low)/2
+		state=evaluator.evaluate(z,pitch,roll)
+
+		displacement_diff=state.displaced_weight-weight
+
+		if abs(displacement_diff)<tolerance:
+			break
+
+		if displacement_diff>0:
+			# too deep
+			z_low=z
+		else:
+			z_high=z
+
+	return state,iterations
+
+
+# Same as solve_draft but with secant steps on displacement vs draft (Illinois variant of regula falsi)
+# The bracket keeps it as safe as bisection - a good starting z (previous solution) converges in a few steps
+def solve_draft_secant(evaluator,weight,pitch,roll,z=None,tolerance=0.5,max_iterations=60):
+
+	z_low,z_high=evaluator.get_z_limits(pitch,roll)
+
+	# displacement_diff at the limits - fully above water displaces nothing
+	diff_high=-weight
+
+	state_low=evaluator.evaluate(z_low,pitch,roll)
+	diff_low=state_low.displaced_weight-weight
+
+	if diff_low<=0:
+		# not enough buoyancy even when fully submerged
+		return state_low,1
+
+	state=state_low
+	iterations=1
+
+	side=0
+
+	if z!=None and z_low<z<z_high:
+		next_z=z
+	else:
+		next_z=z_high-diff_high*(z_high-z_low)/(diff_high-diff_low)
+
+	while iterations<max_iterations:
+		iterations+=1
+
+		state=evaluator.evaluate(next_z,pitch,roll)
+		displacement_diff=state.displaced_weight-weight
+
+		if abs(displacement_diff)<tolerance:
+			break
+
+		if displacement_diff>0:
+			z_low=next_z
+			diff_low=displacement_diff
+
+			# Illinois - halve the stale end so the bracket keeps shrinking from both sides
+			if side==-1:
+				diff_high/=2
+			side=-1
+		else:
+			z_high=next_z
+			diff_high=displacement_diff
+
+			if side==1:
+				diff_low/=2
+			side=1
+
+		next_z=z_high-diff_high*(z_high-z_low)/(diff_high-diff_low)
+
+	return state,iterations
+
+
+# calculates amount to rotate (around X or Y axis) to solve simulation
+# same step table as measure_helper.calculate_rotate_step but in radians
+def rotate_step(rotate_arm):
+
+	rotate_step=0.25
+
+	if rotate_arm<0.1:
+		rotate_step=0.01
+	elif rotate_arm<0.5:
+		rotate_step=0.05
+	elif rotate_arm<1:
+		rotate_step=0.1
+
+	return math.radians(rotate_step)
+
+
+# Rotation that cancels the arm using hydrostatic stiffness (arm changes by GM per radian)
+# Falls back to the step table when the hull is unstable at this pose (GM<=0)
+def restoring_step(arm,metacentric_height,max_step=radians(5)):
+
+	if metacentric_height<=0:
+		return math.copysign(rotate_step(abs(arm)),arm)
+
+	step=arm/metacentric_height
+
+	return max(-max_step,min(max_step,step))
+
+
+# Solves heave by bisection and pitch / roll with a hydrostatic stiffness step
+# evaluator is a mesh_pose_evaluator (or anything with evaluate() and get_z_limits())
+def solve_equilibrium(evaluator,weight,
+			simulate_depth=True,
+			simulate_pitch=True,
+			simulate_roll=True,
+			pitch=0,
+			roll=0,
+			z=None,
+			arm_solve_threshold=0.005,
+			weight_solve_threshold=5,
+			max_steps=6000,
+			step_callback=None):
+
+	result=solver_result()
+	start_evaluations=evaluator.evaluations
+
+	state=None
+
+	for step in range(1,max_steps+1):
+
+		result.iterations=step
+
+		if simulate_depth:
+			state,iterations=solve_draft(evaluator,weight,pitch,roll,tolerance=weight_solve_threshold/10)
+		else:
+			state=evaluator.evaluate(z,pitch,roll)
+
+		z=state.z
+
+		pitch_arm=state.get_pitch_arm()
+		roll_arm=state.get_roll_arm()
+
+		result.add_residual(state,weight)
+
+		if step_callback!=None:
+			step_callback(step,state)
+
+		pitch_solved=simulate_pitch==False or abs(pitch_arm)<arm_solve_threshold
+		roll_solved=simulate_roll==False or abs(roll_arm)<arm_solve_threshold
+
+		if pitch_solved and roll_solved:
+			result.converged=True
+			break
+
+		if state.displaced_weight<=0:
+			break
+
+		gm_transverse,gm_longitudal=state.get_metacentric_heights()
+
+		# buoyancy forward of CG lifts the bow (negative rotation around Y)
+		if pitch_solved==False:
+			pitch-=restoring_step(pitch_arm,gm_longitudal)
+
+		# buoyancy to the left of CG lifts the left side (positive rotation around X)
+		if roll_solved==False:
+			roll+=restoring_step(roll_arm,gm_transverse)
+
+	result.state=state
+	result.evaluations=evaluator.evaluations-start_evaluations
+
+	return result
+
+
+# Derivative based equilibrium search
+# Draft is solved with solve_draft_secant for every pitch / roll so the remaining unknowns are
+# the pitch and roll arms. They are driven to zero with Newton steps on a 2x2 Jacobian that starts
+# from the hydrostatic stiffness (GM) - or finite differences if that is not available -
+# and is refined with Broyden updates so no extra evaluations are needed per iteration.
+def solve_equilibrium_newton(evaluator,weight,
+			simulate_depth=True,
+			simulate_pitch=True,
+			simulate_roll=True,
+			pitch=0,
+			roll=0,
+			z=None,
+			arm_solve_threshold=0.005,
+			weight_solve_threshold=5,
+			max_steps=50,
+			max_rotate_step=radians(10),
+			step_callback=None):
+
+	result=solver_result()
+	start_evaluations=evaluator.evaluations
+
+	# active rotation unknowns - index 0 is pitch and 1 is roll
+	active=[]
+
+	if simulate_pitch:
+		active.append(0)
+
+	if simulate_roll:
+		active.append(1)
+
+	def solve_pose(angles,z):
+		if simulate_depth:
+			state,iterations=solve_draft_secant(evaluator,weight,angles[0],angles[1],z=z,tolerance=weight_solve_threshold/10)
+		else:
+			state=evaluator.evaluate(z,angles[0],angles[1])
+		return state
+
+	def arms(state):
+		return np.array([state.get_pitch_arm(),state.get_roll_arm()])[active]
+
+	angles=np.array([pitch,roll],dtype=np.float64)
+
+	state=solve_pose(angles,z)
+	residual=arms(state)
+
+	jacobian=None
+
+	for step in range(1,max_steps+1):
+
+		result.iterations=step
+		result.add_residual(state,weight)
+
+		if step_callback!=None:
+			step_callback(step,state)
+
+		if len(active)==0 or np.all(np.abs(residual)<arm_solve_threshold):
+			result.converged=True
+			break
+
+		if state.displaced_weight<=0:
+			break
+
+		if jacobian is None:
+			gm_transverse,gm_longitudal=state.get_metacentric_heights()
+
+			# d(pitch_arm)/d(pitch)=GM_L and d(roll_arm)/d(roll)=-GM_T for small rotations
+			diagonal=np.array([gm_longitudal,-gm_transverse])[active]
+
+			if np.all(np.abs(diagonal)>1e-6) and gm_transverse>0 and gm_longitudal>0:
+				jacobian=np.diag(diagonal)
+			else:
+				# finite difference Jacobian (one extra draft solve per unknown)
+				jacobian=np.zeros((len(active),len(active)))
+				delta=radians(0.5)
+
+				for column,axis in enumerate(active):
+					probe_angles=angles.copy()
+					probe_angles[axis]+=delta
+					probe_state=solve_pose(probe_angles,state.z)
+					jacobian[:,column]=(arms(probe_state)-residual)/delta
+
+		try:
+			angle_step=-np.linalg.solve(jacobian,residual)
+		except np.linalg.LinAlgError:
+			angle_step=-np.linalg.lstsq(jacobian,residual,rcond=None)[0]
+
+		# limit rotation per iteration so a bad Jacobian can't throw the hull upside down
+		largest_step=np.abs(angle_step).max()
+
+		if largest_step>max_rotate_step:
+			angle_step*=max_rotate_step/largest_step
+
+		next_angles=angles.copy()
+		next_angles[active]+=angle_step
+
+		next_state=solve_pose(next_angles,state.z)
+		next_residual=arms(next_state)
+
+		# Broyden update of the Jacobian with the secant we just measured
+		residual_change=next_residual-residual
+		step_length=angle_step.dot(angle_step)
+
+		if step_length>0:
+			jacobian=jacobian+np.outer(residual_change-jacobian@angle_step,angle_step)/step_length
+
+		angles=next_angles
+		state=next_state
+		residual=next_residual
+
+	result.state=state
+	result.evaluations=evaluator.evaluations-start_evaluations
+
+	return result
+
+
+# Available equilibrium solvers by name - all share the same signature and return solver_result
+equilibrium_solvers={
+	"step":solve_equilibrium,
+	"newton":solve_equilibrium_newton
+}
+
+def get_equilibrium_solver(name):
+	if name not in equilibrium_solvers:
+		raise ValueError("Unknown equilibrium solver '%s' (available: %s)"%(name,", ".join(equilibrium_solvers)))
+
+	return equilibrium_solvers[name]
+
+
+# Hydrostatic curves - displacement, center of buoyancy and waterplane for a sweep of drafts
+#
+# For every trim the hull is rotated once and the triangles are sorted by height.
+# Triangles completely below the water level w contribute tetrahedrons (apex (0,0,w)) that
+# are linear / quadratic in w:
+#
+#   6*volume = det(a,b,c) - w*Nz             N = a x b + b x c + c x a
+#   24*moment = (det-w*Nz)*(a+b+c) + (det-w*Nz)*(0,0,w)
+#
+# so prefix sums over the sorted triangles give the contribution of every fully submerged
+# triangle in O(1) per draft. Only the triangles crossing the water level are clipped.
+class hydrostatic_table:
+
+	# (D,) drafts measured from the lowest point of the hull at each trim
+	drafts=None
+
+	# (T,2) [ pitch, roll ] in radians
+	trims=None
+
+	# (T,D) hull origin height for each trim / draft (hull_object.location.z)
+	z=None
+
+	displaced_volume=None
+	displaced_weight=None
+
+	# (T,D,3) center of buoyancy in world space (hull origin at x=0, y=0)
+	center_of_buoyancy=None
+
+	waterplane_area=None
+
+	# (T,D,2) center of flotation and second moments around it [ Ixx, Iyy ]
+	waterplane_centroid=None
+	waterplane_inertia=None
+
+	def __init__(self,drafts,trims):
+		self.drafts=np.asarray(drafts,dtype=np.float64).reshape(-1)
+		self.trims=np.asarray(trims,dtype=np.float64).reshape(-1,2)
+
+		shape=(len(self.trims),len(self.drafts))
+
+		self.z=np.zeros(shape)
+		self.displaced_volume=np.zeros(shape)
+		self.displaced_weight=np.zeros(shape)
+		self.center_of_buoyancy=np.zeros(shape+(3,))
+		self.waterplane_area=np.zeros(shape)
+		self.waterplane_centroid=np.zeros(shape+(2,))
+		self.waterplane_inertia=np.zeros(shape+(2,))
+
+	# KB (height of center of buoyancy above the keel) for each trim / draft
+	# the lowest point of the hull is at -draft in world space
+	def get_kb(self):
+		return self.center_of_buoyancy[:,:,2]+self.drafts[None,:]
+
+	# LCB (longitudinal center of buoyancy relative to the center of gravity)
+	def get_lcb(self):
+		return self.center_of_buoyancy[:,:,0]
+
+	def get_csv_header(self):
+		return ["pitch","roll","draft","z",
+			"displaced_volume","displaced_weight",
+			"cb_x","cb_y","cb_z","kb",
+			"waterplane_area","cf_x","cf_y","waterplane_ixx","waterplane_iyy"]
+
+	def get_csv_rows(self,trim_index):
+		kb=self.get_kb()[trim_index]
+
+		rows=[]
+
+		for draft_index in range(len(self.drafts)):
+			cb=self.center_of_buoyancy[trim_index,draft_index]
+			cf=self.waterplane_centroid[trim_index,draft_index]
+			inertia=self.waterplane_inertia[trim_index,draft_index]
+
+			rows.append(["%f"%math.degrees(self.trims[trim_index,0]),
+				"%f"%math.degrees(self.trims[trim_index,1]),
+				"%f"%self.drafts[draft_index],
+				"%f"%self.z[trim_index,draft_index],
+				"%f"%self.displaced_volume[trim_index,draft_index],
+				"%f"%self.displaced_weight[trim_index,draft_index],
+				"%f"%cb[0],"%f"%cb[1],"%f"%cb[2],
+				"%f"%kb[draft_index],
+				"%f"%self.waterplane_area[trim_index,draft_index],
+				"%f"%cf[0],"%f"%cf[1],
+				"%f"%inertia[0],"%f"%inertia[1]])
+
+		return rows
+
+	def save_npz(self,filename):
+		np.savez(filename,
+			drafts=self.drafts,
+			trims=self.trims,
+			z=self.z,
+			displaced_volume=self.displaced_volume,
+			displaced_weight=self.displaced_weight,
+			center_of_buoyancy=self.center_of_buoyancy,
+			kb=self.get_kb(),
+			waterplane_area=self.waterplane_area,
+			waterplane_centroid=self.waterplane_centroid,
+			waterplane_inertia=self.waterplane_inertia)
+
+
+# Fills one trim (row) of a hydrostatic_table
+def sweep_drafts(the_hull_mesh,table,trim_index):
+
+	pitch,roll=table.trims[trim_index]
+
+	verts=the_hull_mesh.verts@pose_matrix(pitch,roll).T
+	a,b,c=the_hull_mesh.get_triangle_coords(verts)
+
+	z_min=np.minimum(np.minimum(a[:,2],b[:,2]),c[:,2])
+	z_max=np.maximum(np.maximum(a[:,2],b[:,2]),c[:,2])
+
+	keel_z=z_min.min()
+
+	# prefix sums in order of the highest vertex - the first k triangles are fully below z_max_sorted[k-1]
+	order_max=np.argsort(z_max,kind="stable")
+	z_max_sorted=z_max[order_max]
+
+	det=np.einsum('ij,ij->i',a,np.cross(b,c))[order_max]
+	normal_z=(np.cross(a,b)+np.cross(b,c)+np.cross(c,a))[order_max,2]
+	corner_sum=(a+b+c)[order_max]
+
+	def prefix(values):
+		return np.concatenate([np.zeros((1,)+values.shape[1:]),np.cumsum(values,axis=0)])
+
+	sum_det=prefix(det)
+	sum_normal_z=prefix(normal_z)
+	sum_det_corner=prefix(det[:,None]*corner_sum)
+	sum_normal_z_corner=prefix(normal_z[:,None]*corner_sum)
+
+	# crossing candidates in order of the lowest vertex
+	order_min=np.argsort(z_min,kind="stable")
+	z_min_sorted=z_min[order_min]
+
+	for draft_index,draft in enumerate(table.drafts):
+
+		w=keel_z+draft
+
+		# fully submerged triangles
+		k=np.searchsorted(z_max_sorted,w,side="right")
+
+		volume=(sum_det[k]-w*sum_normal_z[k])/6
+
+		moment=(sum_det_corner[k]-w*sum_normal_z_corner[k])/24
+		moment[2]+=w*(sum_det[k]-w*sum_normal_z[k])/24
+
+		# triangles crossing the water level
+		candidates=order_min[:np.searchsorted(z_min_sorted,w,side="left")]
+		crossing=candidates[z_max[candidates]>w]
+
+		area=0
+		centroid=np.zeros(2)
+		inertia=np.zeros(2)
+
+		if len(crossing)>0:
+			shift=np.array([0,0,w])
+
+			clipped,cut=clip_triangles_below_waterplane(a[crossing]-shift,b[crossing]-shift,c[crossing]-shift)
+
+			crossing_volume,crossing_moment=submerged_volume_moments(clipped)
+
+			volume+=crossing_volume
+			moment+=crossing_moment+shift*crossing_volume
+
+			area,centroid,inertia=waterplane_properties(cut)
+
+		# hull origin is moved down by w to put the water level at z=0
+		table.z[trim_index,draft_index]=-w
+		table.displaced_volume[trim_index,draft_index]=volume
+		table.displaced_weight[trim_index,draft_index]=volume*water_density
+
+		if volume>0:
+			table.center_of_buoyancy[trim_index,draft_index]=moment/volume-np.array([0,0,w])
+
+		if area!=0:
+			table.waterplane_area[trim_index,draft_index]=abs(area)
+			table.waterplane_centroid[trim_index,draft_index]=centroid
+			table.waterplane_inertia[trim_index,draft_index]=np.abs(inertia-area*np.array([centroid[1]**2,centroid[0]**2]))
+
+
+# Hydrostatic curves for every draft in drafts and every (pitch,roll) in trims
+# trim_callback(trim_index,table) is called as soon as each trim is done (used to stream results)
+def hydrostatic_curves(the_hull_mesh,drafts,trims=None,trim_callback=None):
+
+	if trims==None:
+		trims=[(0,0)]
+
+	table=hydrostatic_table(drafts,trims)
+
+	for trim_index in range(len(table.trims)):
+		sweep_drafts(the_hull_mesh,table,trim_index)
+
+		if trim_callback!=None:
+			trim_callback(trim_index,table)
+
+	return table
+
+
+# GZ (righting arm) curve - stability for a sweep of heel angles
+#
+# For each heel the draft is solved again against the in memory triangles (optionally trim too).
+# GZ is the horizontal distance between center of gravity and center of buoyancy that rights
+# the hull - positive roll lowers the -Y side so GZ=-roll_arm
+class gz_curve:
+
+	weight=0
+
+	# (H,) heel angles in radians
+	heel_angles=None
+
+	# (H,) righting arm in meters
+	gz=None
+
+	# buoyancy_state for each heel angle
+	states=None
+
+	# converged flag for each heel angle
+	converged=None
+
+	def __init__(self,weight,heel_angles):
+		self.weight=weight
+		self.heel_angles=np.asarray(heel_angles,dtype=np.float64)
+		self.gz=np.zeros(len(self.heel_angles))
+		self.states=[None]*len(self.heel_angles)
+		self.converged=np.zeros(len(self.heel_angles),dtype=bool)
+
+	def set_heel(self,heel_index,state,converged):
+		self.states[heel_index]=state
+		self.converged[heel_index]=converged
+		self.gz[heel_index]=-state.get_roll_arm()
+
+	# returns (heel angle in radians, gz) of the maximum righting arm
+	def get_max_gz(self):
+		index=np.argmax(self.gz)
+		return (self.heel_angles[index],self.gz[index])
+
+	# first heel angle where GZ goes from positive to negative (None if it never does)
+	def get_angle_of_vanishing_stability(self):
+		for index in range(1,len(self.gz)):
+			if self.gz[index-1]>0 and self.gz[index]<=0:
+				# linear interpolation between the two heel angles
+				t=self.gz[index-1]/(self.gz[index-1]-self.gz[index])
+				return self.heel_angles[index-1]+t*(self.heel_angles[index]-self.heel_angles[index-1])
+
+		return None
+
+	def get_csv_header(self):
+		return ["heel","gz","z","pitch","displaced_weight","cb_x","cb_y","cb_z","converged"]
+
+	def get_csv_rows(self):
+		rows=[]
+
+		for index,state in enumerate(self.states):
+			rows.append(["%f"%math.degrees(self.heel_angles[index]),
+				"%f"%self.gz[index],
+				"%f"%state.z,
+				"%f"%math.degrees(state.pitch),
+				"%f"%state.displaced_weight,
+				"%f"%state.center_of_buoyancy[0],
+				"%f"%state.center_of_buoyancy[1],
+				"%f"%state.center_of_buoyancy[2],
+				self.converged[index]])
+
+		return rows
+
+
+# hull mesh for process pool workers - sent once per worker instead of once per heel angle
+gz_worker_mesh=None
+
+def init_gz_worker(verts,tris):
+	global gz_worker_mesh
+	gz_worker_mesh=hull_mesh(verts,tris)
+
+
+# Solves a contiguous range of heel angles - each solve starts from the previous solution
+# returns list of (state,converged)
+def solve_heel_angles(the_hull_mesh,weight,heel_angles,free_trim=False,weight_solve_threshold=5,arm_solve_threshold=0.005):
+
+	evaluator=mesh_pose_evaluator(the_hull_mesh)
+
+	results=[]
+
+	z=None
+	pitch=0
+
+	for heel in heel_angles:
+		if free_trim:
+			result=solve_equilibrium_newton(evaluator,weight,
+				simulate_roll=False,
+				z=z,
+				pitch=pitch,
+				roll=heel,
+				weight_solve_threshold=weight_solve_threshold,
+				arm_solve_threshold=arm_solve_threshold)
+
+			state=result.state
+			converged=result.converged
+		else:
+			state,iterations=solve_draft_secant(evaluator,weight,0,heel,z=z,tolerance=weight_solve_threshold/10)
+			converged=abs(state.displaced_weight-weight)<weight_solve_threshold/10
+
+		results.append((state,converged))
+
+		z=state.z
+		pitch=state.pitch
+
+	return results
+
+
+def solve_heel_angles_worker(args):
+	return solve_heel_angles(gz_worker_mesh,*args)
+
+
+# GZ curve from 0 to max_heel degrees in steps of resolution degrees
+# processes: number of worker processes (None=cpu count, 0 or 1 solves in this process)
+# The pool is opt in - inside blender it forks the whole blender process (or can't import
+# bpy with spawn) and for typical hulls it isn't faster than solving in this process.
+# Falls back to solving in this process if a pool can't be started.
+def solve_gz_curve(the_hull_mesh,weight,
+			max_heel=180,
+			resolution=1,
+			free_trim=False,
+			processes=1,
+			weight_solve_threshold=5,
+			arm_solve_threshold=0.005):
+
+	heel_count=int(round(max_heel/resolution))+1
+	heel_angles=np.radians(np.linspace(0,heel_count-1,heel_count)*resolution)
+
+	curve=gz_curve(weight,heel_angles)
+
+	if processes==None:
+		processes=os.cpu_count() or 1
+
+	processes=min(processes,heel_count)
+
+	results=None
+
+	if processes>1:
+		# contiguous chunks so each worker can warm start from its previous heel angle
+		chunks=np.array_split(heel_angles,processes)
+
+		try:
+			with concurrent.futures.ProcessPoolExecutor(max_workers=processes,
+					initializer=init_gz_worker,
+					initargs=(the_hull_mesh.verts,the_hull_mesh.tris)) as executor:
+
+				chunk_results=executor.map(solve_heel_angles_worker,
+					[(weight,chunk,free_trim,weight_solve_threshold,arm_solve_threshold) for chunk in chunks])
+
+				results=[result for chunk_result in chunk_results for result in chunk_result]
+
+		except (OSError,ImportError,pickle.PicklingError,concurrent.futures.process.BrokenProcessPool) as e:
+			print("GZ curve process pool failed (%s) - solving in this process"%e)
+			results=None
+
+	if results==None:
+		results=solve_heel_angles(the_hull_mesh,weight,heel_angles,
+			free_trim=free_trim,
+			weight_solve_threshold=weight_solve_threshold,
+			arm_solve_threshold=arm_solve_threshold)
+
+	for heel_index,(state,converged) in enumerate(results):
+		curve.set_heel(heel_index,state,converged)
+
+	return curve
@@ -19,9 +19,12 @@
 import bpy
 
 from math import radians
+from mathutils import Matrix
 
 from ..hullgen import curve_helper
 from ..hullgen import bpy_helper
+from ..hullgen import profile_helper
+from ..hullgen import geometry_helper
 
 class keel:
 	lateral_offset=0
@@ -54,6 +57,14 @@ class keel:
 		self.station_end=station_end
 		self.thickness=thickness
 
+	def get_definition_hash(self):
+		return bpy_helper.get_definition_hash([self.lateral_offset,
+			self.top_height,
+			self.station_start,
+			self.station_end,
+			self.thickness,
+			self.slicer_cut_height])
+
 
 	def make_keel_object(self,name,top_height_offset,cut_to_hull):
 
@@ -94,7 +105,7 @@ class keel:
 
 		if cut_to_hull==True:
 			bool_new = new_object.modifiers.new(type="BOOLEAN", name="bool.hull_shape")
-			bool_new.object = self.the_hull.hull_object
+			bool_new.object = self.the_hull.get_hull_operand()
 			bool_new.operation = 'INTERSECT'
 
 		bpy_helper.select_object(new_object,True)
@@ -107,6 +118,16 @@ class keel:
 
 	def make_keel(self):
 
+		with profile_helper.stage("keel %s %s-%s"%(self.lateral_offset,self.station_start,self.station_end)) as node:
+			self.make_keel_objects()
+
+			node.add_object(self.keel_object)
+			node.add_object(self.keel_slicer_object)
+
+		return self.keel_object
+
+	def make_keel_objects(self):
+
 		self.keel_slicer_object=self.make_keel_object(name="Keel_Slicer",
 			top_height_offset=self.slicer_cut_height,
 			cut_to_hull=False)
@@ -170,22 +191,29 @@ class keel_builder:
 		screw_top_height=self.top_height-self.scaled_screw_size
 
 
+		if len(self.keel_screw_positions)==0:
+			return
+
+		# all screws are one cutter object - one boolean per keel
+		screw_rotation=Matrix.Rotation(radians(90),4,'X')
+
+		screw_transforms=[]
+
 		for screw_position in self.keel_screw_positions:
-			bpy.ops.mesh.primitive_cylinder_add(radius=self.scaled_screw_size/2, depth=5, enter_editmode=False, location=[0,0,0])
-			screw_object=bpy.context.view_layer.objects.active
-			screw_object.name="screw_keel_%02.2f"%(screw_position)
-			screw_object.location.x=screw_position
-			screw_object.location.z=screw_top_height
-			bpy.ops.transform.rotate(value=radians(90),orient_axis='X')
-			self.keel_screws.append(screw_object)
-
-			for keel in self.the_hull.keel_list:
-				if keel.keel_object!=None:
-					bool_new = keel.keel_object.modifiers.new(type="BOOLEAN", name="screw%02.2f"%screw_position)
-					bool_new.object = screw_object
-					bool_new.operation = 'DIFFERENCE'
-
-			screw_object.hide_viewport=True
+			screw_transforms.append(Matrix.Translation((screw_position,0,screw_top_height))@screw_rotation)
+
+		screw_template=geometry_helper.get_cylinder_template(self.scaled_screw_size/2,5)
+
+		screw_object=geometry_helper.make_instanced_mesh_object("screws_keel",screw_template,screw_transforms)
+		self.keel_screws.append(screw_object)
+
+		for keel in self.the_hull.keel_list:
+			if keel.keel_object!=None:
+				bool_new = keel.keel_object.modifiers.new(type="BOOLEAN", name="screws")
+				bool_new.object = screw_object
+				bool_new.operation = 'DIFFERENCE'
+
+		screw_object.hide_viewport=True
 
 	def make_solid_double_keel(self,top_height,slicer_cut_height=0.2,start_bulkhead=1,end_bulkhead=4):
 		
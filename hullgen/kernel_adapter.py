@@ -0,0 +1,141 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Blender side of hull_kernel - converts hull_maker definitions into a kernel_hull
+# and materialises kernel parts as mesh objects
+
+import bpy
+import numpy as np
+
+from ..hullgen import hull_kernel
+from ..hullgen import bpy_helper
+from ..hullgen import material_helper
+
+
+def kernel_hull_from_hull_maker(the_hull):
+
+	kernel=hull_kernel.kernel_hull(the_hull.hull_length,the_hull.hull_width,the_hull.hull_height)
+
+	for chine in the_hull.chine_list:
+		kernel.add_chine(hull_kernel.kernel_chine(chine.name,
+			chine.curve_length,
+			chine.curve_width,
+			rotation=chine.rotation,
+			offset=chine.offset,
+			asymmetry=chine.asymmetry,
+			symmetrical=chine.symmetrical,
+			curve_height=chine.curve_height,
+			extrude_width=chine.extrude_width,
+			twist=chine.twist))
+
+	for bulkhead_definition in the_hull.bulkhead_definitions:
+		kernel.add_bulkhead_definition(bulkhead_definition)
+
+	for keel in the_hull.keel_list:
+		kernel.add_keel(hull_kernel.kernel_keel(keel.lateral_offset,
+			keel.top_height,
+			keel.station_start,
+			keel.station_end,
+			keel.thickness))
+
+	return kernel
+
+
+# world space verts of polygon (K,2) extruded thickness along the part axis
+def get_prism_data(part,polygon,thickness):
+
+	point_count=len(polygon)
+	half_thickness=thickness/2
+
+	verts=np.zeros((point_count*2,3))
+
+	if part.axis=="x":
+		columns=(1,2)
+		axis=0
+	else:
+		columns=(0,2)
+		axis=1
+
+	for side,offset in enumerate([-half_thickness,half_thickness]):
+		layer=verts[side*point_count:(side+1)*point_count]
+		layer[:,columns[0]]=polygon[:,0]
+		layer[:,columns[1]]=polygon[:,1]
+		layer[:,axis]=part.position+offset
+
+	faces=[list(range(point_count-1,-1,-1)),list(range(point_count,point_count*2))]
+
+	for index in range(point_count):
+		next_index=(index+1)%point_count
+		faces.append([index,next_index,point_count+next_index,point_count+index])
+
+	return verts.tolist(),faces
+
+
+def make_prism_object(name,part,polygon,thickness):
+	verts,faces=get_prism_data(part,polygon,thickness)
+
+	bpy_helper.find_and_remove_object_by_name(name)
+
+	mesh=bpy.data.meshes.new(name)
+	mesh.from_pydata(verts,[],faces)
+	mesh.update()
+
+	new_object=bpy.data.objects.new(name,mesh)
+	bpy.context.scene.collection.objects.link(new_object)
+
+	bpy_helper.bmesh_recalculate_normals(new_object)
+
+	return new_object
+
+
+# Mesh object for a hull_kernel.kernel_part - voids are subtracted with boolean modifiers
+def make_part_object(part,collection_name="kernel_parts"):
+
+	view_collection=bpy_helper.make_collection(collection_name,bpy.context.scene.collection.children)
+
+	part_object=make_prism_object(part.name,part,part.outline,part.thickness)
+
+	if part.axis=="x":
+		material_helper.assign_material(part_object,material_helper.get_material_bulkhead())
+
+	bpy_helper.move_object_to_collection(view_collection,part_object)
+
+	for index,void in enumerate(part.voids):
+		# thicker than the part so the boolean cuts cleanly through both faces
+		void_object=make_prism_object("%s_void.%02d"%(part.name,index),part,void,part.thickness*1.3)
+
+		material_helper.assign_material(void_object,material_helper.get_material_bool())
+
+		modifier=part_object.modifiers.new(name="void.%02d"%index, type='BOOLEAN')
+		modifier.object=void_object
+		modifier.operation="DIFFERENCE"
+
+		bpy_helper.move_object_to_collection(view_collection,void_object)
+		bpy_helper.hide_object(void_object)
+
+	return part_object
+
+
+def make_part_objects(kernel):
+	part_objects=[]
+
+	for part in kernel.get_parts():
+		if len(part.outline)>=3:
+			part_objects.append(make_part_object(part))
+
+	return part_objects
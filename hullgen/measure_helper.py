@@ -24,10 +24,19 @@ from bpy.props import *
 from bpy.props import FloatProperty, BoolProperty, FloatVectorProperty
 
 import queue
+import numpy as np
 
 from ..hullgen import curve_helper
 from ..hullgen import material_helper
 from ..hullgen import bpy_helper
+from ..hullgen import hydro_helper
+from ..hullgen import profile_helper
+from ..hullgen import flatten_helper
+
+# record a profile_helper profile of submerge_boat_solver, make_hydrostatic_curves and
+# make_gz_curve - saved as <profile_directory>/<name>_profile.json and _trace.json
+profile=False
+profile_directory=None
 
 bouyancy_text_object=None
 bouyancy_text_object_name="bouyancy_text"
@@ -84,6 +93,33 @@ def measure_object_volume(obj):
 
 	return volume
 
+# Reads the evaluated (modifiers applied) mesh of obj into a hydro_helper.hull_mesh
+# Coordinates are local to the object origin with object scale applied
+def read_hull_mesh(obj):
+
+	with profile_helper.stage("read_hull_mesh %s"%obj.name) as node:
+		depsgraph = bpy.context.evaluated_depsgraph_get()
+		obj_eval = obj.evaluated_get(depsgraph)
+		me = obj_eval.to_mesh()
+
+		me.calc_loop_triangles()
+
+		verts=np.empty(len(me.vertices)*3,dtype=np.float32)
+		me.vertices.foreach_get("co",verts)
+
+		tris=np.empty(len(me.loop_triangles)*3,dtype=np.int32)
+		me.loop_triangles.foreach_get("vertices",tris)
+
+		obj_eval.to_mesh_clear()
+
+		node.count("vertices",len(verts)//3)
+		node.count("triangles",len(tris)//3)
+
+	verts=verts.reshape(-1,3)*np.array(obj.scale)
+
+	return hydro_helper.hull_mesh(verts,tris)
+
+
 def measure_selected_faces_area(obj,SelectAll=False):
 
 	previous_mode=obj.mode
@@ -232,20 +268,7 @@ def calculate_movement_step(move_arm):
 
 	return move_step
 		
-def submerge_boat(hull_object,weight,
-			simulate_depth,
-			simulate_pitch,
-			simulate_roll,
-			force_roll_max,
-			csv_output_file):
-
-
-	weightQueueSize=5
-	weightQueue = queue.Queue(weightQueueSize)
-
-	bpy.context.scene.frame_set(1)
-
-	register_text_update_callback()
+def make_bouyancy_text(hull_object):
 
 	if bouyancy_text_object_name in bpy.data.objects:
 		bouyancy_text_object=bpy.context.scene.objects[bouyancy_text_object_name]
@@ -257,6 +280,11 @@ def submerge_boat(hull_object,weight,
 		bouyancy_text_object.data.extrude = 0.05
 		bouyancy_text_object.data.size=0.6
 
+	return bouyancy_text_object
+
+# returns (csvfile,csvWriter) with header row written or (None,None) if no output file
+def open_simulation_csv(csv_output_file):
+
 	csvWriter=None
 	csvfile=None
 
@@ -285,6 +313,50 @@ def submerge_boat(hull_object,weight,
 
 		csvWriter.writerow(csv_row)
 
+	return (csvfile,csvWriter)
+
+# solver name: ( hydro_helper equilibrium solver, pose evaluator )
+submerge_solvers={
+	"analytic":("step","mesh"),
+	"newton":("newton","mesh"),
+	"newton_boolean":("newton","boolean")
+}
+
+def submerge_boat(hull_object,weight,
+			simulate_depth,
+			simulate_pitch,
+			simulate_roll,
+			force_roll_max,
+			csv_output_file,
+			solver="boolean"):
+
+	# solver="analytic" solves on an in memory copy of the hull mesh instead of applying booleans each step
+	# solver="newton" does the same with derivative based (secant / Jacobian) updates
+	# solver="newton_boolean" uses the newton solver but measures each pose with booleans like the legacy loop
+	if solver in submerge_solvers:
+		equilibrium_solver,evaluator=submerge_solvers[solver]
+
+		return submerge_boat_solver(hull_object,weight,
+			simulate_depth,
+			simulate_pitch,
+			simulate_roll,
+			force_roll_max,
+			csv_output_file,
+			equilibrium_solver=equilibrium_solver,
+			evaluator=evaluator)
+
+
+	weightQueueSize=5
+	weightQueue = queue.Queue(weightQueueSize)
+
+	bpy.context.scene.frame_set(1)
+
+	register_text_update_callback()
+
+	make_bouyancy_text(hull_object)
+
+	csvfile,csvWriter=open_simulation_csv(csv_output_file)
+
 	hull_object.animation_data_clear()
 
 	bpy.context.scene.frame_set(bpy.context.scene.frame_start)
@@ -564,6 +636,377 @@ def submerge_boat(hull_object,weight,
 	# mark end of submersion animation
 	bpy.context.scene.frame_end=bpy.context.scene.frame_current
 
+# Pose evaluator that measures displacement the same way as submerge_boat - by applying
+# an INTERSECT boolean between a water volume and the posed hull object
+# Slow but works on any hull object - used to run the hydro_helper solvers without reading the mesh
+class boolean_pose_evaluator:
+
+	hull_object=None
+
+	# number of poses evaluated so far (for solver reporting)
+	evaluations=0
+
+	def __init__(self,hull_object):
+		self.hull_object=hull_object
+		self.evaluations=0
+
+	def evaluate(self,z,pitch,roll):
+		self.evaluations+=1
+
+		self.hull_object.location.z=z
+		self.hull_object.rotation_euler.y=pitch
+		self.hull_object.rotation_euler.x=roll
+
+		water_volume,water_displaced_volume=make_water_volume()
+
+		displacement_modifier_name="water_displaced"
+		bool_water_displaced = water_displaced_volume.modifiers.new(type="BOOLEAN", name=displacement_modifier_name)
+		bool_water_displaced.object = self.hull_object
+		bool_water_displaced.operation = 'INTERSECT'
+
+		bpy_helper.select_object(water_displaced_volume,True)
+		bpy.ops.object.modifier_apply(modifier=displacement_modifier_name)
+
+		state=hydro_helper.buoyancy_state(z,pitch,roll)
+
+		# waterplane isn't measured - solvers fall back to finite differences / step table
+		state.waterplane_inertia=None
+
+		state.displaced_volume=measure_object_volume(water_displaced_volume)
+		state.displaced_weight=state.displaced_volume*hydro_helper.water_density
+
+		if state.displaced_volume>0:
+			bpy.ops.object.origin_set(type='ORIGIN_CENTER_OF_MASS', center='MEDIAN')
+
+			state.center_of_buoyancy[0]=water_displaced_volume.location.x-self.hull_object.location.x
+			state.center_of_buoyancy[1]=water_displaced_volume.location.y-self.hull_object.location.y
+			state.center_of_buoyancy[2]=water_displaced_volume.location.z
+
+		return state
+
+	# returns (z fully submerged, z fully above water) for this rotation
+	def get_z_limits(self,pitch,roll):
+		rot=hydro_helper.pose_matrix(pitch,roll)
+
+		corners=np.array([list(corner) for corner in self.hull_object.bound_box])*np.array(self.hull_object.scale)
+		z_extent=corners@rot[2]
+
+		return (-z_extent.max(),-z_extent.min())
+
+
+# Same simulation as submerge_boat but the equilibrium is found with one of the
+# hydro_helper.equilibrium_solvers ("step" or "newton")
+# evaluator="mesh" reads the hull mesh once into memory and calculates displacement / center of buoyancy
+# analytically for each pose (hydro_helper) - evaluator="boolean" uses boolean_pose_evaluator
+# Only the solver iterations are baked into keyframes
+def submerge_boat_solver(hull_object,weight,
+			simulate_depth,
+			simulate_pitch,
+			simulate_roll,
+			force_roll_max,
+			csv_output_file,
+			equilibrium_solver="step",
+			evaluator="mesh"):
+
+	with profile_helper.profiled("submerge_%s"%hull_object.name,profile,profile_directory):
+
+		bpy.context.scene.frame_set(1)
+
+		register_text_update_callback()
+
+		make_bouyancy_text(hull_object)
+
+		csvfile,csvWriter=open_simulation_csv(csv_output_file)
+
+		hull_object.animation_data_clear()
+
+		bpy.context.scene.frame_set(bpy.context.scene.frame_start)
+
+		# sets hull origin to center of mass - the hull mesh is read relative to it
+		cg_empty=calculate_cg([hull_object])
+
+		solve=hydro_helper.get_equilibrium_solver(equilibrium_solver)
+
+		if evaluator=="boolean":
+			pose_evaluator=boolean_pose_evaluator(hull_object)
+			evaluator_description="boolean"
+		else:
+			the_hull_mesh=read_hull_mesh(hull_object)
+			pose_evaluator=hydro_helper.mesh_pose_evaluator(the_hull_mesh)
+			evaluator_description="analytic %d triangles"%the_hull_mesh.get_triangle_count()
+
+		displacement_data=[]
+
+		performance_timer = bpy_helper.ElapsedTimer()
+
+		def log_step(step,state):
+
+			hull_object.location.z=state.z
+			hull_object.rotation_euler.y=state.pitch
+			hull_object.rotation_euler.x=state.roll
+
+			current_frame=bpy.context.scene.frame_current
+			hull_object.keyframe_insert(data_path="location", frame=current_frame)
+			hull_object.keyframe_insert(data_path="rotation_euler", frame=current_frame)
+			bpy.context.scene.frame_set(current_frame+1)
+
+			displacement_data.append(state.displaced_weight)
+
+			if csvWriter!=None:
+				csv_row = []
+
+				csv_row.append(len(displacement_data))
+
+				csv_row.append("%f"%abs(state.displaced_weight-weight))
+				csv_row.append("%f"%state.displaced_weight)
+				csv_row.append("%f"%0)
+
+				csv_row.append("%f"%state.z)
+
+				csv_row.append("%f"%degrees(state.pitch))
+				csv_row.append("%f"%state.get_pitch_arm())
+				csv_row.append("%f"%0)
+
+				csv_row.append("%f"%degrees(state.roll))
+				csv_row.append("%f"%state.get_roll_arm())
+				csv_row.append("%f"%0)
+
+				csvWriter.writerow(csv_row)
+
+		z=hull_object.location.z
+		pitch=hull_object.rotation_euler.y
+		roll=hull_object.rotation_euler.x
+
+		iterations=0
+		evaluations=0
+
+		# the GZ curve engine always solves depth and solves trim with the newton solver - other
+		# combinations use the per degree loop below so the caller's choices are honoured
+		use_gz_curve=(evaluator!="boolean" and
+			simulate_depth and
+			(simulate_pitch==False or equilibrium_solver=="newton"))
+
+		if force_roll_max>0 and use_gz_curve:
+
+			# forced rollover test - the GZ curve engine solves every degree of roll in memory
+			with profile_helper.stage("solve_gz_curve"):
+				curve=hydro_helper.solve_gz_curve(the_hull_mesh,weight,
+					max_heel=int(force_roll_max),
+					resolution=1,
+					free_trim=simulate_pitch,
+					processes=1)
+
+			for heel_index,heel_state in enumerate(curve.states):
+				log_step(heel_index,heel_state)
+
+			result=hydro_helper.solver_result()
+			result.state=curve.states[-1]
+			result.converged=bool(curve.converged.all())
+			result.iterations=len(curve.states)
+			result.add_residual(result.state,weight)
+
+			iterations=result.iterations
+
+		elif force_roll_max>0:
+
+			# forced rollover test - solve depth and pitch for each degree of roll
+			for force_roll_current in range(0,int(force_roll_max)+1):
+				with profile_helper.stage("solve roll %d"%force_roll_current) as node:
+					result=solve(pose_evaluator,weight,
+						simulate_depth=simulate_depth,
+						simulate_pitch=simulate_pitch,
+						simulate_roll=False,
+						z=z,
+						pitch=pitch,
+						roll=radians(force_roll_current))
+
+					node.count("evaluations",result.evaluations)
+
+				log_step(force_roll_current,result.state)
+
+				iterations+=result.iterations
+				evaluations+=result.evaluations
+
+				z=result.state.z
+				pitch=result.state.pitch
+		else:
+			with profile_helper.stage("solve %s"%equilibrium_solver) as node:
+				result=solve(pose_evaluator,weight,
+					simulate_depth=simulate_depth,
+					simulate_pitch=simulate_pitch,
+					simulate_roll=simulate_roll,
+					z=z,
+					pitch=pitch,
+					roll=roll,
+					step_callback=log_step)
+
+				node.count("evaluations",result.evaluations)
+
+			iterations=result.iterations
+			evaluations=result.evaluations
+
+		state=result.state
+
+		statusText="%s solve (%s) iterations:%d evaluations:%d displaced_weight:%f hullZ:%f yRot:%f xRot:%f %s"%(
+			equilibrium_solver,
+			evaluator_description,
+			iterations,
+			evaluations,
+			state.displaced_weight,
+			state.z,
+			degrees(state.pitch),
+			degrees(state.roll),
+			performance_timer.get_elapsed_string())
+
+		print(statusText)
+		print(result.get_summary())
+	
+		bpy.context.workspace.status_text_set(statusText)
+
+		if csvfile!=None:
+			csvfile.close()	
+
+		cg_empty["displacement_data"]=displacement_data
+
+		# mark end of submersion animation
+		bpy.context.scene.frame_end=bpy.context.scene.frame_current
+
+		return result
+
+# Hydrostatic curves (displacement, KB, LCB, waterplane area / moments) for a sweep of drafts
+# drafts are measured from the lowest point of the hull, trims is a list of (pitch,roll) in degrees (None=level)
+# The hull mesh is read once - rows are written to csv_output_file as each trim is finished
+# and the complete arrays are saved to npz_output_file
+def make_hydrostatic_curves(hull_object,drafts,trims=None,csv_output_file=None,npz_output_file=None):
+
+	with profile_helper.profiled("hydrostatic_curves_%s"%hull_object.name,profile,profile_directory):
+
+		performance_timer = bpy_helper.ElapsedTimer()
+
+		# sets hull origin to center of mass - center of buoyancy is reported relative to it
+		calculate_cg([hull_object])
+
+		the_hull_mesh=read_hull_mesh(hull_object)
+
+		if trims==None:
+			trims=[(0,0)]
+
+		trims=[(radians(pitch),radians(roll)) for pitch,roll in trims]
+
+		csvfile=None
+		csvWriter=None
+
+		def write_trim(trim_index,table):
+			nonlocal csvfile,csvWriter
+
+			if csv_output_file==None:
+				return
+
+			if csvWriter==None:
+				csvfile=open(csv_output_file, 'w', newline='')
+				csvWriter = csv.writer(csvfile, delimiter=',',
+					quotechar='|', quoting=csv.QUOTE_MINIMAL)
+				csvWriter.writerow(table.get_csv_header())
+
+			csvWriter.writerows(table.get_csv_rows(trim_index))
+			csvfile.flush()
+
+		with profile_helper.stage("hydrostatic_curves"):
+			table=hydro_helper.hydrostatic_curves(the_hull_mesh,drafts,trims,trim_callback=write_trim)
+
+		if csvfile!=None:
+			csvfile.close()
+
+		if npz_output_file!=None:
+			table.save_npz(npz_output_file)
+
+		print("hydrostatic curves: %d drafts %d trims (%d triangles) %s"%(
+			len(table.drafts),
+			len(table.trims),
+			the_hull_mesh.get_triangle_count(),
+			performance_timer.get_elapsed_string()))
+
+		return table
+
+# GZ (righting arm) curve from 0 to max_heel degrees (every resolution degrees)
+# Heel angles are solved on an in memory copy of the hull mesh - processes>1 opts in to
+# a process pool (see hydro_helper.solve_gz_curve)
+# Keyframes are only inserted when bake_keyframes=True (see bake_gz_keyframes)
+def make_gz_curve(hull_object,weight,
+			max_heel=180,
+			resolution=1,
+			free_trim=False,
+			processes=1,
+			csv_output_file=None,
+			bake_keyframes=False):
+
+	with profile_helper.profiled("gz_curve_%s"%hull_object.name,profile,profile_directory):
+
+		performance_timer = bpy_helper.ElapsedTimer()
+
+		# sets hull origin to center of mass - GZ is measured from it
+		calculate_cg([hull_object])
+
+		the_hull_mesh=read_hull_mesh(hull_object)
+
+		with profile_helper.stage("solve_gz_curve"):
+			curve=hydro_helper.solve_gz_curve(the_hull_mesh,weight,
+				max_heel=max_heel,
+				resolution=resolution,
+				free_trim=free_trim,
+				processes=processes)
+
+		if csv_output_file!=None:
+			with open(csv_output_file, 'w', newline='') as csvfile:
+				csvWriter = csv.writer(csvfile, delimiter=',',
+					quotechar='|', quoting=csv.QUOTE_MINIMAL)
+
+				csvWriter.writerow(curve.get_csv_header())
+				csvWriter.writerows(curve.get_csv_rows())
+
+		max_gz_angle,max_gz=curve.get_max_gz()
+		vanishing_angle=curve.get_angle_of_vanishing_stability()
+
+		if vanishing_angle==None:
+			vanishing_text="none"
+		else:
+			vanishing_text="%f"%degrees(vanishing_angle)
+
+		print("GZ curve: %d heel angles (%d triangles) max_gz:%f at %f vanishing stability:%s %s"%(
+			len(curve.heel_angles),
+			the_hull_mesh.get_triangle_count(),
+			max_gz,
+			degrees(max_gz_angle),
+			vanishing_text,
+			performance_timer.get_elapsed_string()))
+
+		if bake_keyframes:
+			bake_gz_keyframes(hull_object,curve)
+
+		return curve
+
+
+
+# Inserts one keyframe per heel angle of a hydro_helper.gz_curve starting at frame_start
+def bake_gz_keyframes(hull_object,curve,frame_start=1):
+
+	hull_object.animation_data_clear()
+
+	frame=frame_start
+
+	for state in curve.states:
+		hull_object.location.z=state.z
+		hull_object.rotation_euler.y=state.pitch
+		hull_object.rotation_euler.x=state.roll
+
+		hull_object.keyframe_insert(data_path="location", frame=frame)
+		hull_object.keyframe_insert(data_path="rotation_euler", frame=frame)
+
+		frame+=1
+
+	bpy.context.scene.frame_start=frame_start
+	bpy.context.scene.frame_end=frame-1
+
 # returns empty object representing center of gravity location
 def calculate_cg(influence_objects):
 
@@ -766,7 +1209,66 @@ def export_dxf(filename):
 		
 
 
-def export_plates(filename):
+# face outlines of each plate as an SVG at true size - 1 model unit is 1000 mm
+# plates is a list of (name, uvs (N,2) in model units, faces as lists of vertex indices)
+# and are placed left to right with margin between them
+def write_plates_svg(filename,plates,margin=0.05):
+
+	outlines=[]
+
+	plate_offset=0
+	height=0
+
+	for name,uvs,faces in plates:
+		if len(uvs)==0:
+			continue
+
+		plate_uvs=uvs-uvs.min(axis=0)+[plate_offset,0]
+
+		outlines.append((name,plate_uvs,faces))
+
+		plate_offset=plate_uvs[:,0].max()+margin
+		height=max(height,plate_uvs[:,1].max())
+
+	width=max(plate_offset-margin,0)
+
+	with open(filename,"w") as svg_file:
+		svg_file.write('<?xml version="1.0" standalone="no"?>\n')
+		svg_file.write('<svg xmlns="http://www.w3.org/2000/svg" version="1.1" width="%fmm" height="%fmm" viewBox="0 0 %f %f">\n'%(
+			width*1000,height*1000,width,height))
+
+		for name,plate_uvs,faces in outlines:
+			svg_file.write('<g id="%s" fill="none" stroke="black" stroke-width="0.0005">\n'%name)
+
+			for face in faces:
+				# SVG Y goes down
+				points=" ".join("%f,%f"%(plate_uvs[index,0],height-plate_uvs[index,1]) for index in face)
+				svg_file.write('<polygon points="%s"/>\n'%points)
+
+			svg_file.write('</g>\n')
+
+		svg_file.write('</svg>\n')
+
+# develop=True develops the selected plates with flatten_helper.develop_plate_object and
+# writes their flat patterns at true size (write_plates_svg). False uses uv.smart_project
+# and uv.export_layout which scales the layout to the image.
+def export_plates(filename,develop=True):
+
+	if develop:
+		plates=[]
+
+		for obj in bpy.context.selected_objects:
+			if obj.type=="MESH":
+				result=flatten_helper.develop_plate_object(obj)
+
+				print("Develop %s: %s"%(obj.name,result.get_summary()))
+
+				plates.append((obj.name,result.uvs,[list(polygon.vertices) for polygon in obj.data.polygons]))
+
+		write_plates_svg(filename,plates)
+
+		return
+
 	bpy.ops.object.mode_set(mode='EDIT')
 	bpy.ops.mesh.select_all(action='SELECT')
 
@@ -0,0 +1,329 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Persistent on-disk cache of generated part meshes - no bpy.
+#
+# Parts that are expensive to make (boolean cuts of slicer planes and bulkheads) are
+# stored as NumPy arrays in a directory named after the hash of everything the part
+# was made from and of the hullgen sources that made it (see get_key). Entries are
+# shared between sessions and machines that point at the same cache directory.
+#
+# Layout:  <directory>/<key[:2]>/<key>/<array name>.npy
+#
+# Entries are written to a temporary directory and renamed into place so readers
+# never see half written entries. Lookups memory map the arrays and touch the entry
+# directory. Entries with the oldest modification time are removed when the cache
+# grows past max_bytes.
+
+import os
+import shutil
+import hashlib
+import time
+import numpy as np
+
+# change when the stored arrays change - changes to the way parts are made are
+# covered by the hash of the sources (get_sources_hash)
+cache_version=1
+
+# hash of the hullgen sources - None until get_sources_hash reads them
+sources_hash=None
+
+# mesh arrays stored for each entry - see get_mesh_arrays
+array_names=["vertices","edges","loops","loop_starts","loop_totals","matrix"]
+
+default_max_bytes=2*1024*1024*1024
+
+
+# hull_maker.use_mesh_cache default - the cache is only used when a directory is set
+def get_default_enabled():
+	return os.environ.get("HULLGEN_MESH_CACHE")!=None
+
+def get_default_directory():
+	directory=os.environ.get("HULLGEN_MESH_CACHE")
+
+	if directory==None:
+		directory=os.path.join(os.path.expanduser("~"),".cache","bpyhullgen","meshes")
+
+	return directory
+
+# hash of the .py files next to this module - entries made by other code never match
+def get_sources_hash():
+	global sources_hash
+
+	if sources_hash==None:
+		m=hashlib.md5()
+
+		source_directory=os.path.dirname(os.path.abspath(__file__))
+
+		for file_name in sorted(os.listdir(source_directory)):
+			if file_name.endswith(".py"):
+				m.update(file_name.encode())
+
+				with open(os.path.join(source_directory,file_name),"rb") as f:
+					m.update(f.read())
+
+		sources_hash=m.hexdigest()
+
+	return sources_hash
+
+# values is a list of everything the part depends on - bpy property arrays must be
+# converted to lists first (see bpy_helper.get_definition_hash)
+def get_key(values):
+	return hashlib.md5(repr([cache_version,get_sources_hash(),values]).encode()).hexdigest()
+
+
+# mesh is a bpy mesh - only foreach_get is used so bpy is not imported here
+# matrix is the object matrix_basis - matrix_world may not be updated yet
+def get_mesh_arrays(mesh,matrix):
+
+	arrays={}
+
+	vertices=np.zeros(len(mesh.vertices)*3,dtype=np.float32)
+	mesh.vertices.foreach_get("co",vertices)
+	arrays["vertices"]=vertices.reshape(-1,3)
+
+	edges=np.zeros(len(mesh.edges)*2,dtype=np.int32)
+	mesh.edges.foreach_get("vertices",edges)
+	arrays["edges"]=edges.reshape(-1,2)
+
+	loops=np.zeros(len(mesh.loops),dtype=np.int32)
+	mesh.loops.foreach_get("vertex_index",loops)
+	arrays["loops"]=loops
+
+	loop_starts=np.zeros(len(mesh.polygons),dtype=np.int32)
+	mesh.polygons.foreach_get("loop_start",loop_starts)
+	arrays["loop_starts"]=loop_starts
+
+	loop_totals=np.zeros(len(mesh.polygons),dtype=np.int32)
+	mesh.polygons.foreach_get("loop_total",loop_totals)
+	arrays["loop_totals"]=loop_totals
+
+	arrays["matrix"]=np.array([list(row) for row in matrix],dtype=np.float64)
+
+	return arrays
+
+# fills an empty bpy mesh from arrays returned by get_mesh_arrays / mesh_cache.get
+def set_mesh_arrays(mesh,arrays):
+
+	mesh.vertices.add(len(arrays["vertices"]))
+	mesh.edges.add(len(arrays["edges"]))
+	mesh.loops.add(len(arrays["loops"]))
+	mesh.polygons.add(len(arrays["loop_starts"]))
+
+	# foreach_set needs flat contiguous buffers - ravel of a memory map is a view
+	mesh.vertices.foreach_set("co",np.ascontiguousarray(arrays["vertices"]).ravel())
+	mesh.edges.foreach_set("vertices",np.ascontiguousarray(arrays["edges"]).ravel())
+	mesh.loops.foreach_set("vertex_index",np.ascontiguousarray(arrays["loops"]))
+	mesh.polygons.foreach_set("loop_start",np.ascontiguousarray(arrays["loop_starts"]))
+	mesh.polygons.foreach_set("loop_total",np.ascontiguousarray(arrays["loop_totals"]))
+
+	mesh.update()
+
+
+class mesh_cache:
+
+	directory=None
+	max_bytes=default_max_bytes
+
+	hits=0
+	misses=0
+	stores=0
+	evictions=0
+
+	# total size of all entries - None until get_size scans the directory
+	size=None
+
+	def __init__(self,directory=None,max_bytes=default_max_bytes):
+
+		if directory==None:
+			directory=get_default_directory()
+
+		self.directory=directory
+		self.max_bytes=max_bytes
+
+		self.hits=0
+		self.misses=0
+		self.stores=0
+		self.evictions=0
+		self.size=None
+
+	def get_entry_path(self,key):
+		return os.path.join(self.directory,key[:2],key)
+
+	def get_entry_paths(self):
+
+		entry_paths=[]
+
+		if not os.path.isdir(self.directory):
+			return entry_paths
+
+		for prefix in os.listdir(self.directory):
+			prefix_path=os.path.join(self.directory,prefix)
+
+			# skip temporary entries and anything else that isn't a key prefix
+			if len(prefix)!=2 or not os.path.isdir(prefix_path):
+				continue
+
+			for key in os.listdir(prefix_path):
+				entry_paths.append(os.path.join(prefix_path,key))
+
+		return entry_paths
+
+	def get_entry_size(self,entry_path):
+
+		entry_size=0
+
+		for file_name in os.listdir(entry_path):
+			entry_size+=os.path.getsize(os.path.join(entry_path,file_name))
+
+		return entry_size
+
+	def get_size(self):
+
+		if self.size==None:
+			self.size=0
+
+			for entry_path in self.get_entry_paths():
+				try:
+					self.size+=self.get_entry_size(entry_path)
+				except OSError:
+					pass
+
+		return self.size
+
+	# returns dict of read only memory mapped arrays or None
+	def get(self,key):
+
+		entry_path=self.get_entry_path(key)
+
+		try:
+			arrays={}
+
+			for array_name in array_names:
+				arrays[array_name]=np.load(os.path.join(entry_path,array_name+".npy"),mmap_mode="r")
+
+			# entries not touched for the longest time are evicted first
+			os.utime(entry_path)
+
+		except (OSError,ValueError):
+			self.misses+=1
+			return None
+
+		self.hits+=1
+
+		return arrays
+
+	def put(self,key,arrays):
+
+		entry_path=self.get_entry_path(key)
+
+		if os.path.isdir(entry_path):
+			return
+
+		temp_path=os.path.join(self.directory,"tmp.%s.%d.%d"%(key,os.getpid(),time.time_ns()))
+
+		try:
+			os.makedirs(temp_path)
+
+			for array_name in array_names:
+				np.save(os.path.join(temp_path,array_name+".npy"),np.ascontiguousarray(arrays[array_name]))
+
+			entry_size=self.get_entry_size(temp_path)
+
+			# scan before the entry is added so it isn't counted twice
+			self.get_size()
+
+			os.makedirs(os.path.dirname(entry_path),exist_ok=True)
+			os.rename(temp_path,entry_path)
+
+		except OSError as error:
+			# another process stored the same key first or the disk is full
+			shutil.rmtree(temp_path,ignore_errors=True)
+
+			if not os.path.isdir(entry_path):
+				print("Mesh cache: can't store %s: %s"%(key,error))
+
+			return
+
+		self.stores+=1
+
+		self.size+=entry_size
+
+		if self.size>self.max_bytes:
+			self.evict()
+
+	# remove entries with the oldest modification time (last stored or hit) until the
+	# cache is below 90% of max_bytes
+	def evict(self):
+
+		entries=[]
+
+		for entry_path in self.get_entry_paths():
+			try:
+				entries.append((os.path.getmtime(entry_path),self.get_entry_size(entry_path),entry_path))
+			except OSError:
+				pass
+
+		entries.sort()
+
+		self.size=sum(entry[1] for entry in entries)
+
+		target_size=self.max_bytes*0.9
+
+		for modification_time,entry_size,entry_path in entries:
+
+			if self.size<=target_size:
+				break
+
+			shutil.rmtree(entry_path,ignore_errors=True)
+
+			self.size-=entry_size
+			self.evictions+=1
+
+	def remove(self,key):
+		shutil.rmtree(self.get_entry_path(key),ignore_errors=True)
+		self.size=None
+
+	def clear(self):
+		for entry_path in self.get_entry_paths():
+			shutil.rmtree(entry_path,ignore_errors=True)
+
+		self.size=None
+
+	def get_stats_string(self):
+		return "Mesh cache: %d hits %d misses %d stored %d evicted %.1f MB in %s"%(
+			self.hits,
+			self.misses,
+			self.stores,
+			self.evictions,
+			self.get_size()/(1024*1024),
+			self.directory)
+
+
+# one mesh_cache per directory so statistics are kept for the session
+mesh_caches={}
+
+def get_mesh_cache(directory=None):
+
+	if directory==None:
+		directory=get_default_directory()
+
+	if directory not in mesh_caches:
+		mesh_caches[directory]=mesh_cache(directory)
+
+	return mesh_caches[directory]
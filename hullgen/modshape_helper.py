@@ -50,6 +50,16 @@ class modshape:
 		self.inert_objects=[]
 		self.symmetrical=symmetrical
 
+	def get_definition_hash(self):
+		return bpy_helper.get_definition_hash([self.name,
+			list(self.location),
+			list(self.rotation),
+			list(self.size),
+			self.mod_mode,
+			self.mod_shape,
+			list(self.deform),
+			self.symmetrical])
+
 	def make_window(self,the_hull):
 
 		new_window=window_helper.window()
@@ -0,0 +1,249 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Build chine stringers in background blender processes.
+#
+# Each chine side and longitudal definition is an independent job until the boolean
+# stage. Jobs are written to a json file and split over "blender -b" workers which
+# build the chine curves and stringers in their own session. The cut slicer planes are
+# stored in the mesh cache (mesh_cache) which is the payload returned to the main
+# session - when hull_maker builds the chines afterwards every slicer plane is a
+# memory mapped cache hit instead of a boolean.
+
+import bpy
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+
+def get_hull_job(the_hull):
+	return {
+		"hull_length": the_hull.hull_length,
+		"hull_width": the_hull.hull_width,
+		"hull_height": the_hull.hull_height,
+		"curve_resolution": the_hull.curve_resolution,
+		"structural_thickness": the_hull.structural_thickness,
+		"slicer_overcut_ratio": the_hull.slicer_overcut_ratio,
+		"slot_gap": the_hull.slot_gap,
+		"target_screw_size": the_hull.target_screw_size,
+		"hull_output_scale": the_hull.hull_output_scale,
+		"mesh_cache_directory": the_hull.get_mesh_cache().directory
+	}
+
+def get_chine_job(chine):
+	longitudals=[]
+
+	for longitudal in chine.longitudal_definitions:
+		longitudals.append({
+			"z_offset": longitudal.z_offset,
+			"width": longitudal.width,
+			"thickness": longitudal.thickness,
+			"slicer_ratio": longitudal.slicer_ratio,
+			"bend_radius": longitudal.bend_radius,
+			"curve_angle": longitudal.curve_angle,
+			"limit_x_min": longitudal.limit_x_min,
+			"limit_x_max": longitudal.limit_x_max
+		})
+
+	# attributes that are not constructor arguments are set after construction so
+	# the worker chine has the same definition hash
+	return {
+		"name": chine.name,
+		"length": chine.curve_length,
+		"width": chine.curve_width,
+		"rotation": list(chine.rotation),
+		"offset": list(chine.offset),
+		"asymmetry": list(chine.asymmetry),
+		"symmetrical": chine.symmetrical,
+		"curve_height": chine.curve_height,
+		"extrude_width": chine.extrude_width,
+		"twist": chine.twist,
+		"longitudal_screw_positions": list(chine.longitudal_screw_positions),
+		"longitudal_thickness": chine.longitudal_thickness,
+		"skin_pokethrough": chine.skin_pokethrough,
+		"direct_mesh": chine.direct_mesh,
+		"longitudals": longitudals
+	}
+
+# one job per chine side and longitudal definition
+def get_jobs(the_hull):
+	jobs=[]
+
+	for chine_index,chine in enumerate(the_hull.chine_list):
+
+		sides=[False]
+
+		if chine.symmetrical:
+			sides.append(True)
+
+		for inverted in sides:
+			for longitudal_index in range(len(chine.longitudal_definitions)):
+				jobs.append([chine_index,inverted,longitudal_index])
+
+	return jobs
+
+# the addon package (bpyhullgen) and the directory it is in
+def get_package():
+	package_name=__package__.split(".")[0]
+	package_directory=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+	return package_name,package_directory
+
+# worker output goes to log_file - a pipe nobody reads would block the worker once it is full
+def start_worker(job_file_name,log_file):
+	package_name,package_directory=get_package()
+
+	worker_expression="import sys; sys.path.insert(0,%r); from %s.hullgen import parallel_helper; parallel_helper.run_worker(%r)"%(
+		package_directory,
+		package_name,
+		job_file_name)
+
+	return subprocess.Popen([bpy.app.binary_path,"-b","--factory-startup","--python-expr",worker_expression],
+		stdout=log_file,
+		stderr=subprocess.STDOUT)
+
+# Build the stringers of the_hull in processes workers - returns number of jobs done
+def prebuild_chines(the_hull,processes):
+
+	if bpy.app.binary_path=="":
+		print("Parallel chines: no blender binary - building in this session")
+		return 0
+
+	jobs=get_jobs(the_hull)
+
+	if len(jobs)==0:
+		return 0
+
+	processes=min(processes,len(jobs))
+
+	start_time=time.time()
+
+	hull_job=get_hull_job(the_hull)
+	chine_jobs=[get_chine_job(chine) for chine in the_hull.chine_list]
+
+	job_directory=tempfile.mkdtemp(prefix="hullgen_jobs_")
+
+	workers=[]
+
+	for worker_index in range(processes):
+
+		job_file_name=os.path.join(job_directory,"worker_%02d.json"%worker_index)
+		log_file_name=os.path.join(job_directory,"worker_%02d.log"%worker_index)
+
+		with open(job_file_name,"w") as job_file:
+			json.dump({ "hull": hull_job,
+				"chines": chine_jobs,
+				"jobs": jobs[worker_index::processes]},job_file)
+
+		# the worker keeps its own handle - ours is closed once it has started
+		with open(log_file_name,"wb") as log_file:
+			workers.append([start_worker(job_file_name,log_file),log_file_name])
+
+	failed=0
+
+	for worker,log_file_name in workers:
+		worker.wait()
+
+		if worker.returncode!=0:
+			failed+=1
+
+			with open(log_file_name,"rb") as log_file:
+				print(log_file.read().decode(errors="replace"))
+
+	for file_name in os.listdir(job_directory):
+		os.remove(os.path.join(job_directory,file_name))
+
+	os.rmdir(job_directory)
+
+	# workers added entries the size doesn't know about
+	the_hull.get_mesh_cache().size=None
+
+	print("Parallel chines: %d jobs on %d workers (%d failed) %.1fs"%(
+		len(jobs),
+		processes,
+		failed,
+		time.time()-start_time))
+
+	return len(jobs)
+
+# Runs in the background blender process started by start_worker
+def run_worker(job_file_name):
+
+	from ..hullgen import hull_maker
+	from ..hullgen import chine_helper
+
+	with open(job_file_name) as job_file:
+		job_data=json.load(job_file)
+
+	hull_job=job_data["hull"]
+
+	the_hull=hull_maker.hull_maker(length=hull_job["hull_length"],
+		width=hull_job["hull_width"],
+		height=hull_job["hull_height"])
+
+	the_hull.curve_resolution=hull_job["curve_resolution"]
+	the_hull.structural_thickness=hull_job["structural_thickness"]
+	the_hull.slicer_overcut_ratio=hull_job["slicer_overcut_ratio"]
+	the_hull.slot_gap=hull_job["slot_gap"]
+	the_hull.target_screw_size=hull_job["target_screw_size"]
+	the_hull.hull_output_scale=hull_job["hull_output_scale"]
+	the_hull.use_mesh_cache=True
+	the_hull.mesh_cache_directory=hull_job["mesh_cache_directory"]
+
+	for chine_index,inverted,longitudal_index in job_data["jobs"]:
+
+		chine_job=job_data["chines"][chine_index]
+
+		chine=chine_helper.chine_helper(the_hull,
+			name=chine_job["name"],
+			length=chine_job["length"],
+			width=chine_job["width"],
+			rotation=chine_job["rotation"],
+			offset=chine_job["offset"],
+			asymmetry=chine_job["asymmetry"],
+			symmetrical=chine_job["symmetrical"])
+
+		chine.curve_height=chine_job["curve_height"]
+		chine.extrude_width=chine_job["extrude_width"]
+		chine.twist=chine_job["twist"]
+		chine.longitudal_screw_positions=chine_job["longitudal_screw_positions"]
+		chine.longitudal_thickness=chine_job["longitudal_thickness"]
+		chine.skin_pokethrough=chine_job["skin_pokethrough"]
+		chine.direct_mesh=chine_job["direct_mesh"]
+
+		for longitudal_job in chine_job["longitudals"]:
+			longitudal=chine_helper.longitudal_definition(z_offset=longitudal_job["z_offset"],
+				width=longitudal_job["width"],
+				thickness=longitudal_job["thickness"],
+				slicer_ratio=longitudal_job["slicer_ratio"])
+
+			longitudal.set_curve(longitudal_job["bend_radius"],longitudal_job["curve_angle"])
+			longitudal.set_limit_x_length(longitudal_job["limit_x_min"],longitudal_job["limit_x_max"])
+
+			chine.add_longitudal_definition(longitudal)
+
+		chine.longitudal_indices=[longitudal_index]
+
+		chine.make_single_chine(chine.twist,inverted)
+
+	print(the_hull.get_mesh_cache().get_stats_string())
+
+	sys.stdout.flush()
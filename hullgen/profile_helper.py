@@ -0,0 +1,297 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Hierarchical profiler for hull generation.
+#
+#	with profile_helper.stage("bulkheads"):
+#		with profile_helper.stage("bulkhead 1.00") as node:
+#			...
+#			node.add_object(bulkhead_object)
+#
+# Each stage records wall time, bpy.ops calls, depsgraph updates and the vertex /
+# face / boolean modifier counts of objects added to it. Stages do nothing unless
+# the_profiler was started - entry points start and stop it with
+#
+#	with profile_helper.profiled("hull",enabled=profile,profile_directory=directory):
+#		... Results export as JSON or as a Chrome trace-event file
+# (chrome://tracing or https://ui.perfetto.dev).
+
+import os
+import time
+import json
+from contextlib import contextmanager
+
+try:
+	import bpy
+except ImportError:
+	bpy=None
+
+
+class profile_node:
+
+	def __init__(self,name,start_time):
+		self.name=name
+		self.start_time=start_time
+		self.duration=0
+		self.children=[]
+		self.counters={}
+
+	def count(self,counter_name,amount=1):
+		self.counters[counter_name]=self.counters.get(counter_name,0)+amount
+
+	def add_object(self,obj):
+		if obj==None or obj.type!="MESH":
+			return
+
+		self.count("objects")
+		self.count("vertices",len(obj.data.vertices))
+		self.count("faces",len(obj.data.polygons))
+
+		booleans=0
+
+		for modifier in obj.modifiers:
+			if modifier.type=='BOOLEAN':
+				booleans+=1
+
+		self.count("booleans",booleans)
+
+	# counters of this node and all children
+	def get_totals(self):
+		totals=dict(self.counters)
+
+		for child in self.children:
+			for counter_name,value in child.get_totals().items():
+				totals[counter_name]=totals.get(counter_name,0)+value
+
+		return totals
+
+	def to_dict(self):
+		return {
+			"name": self.name,
+			"duration": self.duration,
+			"counters": self.counters,
+			"totals": self.get_totals(),
+			"children": [child.to_dict() for child in self.children]
+		}
+
+
+class profiler:
+
+	enabled=False
+
+	root=None
+	stack=None
+
+	operator_class=None
+	operator_call=None
+
+	def __init__(self):
+		self.stack=[]
+
+	def start(self,name="hull"):
+		self.root=profile_node(name,time.time())
+		self.stack=[self.root]
+		self.enabled=True
+
+		if bpy!=None:
+			self.install_hooks()
+
+	def stop(self):
+		if self.root==None:
+			return
+
+		self.root.duration=time.time()-self.root.start_time
+		self.stack=[]
+		self.enabled=False
+
+		if bpy!=None:
+			self.remove_hooks()
+
+	def get_current(self):
+		return self.stack[-1]
+
+	def count(self,counter_name,amount=1):
+		if self.enabled:
+			self.get_current().count(counter_name,amount)
+
+	def push(self,name):
+		node=profile_node(name,time.time())
+		self.get_current().children.append(node)
+		self.stack.append(node)
+
+		return node
+
+	def pop(self,node):
+		node.duration=time.time()-node.start_time
+
+		# a stage that raised may leave children on the stack
+		while len(self.stack)>1:
+			if self.stack.pop()==node:
+				break
+
+	# bpy.ops calls are counted by wrapping the call of the operator proxy class
+	def install_hooks(self):
+
+		# already wrapped - wrapping again would count every operator twice
+		if self.operator_class!=None:
+			return
+
+		the_profiler=self
+
+		self.operator_class=type(bpy.ops.object.select_all)
+		self.operator_call=self.operator_class.__call__
+
+		original_call=self.operator_call
+
+		def counted_call(operator,*args,**kwargs):
+			the_profiler.count("operators")
+			the_profiler.count("ops.%s"%operator.idname_py())
+
+			return original_call(operator,*args,**kwargs)
+
+		self.operator_class.__call__=counted_call
+
+		if self.depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+			bpy.app.handlers.depsgraph_update_post.append(self.depsgraph_update)
+
+	def remove_hooks(self):
+		if self.operator_class!=None:
+			self.operator_class.__call__=self.operator_call
+			self.operator_class=None
+
+		if self.depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+			bpy.app.handlers.depsgraph_update_post.remove(self.depsgraph_update)
+
+	def depsgraph_update(self,scene,depsgraph=None):
+		self.count("depsgraph_updates")
+
+	def to_dict(self):
+		return self.root.to_dict()
+
+	def save_json(self,file_name):
+		with open(file_name,"w") as json_file:
+			json.dump(self.to_dict(),json_file,indent=1)
+
+		print("Saved profile: %s"%file_name)
+
+	# complete ("X") events nested by time - microseconds since the profiler started
+	def get_trace_events(self,node,events):
+		events.append({
+			"name": node.name,
+			"ph": "X",
+			"ts": (node.start_time-self.root.start_time)*1000000,
+			"dur": node.duration*1000000,
+			"pid": os.getpid(),
+			"tid": 0,
+			"args": node.counters
+		})
+
+		for child in node.children:
+			self.get_trace_events(child,events)
+
+		return events
+
+	def save_chrome_trace(self,file_name):
+		with open(file_name,"w") as trace_file:
+			json.dump({ "traceEvents": self.get_trace_events(self.root,[]),
+				"displayTimeUnit": "ms" },trace_file)
+
+		print("Saved trace: %s"%file_name)
+
+	# slowest_count slowest leaf stages - what dominates generation time
+	def get_summary_string(self,slowest_count=10):
+		leaves=[]
+
+		def add_leaves(node):
+			if len(node.children)==0:
+				leaves.append(node)
+
+			for child in node.children:
+				add_leaves(child)
+
+		add_leaves(self.root)
+
+		leaves.sort(key=lambda node: node.duration,reverse=True)
+
+		totals=self.root.get_totals()
+
+		summary="Profile %s: %.3fs %d operators %d depsgraph updates"%(
+			self.root.name,
+			self.root.duration,
+			totals.get("operators",0),
+			totals.get("depsgraph_updates",0))
+
+		for node in leaves[:slowest_count]:
+			summary+="\n  %8.3fs %s"%(node.duration,node.name)
+
+		return summary
+
+
+the_profiler=profiler()
+
+
+class disabled_node:
+	def count(self,counter_name,amount=1):
+		pass
+
+	def add_object(self,obj):
+		pass
+
+the_disabled_node=disabled_node()
+
+
+# prints the summary of the_profiler - saves <directory>/<name>_profile.json and
+# <name>_trace.json (chrome://tracing) unless directory is None
+def save_profile(directory,name):
+	print(the_profiler.get_summary_string())
+
+	if directory!=None:
+		the_profiler.save_json(os.path.join(directory,"%s_profile.json"%name))
+		the_profiler.save_chrome_trace(os.path.join(directory,"%s_trace.json"%name))
+
+# Profiles the with block when enabled - the_profiler is stopped (and the profile
+# saved) even if the block raises. Inside an already running profile it is a stage.
+@contextmanager
+def profiled(name,enabled=True,profile_directory=None):
+
+	if the_profiler.enabled or enabled==False:
+		with stage(name) as node:
+			yield node
+		return
+
+	the_profiler.start(name)
+
+	try:
+		yield the_profiler.root
+	finally:
+		the_profiler.stop()
+		save_profile(profile_directory,name)
+
+@contextmanager
+def stage(name):
+
+	if the_profiler.enabled==False:
+		yield the_disabled_node
+		return
+
+	node=the_profiler.push(name)
+
+	try:
+		yield node
+	finally:
+		the_profiler.pop(node)
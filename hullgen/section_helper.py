@@ -0,0 +1,160 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Cross sections of the hull at stations (X) - no bpy.
+#
+# The evaluated hull mesh is read once (geometry_helper.read_evaluated_triangles) and
+# every bulkhead outline is a plane cut of those triangles. Each triangle crossing the
+# plane adds one segment between two of its edges. Segments are chained into closed
+# loops through the mesh edges they share so no coordinates are compared.
+#
+# Vertices exactly on the plane count as in front of it so every crossing triangle has
+# exactly two crossing edges.
+
+import numpy as np
+
+# consecutive loop points closer than this are merged
+point_epsilon=1e-9
+
+
+class hull_sections:
+
+	# (N,3) float array of vertex coordinates (world space)
+	vertices=None
+
+	# (M,3) int array of triangle vertex indices
+	triangles=None
+
+	def __init__(self,vertices,triangles):
+		self.vertices=np.asarray(vertices,dtype=np.float64).reshape(-1,3)
+		self.triangles=np.asarray(triangles,dtype=np.int64).reshape(-1,3)
+
+		x=self.vertices[:,0]
+
+		# only triangles spanning a station can cross it
+		self.triangle_min_x=x[self.triangles].min(axis=1)
+		self.triangle_max_x=x[self.triangles].max(axis=1)
+
+	# Returns list of closed loops of the section at station - each a (K,2) array of
+	# (y,z) points. Empty list if the hull doesn't reach station and None if the
+	# section doesn't close (hull mesh isn't manifold)
+	def get_section(self,station):
+
+		candidates=np.flatnonzero((self.triangle_min_x<=station)&(self.triangle_max_x>=station))
+
+		if len(candidates)==0:
+			return []
+
+		triangles=self.triangles[candidates]
+
+		in_front=self.vertices[:,0]>=station
+
+		triangle_in_front=in_front[triangles]
+		crossing=triangle_in_front.any(axis=1)&~triangle_in_front.all(axis=1)
+
+		triangles=triangles[crossing]
+
+		if len(triangles)==0:
+			return []
+
+		# edges of each triangle (T,3,2) and the two that cross the plane
+		edges=np.stack([triangles,np.roll(triangles,-1,axis=1)],axis=2)
+		edge_crossing=in_front[edges[:,:,0]]!=in_front[edges[:,:,1]]
+
+		crossing_edges=edges[edge_crossing].reshape(-1,2,2)
+
+		# mesh edge key of each segment end - same key from both triangles of an edge
+		low=crossing_edges.min(axis=2)
+		high=crossing_edges.max(axis=2)
+		keys=low*len(self.vertices)+high
+
+		# point where each crossing edge meets the plane
+		start=self.vertices[crossing_edges[:,:,0]]
+		end=self.vertices[crossing_edges[:,:,1]]
+
+		factor=(station-start[:,:,0])/(end[:,:,0]-start[:,:,0])
+		points=start[:,:,1:]+factor[:,:,None]*(end[:,:,1:]-start[:,:,1:])
+
+		return self.chain_segments(keys,points)
+
+	# keys (S,2) edge keys of the segment ends and points (S,2,2) their (y,z)
+	def chain_segments(self,keys,points):
+
+		keys=keys.tolist()
+
+		# edge key -> segments ending on it (two on a manifold mesh)
+		key_segments={}
+
+		for segment_index,(first_key,second_key) in enumerate(keys):
+			key_segments.setdefault(first_key,[]).append(segment_index)
+			key_segments.setdefault(second_key,[]).append(segment_index)
+
+		for segments in key_segments.values():
+			if len(segments)!=2:
+				print("Hull section not closed - edge shared by %d segments"%len(segments))
+				return None
+
+		key_points={}
+
+		for segment_index,segment_keys in enumerate(keys):
+			key_points[segment_keys[0]]=points[segment_index,0]
+			key_points[segment_keys[1]]=points[segment_index,1]
+
+		used=np.zeros(len(keys),dtype=bool)
+		loops=[]
+
+		for first_segment in range(len(keys)):
+
+			if used[first_segment]:
+				continue
+
+			loop_keys=[]
+
+			segment_index=first_segment
+			key=keys[first_segment][0]
+
+			# walk to the other end of each segment and on to the other segment of that edge
+			while not used[segment_index]:
+				used[segment_index]=True
+
+				if keys[segment_index][0]==key:
+					key=keys[segment_index][1]
+				else:
+					key=keys[segment_index][0]
+
+				loop_keys.append(key)
+
+				first,second=key_segments[key]
+
+				if first==segment_index:
+					segment_index=second
+				else:
+					segment_index=first
+
+			loop=np.array([key_points[loop_key] for loop_key in loop_keys])
+
+			# vertices on the plane give the same point from more than one edge
+			next_points=np.roll(loop,-1,axis=0)
+			distinct=np.linalg.norm(next_points-loop,axis=1)>point_epsilon
+
+			loop=loop[distinct]
+
+			if len(loop)>=3:
+				loops.append(loop)
+
+		return loops
@@ -19,6 +19,7 @@
 import bpy
 import math
 from math import radians
+from mathutils import Matrix
 
 from ..hullgen import geometry_helper
 from ..hullgen import material_helper
@@ -84,19 +85,26 @@ class window:
 
 		bolt_margin=diameter*0.4
 		
+		# all bolt holes of the window are one object built from one cylinder
+		bolt_transforms=[]
+
 		for a in range(0,360,30):
 
 			arc_point=calc_arc_point_ellipse(centerpoint,a,
 				[diameter*2*ellipse_ratio+bolt_margin,diameter*2+bolt_margin]
 				)
-			bolt_hole=make_circle("bolt",(arc_point[0],arc_point[1],centerpoint[2]),bolt_diameter,depth)
-			bolt_hole.parent=main_circle
+			bolt_transforms.append(Matrix.Translation((arc_point[0],arc_point[1],centerpoint[2])))
+
+		bolt_template=geometry_helper.get_cylinder_template(bolt_diameter,depth)
+
+		bolt_holes=geometry_helper.make_instanced_mesh_object("bolts_%s"%window_name,bolt_template,bolt_transforms)
+		bolt_holes.parent=main_circle
 
-			self.bolts.append(bolt_hole)
+		self.bolts.append(bolt_holes)
 
-			material_helper.assign_material(bolt_hole,material_bolts)
+		material_helper.assign_material(bolt_holes,material_bolts)
 
-			bpy_helper.move_object_to_collection(view_collection_windows,bolt_hole)
+		bpy_helper.move_object_to_collection(view_collection_windows,bolt_holes)
 
 
 		return main_circle
@@ -7,6 +7,7 @@ from bpyhullgen.hullgen import chine_helper
 from bpyhullgen.hullgen import keel_helper
 from bpyhullgen.hullgen import bulkhead
 from bpyhullgen.hullgen import modshape_helper
+from bpyhullgen.hullgen import xml_parse_helper
 
 
 def pretty_print_xml_given_root(root, output_xml):
@@ -53,27 +54,6 @@ def dump_hull(the_hull):
             chine.asymmetry[0],
             chine.asymmetry[1]))
 
-def parse_int_val(elem,name,default=0):
-    val=default
-    if name in elem.attrib:
-        if elem.attrib[name]!=None:
-            val = int(elem.attrib[name])
-    return val
-
-def parse_float_val(elem,name,default=0):
-    val=default
-    if name in elem.attrib:
-        if elem.attrib[name]!=None:
-            val = float(elem.attrib[name])
-    return val
-
-def parse_str_val(elem,name,default="?"):
-    val=default
-    if name in elem.attrib:
-        if elem.attrib[name]!=None:
-            val = elem.attrib[name]
-    return val    
-
 def read_hull(filename):
 
     tree = ET.parse(filename)
@@ -86,32 +66,32 @@ def read_hull(filename):
 
         #================================================================
         if elem.tag=="size":
-            newhull.hull_width=parse_float_val(elem,"width",0)
-            newhull.hull_length=parse_float_val(elem,"length",0)
-            newhull.hull_height=parse_float_val(elem,"height",0)
+            newhull.hull_width=xml_parse_helper.parse_float_val(elem,"width",0)
+            newhull.hull_length=xml_parse_helper.parse_float_val(elem,"length",0)
+            newhull.hull_height=xml_parse_helper.parse_float_val(elem,"height",0)
 
         #================================================================
         if elem.tag=="materials":
-            newhull.structural_thickness=parse_float_val(elem,"structural_thickness",0.1)
-            newhull.slicer_overcut_ratio=parse_float_val(elem,"slicer_overcut_ratio",1.1)
-            newhull.slot_gap=parse_float_val(elem,"slot_gap",0.1)
+            newhull.structural_thickness=xml_parse_helper.parse_float_val(elem,"structural_thickness",0.1)
+            newhull.slicer_overcut_ratio=xml_parse_helper.parse_float_val(elem,"slicer_overcut_ratio",1.1)
+            newhull.slot_gap=xml_parse_helper.parse_float_val(elem,"slot_gap",0.1)
 
         #================================================================
         if elem.tag=="generate":
-            newhull.make_bulkheads=parse_int_val(elem,"bulkheads",default=True)
-            newhull.make_keels=parse_int_val(elem,"keels",default=True)
-            newhull.make_longitudals=parse_int_val(elem,"longitudals",default=True)
-            newhull.hide_hull=parse_int_val(elem,"hide_hull",default=False)
+            newhull.make_bulkheads=xml_parse_helper.parse_int_val(elem,"bulkheads",default=True)
+            newhull.make_keels=xml_parse_helper.parse_int_val(elem,"keels",default=True)
+            newhull.make_longitudals=xml_parse_helper.parse_int_val(elem,"longitudals",default=True)
+            newhull.hide_hull=xml_parse_helper.parse_int_val(elem,"hide_hull",default=False)
 
 
         #================================================================
         if elem.tag=="bulkheads":
 
             for bulkhead_elem in elem:
-                floor_height=parse_float_val(bulkhead_elem,"floor_height",0)
-                watertight=parse_int_val(bulkhead_elem,"watertight",default=True)
-                station=parse_float_val(bulkhead_elem,"station",0)
-                thickness=parse_float_val(bulkhead_elem,"thickness",0)
+                floor_height=xml_parse_helper.parse_float_val(bulkhead_elem,"floor_height",0)
+                watertight=xml_parse_helper.parse_int_val(bulkhead_elem,"watertight",default=True)
+                station=xml_parse_helper.parse_float_val(bulkhead_elem,"station",0)
+                thickness=xml_parse_helper.parse_float_val(bulkhead_elem,"thickness",0)
 
                 bulkhead_definition=bulkhead.bulkhead_definition(
                     station=station,
@@ -126,11 +106,11 @@ def read_hull(filename):
 
             for modshape_elem in elem:
 
-                name=parse_str_val(modshape_elem,"name",0)
-                mod_type=parse_str_val(modshape_elem,"mod_type","add")
-                mod_mode=parse_str_val(modshape_elem,"mod_mode","cube")
-                mod_shape=parse_str_val(modshape_elem,"mod_shape","trapezoid")
-                symmetrical=parse_int_val(modshape_elem,"symmetrical",default=True)
+                name=xml_parse_helper.parse_str_val(modshape_elem,"name",0)
+                mod_type=xml_parse_helper.parse_str_val(modshape_elem,"mod_type","add")
+                mod_mode=xml_parse_helper.parse_str_val(modshape_elem,"mod_mode","cube")
+                mod_shape=xml_parse_helper.parse_str_val(modshape_elem,"mod_shape","trapezoid")
+                symmetrical=xml_parse_helper.parse_int_val(modshape_elem,"symmetrical",default=True)
 
                 size=[0,0,0]
                 rotation=[0,0,0]
@@ -140,24 +120,24 @@ def read_hull(filename):
                 for subelem in modshape_elem:
 
                     if subelem.tag=="rotation":
-                        rotation[0]=parse_float_val(subelem,"x",0)
-                        rotation[1]=parse_float_val(subelem,"y",0)
-                        rotation[2]=parse_float_val(subelem,"z",0)
+                        rotation[0]=xml_parse_helper.parse_float_val(subelem,"x",0)
+                        rotation[1]=xml_parse_helper.parse_float_val(subelem,"y",0)
+                        rotation[2]=xml_parse_helper.parse_float_val(subelem,"z",0)
 
                     if subelem.tag=="location":
-                        location[0]=parse_float_val(subelem,"x",0)
-                        location[1]=parse_float_val(subelem,"y",0)
-                        location[2]=parse_float_val(subelem,"z",0)
+                        location[0]=xml_parse_helper.parse_float_val(subelem,"x",0)
+                        location[1]=xml_parse_helper.parse_float_val(subelem,"y",0)
+                        location[2]=xml_parse_helper.parse_float_val(subelem,"z",0)
 
                     if subelem.tag=="size":
-                        size[0]=parse_float_val(subelem,"x",0)
-                        size[1]=parse_float_val(subelem,"y",0)
-                        size[2]=parse_float_val(subelem,"z",0)
+                        size[0]=xml_parse_helper.parse_float_val(subelem,"x",0)
+                        size[1]=xml_parse_helper.parse_float_val(subelem,"y",0)
+                        size[2]=xml_parse_helper.parse_float_val(subelem,"z",0)
 
                     if subelem.tag=="deform":
-                        deform[0]=parse_float_val(subelem,"p1",0)
-                        deform[1]=parse_float_val(subelem,"p2",0)
-                        deform[2]=parse_float_val(subelem,"p3",0)
+                        deform[0]=xml_parse_helper.parse_float_val(subelem,"p1",0)
+                        deform[1]=xml_parse_helper.parse_float_val(subelem,"p2",0)
+                        deform[2]=xml_parse_helper.parse_float_val(subelem,"p3",0)
 
                 modshape=modshape_helper.modshape(
                     name=name,
@@ -176,10 +156,10 @@ def read_hull(filename):
 
             for keel_elem in elem:
 
-                station_start=parse_float_val(keel_elem,"station_start",0)
-                station_end=parse_float_val(keel_elem,"station_end",0)
-                lateral_offset=parse_float_val(keel_elem,"lateral_offset",0)
-                top_height=parse_float_val(keel_elem,"top_height",0)
+                station_start=xml_parse_helper.parse_float_val(keel_elem,"station_start",0)
+                station_end=xml_parse_helper.parse_float_val(keel_elem,"station_end",0)
+                lateral_offset=xml_parse_helper.parse_float_val(keel_elem,"lateral_offset",0)
+                top_height=xml_parse_helper.parse_float_val(keel_elem,"top_height",0)
 
                 keel = keel_helper.keel(newhull,lateral_offset,top_height,station_start,station_end)
 
@@ -191,8 +171,8 @@ def read_hull(filename):
 
             for chine_elem in elem:
 
-                name=parse_str_val(chine_elem,"name")
-                symmetrical=parse_int_val(chine_elem,"symmetrical",default=True)
+                name=xml_parse_helper.parse_str_val(chine_elem,"name")
+                symmetrical=xml_parse_helper.parse_int_val(chine_elem,"symmetrical",default=True)
                 length=11
                 width=1.2
                 height=1.2
@@ -207,25 +187,25 @@ def read_hull(filename):
                 for subelem in chine_elem:
 
                     if subelem.tag=="curve":
-                        length=parse_float_val(subelem,"length",length)
-                        width=parse_float_val(subelem,"width",width)
-                        height=parse_float_val(subelem,"height",height)
-                        extrude_width=parse_float_val(subelem,"extrude_width",extrude_width)
+                        length=xml_parse_helper.parse_float_val(subelem,"length",length)
+                        width=xml_parse_helper.parse_float_val(subelem,"width",width)
+                        height=xml_parse_helper.parse_float_val(subelem,"height",height)
+                        extrude_width=xml_parse_helper.parse_float_val(subelem,"extrude_width",extrude_width)
 
                     if subelem.tag=="asymmetry":
-                        asymmetry[0]=parse_float_val(subelem,"a0",0)
-                        asymmetry[1]=parse_float_val(subelem,"a1",0)
+                        asymmetry[0]=xml_parse_helper.parse_float_val(subelem,"a0",0)
+                        asymmetry[1]=xml_parse_helper.parse_float_val(subelem,"a1",0)
 
 
                     if subelem.tag=="offset":
-                        offset[0]=parse_float_val(subelem,"x",0)
-                        offset[1]=parse_float_val(subelem,"y",0)
-                        offset[2]=parse_float_val(subelem,"z",0)
+                        offset[0]=xml_parse_helper.parse_float_val(subelem,"x",0)
+                        offset[1]=xml_parse_helper.parse_float_val(subelem,"y",0)
+                        offset[2]=xml_parse_helper.parse_float_val(subelem,"z",0)
 
                     if subelem.tag=="rotation":
-                        rotation[0]=parse_float_val(subelem,"x",0)
-                        rotation[1]=parse_float_val(subelem,"y",0)
-                        rotation[2]=parse_float_val(subelem,"z",0)
+                        rotation[0]=xml_parse_helper.parse_float_val(subelem,"x",0)
+                        rotation[1]=xml_parse_helper.parse_float_val(subelem,"y",0)
+                        rotation[2]=xml_parse_helper.parse_float_val(subelem,"z",0)
 
                     if subelem.tag=="longitudals":
 
@@ -235,10 +215,10 @@ def read_hull(filename):
                             x_min=-3
                             x_max=3
 
-                            z_offset=parse_float_val(longitudal_elem,"z_offset",z_offset)
-                            longitudal_width=parse_float_val(longitudal_elem,"width",width)
-                            x_min=parse_float_val(longitudal_elem,"x_min",x_min)
-                            x_max=parse_float_val(longitudal_elem,"x_max",x_max)
+                            z_offset=xml_parse_helper.parse_float_val(longitudal_elem,"z_offset",z_offset)
+                            longitudal_width=xml_parse_helper.parse_float_val(longitudal_elem,"width",width)
+                            x_min=xml_parse_helper.parse_float_val(longitudal_elem,"x_min",x_min)
+                            x_max=xml_parse_helper.parse_float_val(longitudal_elem,"x_max",x_max)
 
                             longitudal_definition=chine_helper.longitudal_definition(
                                 width=longitudal_width,z_offset=z_offset
@@ -0,0 +1,41 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Attribute parsing shared by xml_helper and hull_kernel - no bpy so hull_kernel can
+# read hull XML files without blender.
+
+def parse_float_val(elem,name,default=0):
+	val=default
+	if name in elem.attrib:
+		if elem.attrib[name]!=None:
+			val = float(elem.attrib[name])
+	return val
+
+def parse_int_val(elem,name,default=0):
+	val=default
+	if name in elem.attrib:
+		if elem.attrib[name]!=None:
+			val = int(elem.attrib[name])
+	return val
+
+def parse_str_val(elem,name,default="?"):
+	val=default
+	if name in elem.attrib:
+		if elem.attrib[name]!=None:
+			val = elem.attrib[name]
+	return val
@@ -0,0 +1,309 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Local render farm for the tests/ scripts (./render_tests.sh -j [prefix])
+#
+#   python3 render_farm.py [prefix] [--jobs N] [--memory-per-job 4] [--force]
+#
+# Runs several "blender -b -P render_tests.py" at once. Frames of a test are split
+# into frame ranges (FRAME_START / FRAME_END) so one long test doesn't keep the
+# others waiting. The number of processes is based on cores and available memory
+# and the cores are shared between them (blender -t).
+#
+# A test is skipped when the hash of its script and the generator sources matches
+# the hash saved next to its output PNGs by the last complete render.
+
+import os
+import ast
+import sys
+import glob
+import json
+import time
+import math
+import hashlib
+import argparse
+import subprocess
+
+test_path="tests"
+output_path=os.path.join(test_path,"output")
+
+# everything a render depends on besides the test script itself
+input_patterns=["render_tests.py","hullgen/*.py"]
+
+
+def get_frame_numbers(target_file):
+    # frames are the first value of each framedata entry (render_helper.setup_keyframes)
+    tree=ast.parse(open(target_file).read())
+
+    for node in tree.body:
+        if isinstance(node,ast.Assign):
+            for target in node.targets:
+                if isinstance(target,ast.Name) and target.id=="framedata":
+                    return sorted(entry[0] for entry in ast.literal_eval(node.value))
+
+    return [1]
+
+def get_inputs_hash(target_file):
+    m=hashlib.md5()
+
+    input_files=[target_file]
+
+    for pattern in input_patterns:
+        input_files.extend(sorted(glob.glob(pattern)))
+
+    for input_file in input_files:
+        m.update(input_file.encode())
+
+        with open(input_file,"rb") as f:
+            m.update(f.read())
+
+    return m.hexdigest()
+
+def get_test_name(target_file):
+    return os.path.splitext(os.path.basename(target_file))[0]
+
+def get_hash_file(target_file):
+    return os.path.join(output_path,"%s.render_hash"%get_test_name(target_file))
+
+def get_output_pngs(target_file):
+    return glob.glob(os.path.join(output_path,"%s_*.png"%get_test_name(target_file)))
+
+def is_up_to_date(target_file,inputs_hash):
+    hash_file=get_hash_file(target_file)
+
+    if not os.path.exists(hash_file) or len(get_output_pngs(target_file))==0:
+        return False
+
+    with open(hash_file) as f:
+        return f.read().strip()==inputs_hash
+
+def get_available_memory_gb():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1])/(1024*1024)
+    except OSError:
+        pass
+
+    return None
+
+def get_job_count(memory_per_job):
+    cores=os.cpu_count() or 1
+
+    job_count=cores
+
+    available_memory=get_available_memory_gb()
+
+    if available_memory!=None:
+        job_count=min(job_count,int(available_memory/memory_per_job))
+
+    return max(1,job_count)
+
+# frame ranges of a test - enough of them to keep job_count processes busy
+def split_frames(frames,chunk_count):
+    chunk_count=max(1,min(chunk_count,len(frames)))
+    chunk_size=int(math.ceil(len(frames)/chunk_count))
+
+    ranges=[]
+
+    for index in range(0,len(frames),chunk_size):
+        chunk=frames[index:index+chunk_size]
+        ranges.append((chunk[0],chunk[-1]))
+
+    return ranges
+
+
+class render_job:
+
+    def __init__(self,target_file,frame_start,frame_end):
+        self.target_file=target_file
+        self.frame_start=frame_start
+        self.frame_end=frame_end
+        self.process=None
+        self.log_file=None
+        self.start_time=None
+        self.end_time=None
+        self.returncode=None
+
+    def get_frame_count(self):
+        return self.frame_end-self.frame_start+1
+
+    def start(self,blender,threads):
+        environment=dict(os.environ)
+        environment["TARGET_FILE"]=self.target_file
+        environment["FRAME_START"]=str(self.frame_start)
+        environment["FRAME_END"]=str(self.frame_end)
+
+        log_name=os.path.join(output_path,"%s_%04d-%04d.log"%(get_test_name(self.target_file),self.frame_start,self.frame_end))
+        self.log_file=open(log_name,"w")
+
+        self.start_time=time.time()
+
+        self.process=subprocess.Popen([blender,"-b","-t",str(threads),"-P","render_tests.py"],
+            env=environment,
+            stdout=self.log_file,
+            stderr=subprocess.STDOUT)
+
+    def poll(self):
+        if self.process.poll()==None:
+            return False
+
+        self.end_time=time.time()
+        self.returncode=self.process.returncode
+        self.log_file.close()
+
+        return True
+
+
+def run_farm(arguments):
+    os.makedirs(output_path,exist_ok=True)
+
+    target_files=sorted(glob.glob(os.path.join(test_path,arguments.prefix+"*.py")))
+
+    job_count=arguments.jobs
+
+    if job_count==None:
+        job_count=get_job_count(arguments.memory_per_job)
+
+    threads=max(1,(os.cpu_count() or 1)//job_count)
+
+    tests={}
+    skipped=[]
+
+    for target_file in target_files:
+        inputs_hash=get_inputs_hash(target_file)
+
+        if arguments.force==False and is_up_to_date(target_file,inputs_hash):
+            skipped.append(target_file)
+            continue
+
+        tests[target_file]={ "hash": inputs_hash, "frames": get_frame_numbers(target_file), "jobs": [] }
+
+    # every test gets a share of the processes - each job regenerates the hull
+    chunks_per_test=max(1,int(math.ceil(job_count/max(1,len(tests)))))
+
+    pending=[]
+
+    for target_file,test in tests.items():
+        for frame_start,frame_end in split_frames(test["frames"],chunks_per_test):
+            job=render_job(target_file,frame_start,frame_end)
+            test["jobs"].append(job)
+            pending.append(job)
+
+    # longest jobs first so the farm doesn't end waiting on one long job
+    pending.sort(key=lambda job: job.get_frame_count(),reverse=True)
+
+    print("Render farm: %d tests (%d skipped) %d jobs on %d processes x %d threads"%(
+        len(tests),
+        len(skipped),
+        len(pending),
+        job_count,
+        threads))
+
+    farm_start_time=time.time()
+
+    running=[]
+
+    while len(pending)>0 or len(running)>0:
+
+        while len(pending)>0 and len(running)<job_count:
+            job=pending.pop(0)
+            job.start(arguments.blender,threads)
+            running.append(job)
+
+            print("Start %s frames %d-%d"%(get_test_name(job.target_file),job.frame_start,job.frame_end))
+
+        for job in list(running):
+            if job.poll():
+                running.remove(job)
+
+                print("Done %s frames %d-%d %.1fs%s"%(
+                    get_test_name(job.target_file),
+                    job.frame_start,
+                    job.frame_end,
+                    job.end_time-job.start_time,
+                    "" if job.returncode==0 else " FAILED (%d)"%job.returncode))
+
+        time.sleep(0.5)
+
+    summary={}
+    failed=0
+
+    for target_file,test in tests.items():
+        jobs=test["jobs"]
+
+        succeeded=all(job.returncode==0 for job in jobs)
+
+        if succeeded:
+            with open(get_hash_file(target_file),"w") as f:
+                f.write(test["hash"])
+        else:
+            failed+=1
+
+        summary[get_test_name(target_file)]={
+            "frames": len(test["frames"]),
+            "jobs": len(jobs),
+            "wall_time": max(job.end_time for job in jobs)-min(job.start_time for job in jobs),
+            "process_time": sum(job.end_time-job.start_time for job in jobs),
+            "succeeded": succeeded
+        }
+
+    for target_file in skipped:
+        summary[get_test_name(target_file)]={ "skipped": True }
+
+    print("%-36s %6s %4s %10s %12s"%("test","frames","jobs","wall","process"))
+
+    for test_name,test_summary in sorted(summary.items()):
+        if test_summary.get("skipped"):
+            print("%-36s skipped (up to date)"%test_name)
+        else:
+            print("%-36s %6d %4d %9.1fs %11.1fs%s"%(
+                test_name,
+                test_summary["frames"],
+                test_summary["jobs"],
+                test_summary["wall_time"],
+                test_summary["process_time"],
+                "" if test_summary["succeeded"] else " FAILED"))
+
+    print("Render farm: %.1fs"%(time.time()-farm_start_time))
+
+    with open(os.path.join(output_path,"render_summary.json"),"w") as f:
+        json.dump(summary,f,indent=1)
+
+    if failed>0:
+        return 1
+
+    return 0
+
+def main():
+    # paths are relative to the repository like render_tests.sh
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    parser=argparse.ArgumentParser(description="Render the tests/ scripts in parallel")
+    parser.add_argument("prefix",nargs="?",default="",help="only scripts starting with prefix")
+    parser.add_argument("--jobs",type=int,default=None,help="blender processes (default from cores and memory)")
+    parser.add_argument("--memory-per-job",type=float,default=4,help="GB of memory to allow for each process")
+    parser.add_argument("--blender",default="blender")
+    parser.add_argument("--force",action="store_true",help="render tests that are up to date too")
+
+    return run_farm(parser.parse_args())
+
+
+if __name__=="__main__":
+    sys.exit(main())
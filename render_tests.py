@@ -55,6 +55,10 @@ backdrop=geometry_helper.make_backdrop()
 
 render_helper.create_auto_save_nodes(target_file)
 
-for f in range(bpy.context.scene.frame_start,bpy.context.scene.frame_end+1):
+# render_farm.py splits the frames of a test over several processes
+frame_start=int(os.environ.get("FRAME_START",bpy.context.scene.frame_start))
+frame_end=int(os.environ.get("FRAME_END",bpy.context.scene.frame_end))
+
+for f in range(frame_start,frame_end+1):
     bpy.context.scene.frame_set(f)
     do_render()
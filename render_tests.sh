@@ -18,6 +18,13 @@
 
 
 #!/bin/bash
+
+# ./render_tests.sh -j [prefix] renders in parallel with render_farm.py
+if [ "$1" == "-j" ]; then
+    python3 render_farm.py $2
+    exit $?
+fi
+
 path=tests
 searchpath=$path/$1*.py
 
@@ -0,0 +1,121 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Compares the face materials of geometry_helper.apply_all_bool_modifiers_evaluated
+# against apply_bool_modifiers_ops on a target with a direct cutter, a nested cutter
+# (a cutter of the cutter) and two linked duplicates sharing one mesh.
+#
+#   blender -b --factory-startup --python tests/boolean_materials.py
+#
+# Exits with status 1 if the slicer material areas differ.
+
+import sys
+import bpy
+
+from bpyhullgen.hullgen import geometry_helper
+
+def add_boolean(target,cutter):
+	modifier=target.modifiers.new(name="bool_%s"%cutter.name,type='BOOLEAN')
+	modifier.object=cutter
+	modifier.operation='DIFFERENCE'
+
+	return modifier
+
+# returns (target, cutter) - names end with suffix so both scenes can coexist
+def make_scene(suffix,offset):
+	target=geometry_helper.make_cube("target"+suffix,[offset,0,0],[2,2,2])
+
+	cutter=geometry_helper.make_cube("cutter"+suffix,[offset+1,0,0],[1,1,1])
+	nested=geometry_helper.make_cube("nested"+suffix,[offset+1,0.5,0],[0.6,0.6,0.6])
+
+	add_boolean(cutter,nested)
+
+	bolt=geometry_helper.make_cube("bolt"+suffix,[offset-1,0.6,0.6],[0.3,0.3,0.3])
+
+	bolt_copy=bpy.data.objects.new("bolt_copy"+suffix,bolt.data)
+	bolt_copy.location=[offset-1,-0.6,-0.6]
+	bpy.context.collection.objects.link(bolt_copy)
+
+	for the_cutter in [cutter,bolt,bolt_copy]:
+		add_boolean(target,the_cutter)
+
+	for obj in [cutter,nested,bolt,bolt_copy]:
+		obj.display_type='WIRE'
+
+	return (target,cutter)
+
+# total face area per material with the scene suffix removed from the name
+def get_material_areas(obj,suffix):
+	areas={}
+
+	for face in obj.data.polygons:
+		material_name=""
+
+		if face.material_index<len(obj.data.materials):
+			material=obj.data.materials[face.material_index]
+
+			if material!=None:
+				material_name=material.name.replace(suffix,"")
+
+		areas[material_name]=areas.get(material_name,0)+face.area
+
+	return areas
+
+
+bpy.ops.object.select_all(action='SELECT')
+bpy.ops.object.delete()
+
+# evaluated first - it applies the booleans of every object in the file
+evaluated_target,evaluated_cutter=make_scene("_evaluated",0)
+geometry_helper.apply_all_bool_modifiers_evaluated()
+
+ops_target,ops_cutter=make_scene("_ops",10)
+geometry_helper.apply_bool_modifiers_ops(ops_cutter)
+geometry_helper.apply_bool_modifiers_ops(ops_target)
+
+failed=False
+
+for evaluated_object,ops_object in [[evaluated_cutter,ops_cutter],[evaluated_target,ops_target]]:
+	evaluated_areas=get_material_areas(evaluated_object,"_evaluated")
+	ops_areas=get_material_areas(ops_object,"_ops")
+
+	for material_name in sorted(set(evaluated_areas)|set(ops_areas)):
+		evaluated_area=evaluated_areas.get(material_name,0)
+		ops_area=ops_areas.get(material_name,0)
+
+		matches=abs(evaluated_area-ops_area)<=1e-4*max(1,ops_area)
+
+		if not matches:
+			failed=True
+
+		print("%s %-24s evaluated: %.5f ops: %.5f %s"%(ops_object.name,
+			material_name,
+			evaluated_area,
+			ops_area,
+			"ok" if matches else "DIFFERENT"))
+
+for obj in [evaluated_target,evaluated_cutter]+[o for o in bpy.data.objects if o.name.startswith("bolt")]:
+	if obj.data.attributes.get(geometry_helper.cutter_attribute_name)!=None:
+		failed=True
+		print("%s still has the %s attribute"%(obj.name,geometry_helper.cutter_attribute_name))
+
+if failed:
+	print("FAILED")
+	sys.exit(1)
+
+print("OK")
@@ -0,0 +1,106 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Unit tests of the bpy free hullgen modules (hydro_helper, develop_helper, ...)
+#
+#   python3 -m unittest discover -s tests/unit_tests -p "test_*.py"
+#
+# The add-on __init__ registers blender classes so it can't be imported without bpy.
+# get_module imports hullgen modules of this checkout through a package that skips it -
+# the modules still use their normal relative imports (from ..hullgen import x).
+
+import os
+import sys
+import types
+import importlib
+
+import numpy as np
+
+repository_path=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+package_name="bpyhullgen_checkout"
+
+
+def get_module(module_name):
+
+	if package_name not in sys.modules:
+		package=types.ModuleType(package_name)
+		package.__path__=[repository_path]
+		sys.modules[package_name]=package
+
+	return importlib.import_module("%s.hullgen.%s"%(package_name,module_name))
+
+# closed triangle mesh of an axis aligned box centered on center - outward winding
+def make_box(size,center=(0,0,0)):
+
+	half=np.array(size,dtype=np.float64)/2
+
+	corners=np.array([[x,y,z] for x in (-1,1) for y in (-1,1) for z in (-1,1)],dtype=np.float64)
+
+	vertices=corners*half+np.array(center,dtype=np.float64)
+
+	# corner index = x*4 + y*2 + z (0 = negative side)
+	quads=[[0,1,3,2],[4,6,7,5],[0,4,5,1],[2,3,7,6],[0,2,6,4],[1,5,7,3]]
+
+	triangles=[]
+
+	for a,b,c,d in quads:
+		triangles.append([a,b,c])
+		triangles.append([a,c,d])
+
+	return vertices,np.array(triangles)
+
+# closed triangle mesh of a cylinder along X - radius, length, segments around
+def make_cylinder(radius,length,segments=32,rings=8,caps=True):
+
+	angles=np.arange(segments)*(2*np.pi/segments)
+	stations=np.linspace(-length/2,length/2,rings+1)
+
+	vertices=[]
+
+	for x in stations:
+		for angle in angles:
+			vertices.append([x,radius*np.cos(angle),radius*np.sin(angle)])
+
+	triangles=[]
+
+	for ring in range(rings):
+		for index in range(segments):
+			a=ring*segments+index
+			b=ring*segments+(index+1)%segments
+			c=a+segments
+			d=b+segments
+
+			triangles.append([a,b,d])
+			triangles.append([a,d,c])
+
+	if caps:
+		vertices.append([-length/2,0,0])
+		vertices.append([length/2,0,0])
+
+		start_center=len(vertices)-2
+		end_center=len(vertices)-1
+
+		end_ring=rings*segments
+
+		for index in range(segments):
+			next_index=(index+1)%segments
+			triangles.append([start_center,next_index,index])
+			triangles.append([end_center,end_ring+index,end_ring+next_index])
+
+	return np.array(vertices,dtype=np.float64),np.array(triangles)
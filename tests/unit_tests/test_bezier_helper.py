@@ -0,0 +1,124 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# bezier_helper sampling against the bezier definition
+
+import math
+import unittest
+
+import numpy as np
+
+from hullgen_modules import get_module
+
+bezier_helper=get_module("bezier_helper")
+
+resolution=8
+
+
+class test_bezier(unittest.TestCase):
+
+	def setUp(self):
+		self.coordinates=bezier_helper.define_curve_coordinates(12,1.2)
+
+	def test_passes_through_points(self):
+		points,tangents,tilts=bezier_helper.sample_bezier(self.coordinates,resolution)
+
+		self.assertEqual(len(points),2*resolution+1)
+
+		for index,(point,handle_left,handle_right) in enumerate(self.coordinates):
+			np.testing.assert_allclose(points[index*resolution],point,atol=1e-12)
+
+	def test_tangents(self):
+		points,tangents,tilts=bezier_helper.sample_bezier(self.coordinates,resolution)
+
+		point,handle_left,handle_right=[np.array(p) for p in self.coordinates[0]]
+
+		# derivative of a cubic bezier at t=0 is 3 (p1-p0)
+		np.testing.assert_allclose(tangents[0],3*(handle_right-point))
+
+		# central differences of the samples follow the tangent direction
+		direction=points[2]-points[0]
+
+		cosine=direction@tangents[1]/(np.linalg.norm(direction)*np.linalg.norm(tangents[1]))
+		self.assertAlmostEqual(cosine,1,places=3)
+
+	def test_symmetrical(self):
+		points,tangents,tilts=bezier_helper.sample_bezier(self.coordinates,resolution)
+
+		mirrored=points[::-1]*[-1,1,1]
+
+		np.testing.assert_allclose(points,mirrored,atol=1e-12)
+
+	def test_asymmetry(self):
+		coordinates=bezier_helper.define_curve_coordinates(12,1.2,asymmetry=[0.5,0])
+
+		self.assertAlmostEqual(coordinates[0][0][1],-0.6)
+		self.assertAlmostEqual(coordinates[2][0][1],0)
+
+	def test_tilts(self):
+		points,tangents,tilts=bezier_helper.sample_bezier(self.coordinates,resolution,[0,0.5,1])
+
+		np.testing.assert_allclose(tilts[[0,resolution,2*resolution]],[0,0.5,1])
+		self.assertAlmostEqual(tilts[resolution//2],0.25)
+
+	def test_extrude_directions(self):
+		tangents=np.array([[1.0,0,0],[0,2.0,0]])
+
+		directions=bezier_helper.get_extrude_directions(tangents,np.array([0,math.pi/2]))
+
+		np.testing.assert_allclose(directions[0],[0,0,1],atol=1e-12)
+
+		# tilted 90 degrees - perpendicular to the tangent and to Z
+		self.assertAlmostEqual(directions[1]@[0,1,0],0)
+		self.assertAlmostEqual(directions[1][2],0)
+		self.assertAlmostEqual(np.linalg.norm(directions[1]),1)
+
+	def test_curve_mesh(self):
+		verts,edges,faces=bezier_helper.sample_curve_mesh(self.coordinates,resolution)
+
+		point_count=2*resolution+1
+
+		self.assertEqual(len(verts),point_count)
+		self.assertEqual(len(edges),point_count-1)
+
+		verts,edges,faces=bezier_helper.sample_curve_mesh(self.coordinates,resolution,extrude=0.5)
+
+		self.assertEqual(len(verts),point_count*2)
+		self.assertEqual(len(faces),point_count-1)
+		np.testing.assert_allclose(verts[point_count:,2]-verts[:point_count,2],1)
+
+		# zero twist is the same ribbon as no twist
+		twisted,edges,faces=bezier_helper.sample_curve_mesh(self.coordinates,resolution,extrude=0.5,tilts=[0,0,0])
+
+		np.testing.assert_allclose(twisted,verts,atol=1e-12)
+
+	def test_path_points(self):
+		# straight bezier with handles at thirds - samples are evenly spaced
+		coordinates=[[(0,0,0),(-1,0,0),(1,0,0)],[(3,0,0),(2,0,0),(4,0,0)]]
+
+		points,edges,faces=bezier_helper.sample_curve_mesh(coordinates,resolution)
+
+		np.testing.assert_allclose(points[:,0],np.linspace(0,3,resolution+1),atol=1e-12)
+
+		path_points=bezier_helper.get_path_points(points,[0,0.25,1,1.5])
+
+		np.testing.assert_allclose(path_points[:,0],[0,0.75,3,3])
+
+
+if __name__=="__main__":
+	unittest.main()
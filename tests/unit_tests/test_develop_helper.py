@@ -0,0 +1,164 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# develop_helper against surfaces with known flat patterns
+
+import math
+import unittest
+
+import numpy as np
+
+from hullgen_modules import get_module, make_box
+
+develop_helper=get_module("develop_helper")
+
+
+# triangulated grid over u (0..1) and v (0..1) mapped through surface(u,v) -> (N,3)
+def make_patch(surface,u_count,v_count):
+	u,v=np.meshgrid(np.linspace(0,1,u_count),np.linspace(0,1,v_count),indexing="ij")
+
+	vertices=surface(u.ravel(),v.ravel())
+
+	index=np.arange(u_count*v_count).reshape(u_count,v_count)
+
+	a=index[:-1,:-1].ravel()
+	b=index[1:,:-1].ravel()
+	c=index[1:,1:].ravel()
+	d=index[:-1,1:].ravel()
+
+	triangles=np.concatenate([np.stack([a,b,c],axis=1),np.stack([a,c,d],axis=1)])
+
+	return vertices,triangles
+
+# quarter of a cylinder of radius 1 and length 3 - unrolls to a 3 x pi/2 rectangle
+def cylinder_surface(u,v):
+	angle=v*math.pi/2
+
+	return np.stack([u*3,np.cos(angle),np.sin(angle)],axis=1)
+
+# cap of a sphere of radius 1 up to 40 degrees from the pole
+def sphere_cap_surface(u,v):
+	polar=math.radians(40)*(u*2-1)
+	azimuth=math.radians(40)*(v*2-1)
+
+	return np.stack([np.sin(polar)*np.cos(azimuth),np.sin(azimuth),np.cos(polar)*np.cos(azimuth)],axis=1)
+
+
+class test_develop_plate(unittest.TestCase):
+
+	def test_cylinder_is_developable(self):
+		vertices,triangles=make_patch(cylinder_surface,16,12)
+
+		result=develop_helper.develop_plate(vertices,triangles)
+
+		self.assertEqual(result.parts,1)
+		self.assertEqual(result.closed_parts,0)
+		self.assertEqual(result.flipped_triangles,0)
+
+		self.assertLess(result.get_max_edge_distortion(),1e-4)
+		self.assertLess(result.get_max_area_distortion(),1e-4)
+		self.assertTrue(result.is_developable())
+
+		# the flat pattern is the rectangle - the chords of the arc add up to a bit less than pi/2
+		size=np.sort(np.ptp(result.uvs,axis=0))
+		chord=2*math.sin(math.pi/4/11)*11
+
+		np.testing.assert_allclose(size,[chord,3],rtol=1e-4)
+
+	def test_sphere_cap_not_developable(self):
+		vertices,triangles=make_patch(sphere_cap_surface,16,16)
+
+		result=develop_helper.develop_plate(vertices,triangles)
+
+		self.assertEqual(result.closed_parts,0)
+		self.assertGreater(result.get_max_edge_distortion(),develop_helper.developable_tolerance)
+		self.assertFalse(result.is_developable())
+
+	def test_parts_and_closed(self):
+		first,first_triangles=make_patch(cylinder_surface,6,6)
+		second,second_triangles=make_box((1,1,1),center=(5,0,0))
+
+		vertices=np.concatenate([first,second])
+		triangles=np.concatenate([first_triangles,second_triangles+len(first)])
+
+		result=develop_helper.develop_plate(vertices,triangles)
+
+		self.assertEqual(result.parts,2)
+		self.assertEqual(result.closed_parts,1)
+		self.assertFalse(result.is_developable())
+
+	def test_face_distortion(self):
+		vertices,triangles=make_patch(cylinder_surface,6,6)
+
+		triangle_faces=np.arange(len(triangles))%(len(triangles)//2)
+
+		result=develop_helper.develop_plate(vertices,triangles,triangle_faces)
+
+		self.assertEqual(len(result.face_edge_distortion),len(triangles)//2)
+		self.assertLess(result.face_edge_distortion.max(),1e-4)
+
+
+# NumPy conjugate gradient path (used when scipy isn't installed)
+class test_conjugate_gradients(unittest.TestCase):
+
+	def setUp(self):
+		self.scipy=develop_helper.scipy
+		self.max_cg_iterations=develop_helper.max_cg_iterations
+
+		develop_helper.scipy=None
+
+	def tearDown(self):
+		develop_helper.scipy=self.scipy
+		develop_helper.max_cg_iterations=self.max_cg_iterations
+
+	def test_least_squares(self):
+		random=np.random.default_rng(1)
+
+		matrix=random.normal(size=(30,8))
+
+		rows,columns=np.nonzero(np.ones_like(matrix))
+
+		system=develop_helper.sparse_least_squares(rows,columns,matrix.ravel(),30,8,
+			groups=np.arange(8)//2)
+
+		rhs=random.normal(size=30)
+
+		np.testing.assert_allclose(system.solve(rhs),np.linalg.lstsq(matrix,rhs,rcond=None)[0],atol=1e-8)
+		self.assertEqual(system.unconverged_solves,0)
+
+	def test_coarse_groups_developable(self):
+		vertices,triangles=make_patch(cylinder_surface,40,30)
+
+		result=develop_helper.develop_plate(vertices,triangles)
+
+		self.assertEqual(result.unconverged_solves,0)
+		self.assertTrue(result.is_developable())
+
+	def test_not_converged_reported(self):
+		develop_helper.max_cg_iterations=2
+
+		vertices,triangles=make_patch(sphere_cap_surface,16,16)
+
+		result=develop_helper.develop_plate(vertices,triangles)
+
+		self.assertGreater(result.unconverged_solves,0)
+		self.assertIn("not converged",result.get_summary())
+
+
+if __name__=="__main__":
+	unittest.main()
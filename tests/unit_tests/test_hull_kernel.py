@@ -0,0 +1,119 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# hull_kernel against closed form results - a hull without chines is the hull box
+
+import unittest
+
+import numpy as np
+
+from hullgen_modules import get_module
+
+hull_kernel=get_module("hull_kernel")
+
+length=6
+width=2
+height=1
+
+
+class test_box_hull(unittest.TestCase):
+
+	def setUp(self):
+		self.kernel=hull_kernel.kernel_hull(length,width,height)
+
+	def test_polygon_area_centroid(self):
+		square=np.array([[0,0],[2,0],[2,1],[0,1]],dtype=np.float64)
+
+		self.assertAlmostEqual(hull_kernel.polygon_area(square),2)
+		np.testing.assert_allclose(hull_kernel.polygon_centroid(square),[1,0.5])
+
+	def test_section_is_box(self):
+		section=self.kernel.get_section(0.5)
+
+		self.assertAlmostEqual(abs(hull_kernel.polygon_area(section)),width*height)
+		np.testing.assert_allclose(section.min(axis=0),[-width/2,-height/2])
+		np.testing.assert_allclose(section.max(axis=0),[width/2,height/2])
+
+		self.assertEqual(len(self.kernel.get_section(length)),0)
+
+	def test_volume(self):
+		volume,center=self.kernel.get_volume()
+
+		self.assertAlmostEqual(volume,length*width*height)
+		np.testing.assert_allclose(center,[0,0,0],atol=1e-12)
+
+	def test_bulkhead_part(self):
+		watertight=hull_kernel.kernel_bulkhead(1,True,False,0.1)
+
+		part=self.kernel.get_bulkhead_part(watertight)
+
+		self.assertEqual(len(part.voids),0)
+		self.assertAlmostEqual(part.get_volume(),width*height*0.1)
+
+		# open bulkhead keeps a 0.2 frame
+		open_bulkhead=hull_kernel.kernel_bulkhead(1,False,False,0.1)
+
+		part=self.kernel.get_bulkhead_part(open_bulkhead)
+
+		self.assertAlmostEqual(part.get_area(),width*height-(width-0.4)*(height-0.4))
+
+	def test_keel_part(self):
+		keel=hull_kernel.kernel_keel(0,0,-1,1,thickness=0.1)
+
+		part=self.kernel.get_keel_part(keel)
+
+		# bottom of the box up to top_height over the keel length
+		self.assertAlmostEqual(part.get_area(),2*height/2)
+
+
+# "mid" chine of tests/hull_test_36.py
+class test_chine_hull(unittest.TestCase):
+
+	def make_kernel(self,twist=None):
+		kernel=hull_kernel.kernel_hull(11,5,3)
+		kernel.add_chine(hull_kernel.kernel_chine("mid",12.1,1.4,
+			rotation=[40,0,0],
+			offset=[0,-0.2,0.45],
+			twist=twist))
+
+		return kernel
+
+	def test_chine_cuts_symmetrical(self):
+		volume,center=self.make_kernel().get_volume()
+
+		self.assertLess(volume,11*5*3*0.95)
+		self.assertAlmostEqual(center[1],0,places=9)
+
+		section=self.make_kernel().get_section(1)
+		self.assertAlmostEqual(section[:,0].min(),-section[:,0].max())
+
+	def test_zero_twist(self):
+		plain=self.make_kernel().get_section(1)
+		twisted=self.make_kernel([0,0,0]).get_section(1)
+
+		np.testing.assert_allclose(plain,twisted)
+
+	def test_twist_changes_section(self):
+		plain=self.make_kernel().get_section(1)
+		twisted=self.make_kernel([0,20,0]).get_section(1)
+
+		self.assertGreater(abs(abs(hull_kernel.polygon_area(plain))-abs(hull_kernel.polygon_area(twisted))),0.1)
+
+
+if __name__=="__main__":
+	unittest.main()
@@ -0,0 +1,162 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# hydro_helper against closed form results for a box hull (origin at the center of gravity)
+
+import math
+import unittest
+
+import numpy as np
+
+from hullgen_modules import get_module, make_box
+
+hydro_helper=get_module("hydro_helper")
+
+length=6
+beam=2
+height=1
+
+
+class test_box_hydrostatics(unittest.TestCase):
+
+	def setUp(self):
+		vertices,triangles=make_box((length,beam,height))
+		self.the_hull_mesh=hydro_helper.hull_mesh(vertices,triangles)
+
+	# hull origin height for draft - the box bottom is at -height/2
+	def get_z(self,draft):
+		return height/2-draft
+
+	def test_volume(self):
+		self.assertAlmostEqual(self.the_hull_mesh.get_volume(),length*beam*height)
+
+	def test_level_pose(self):
+		draft=0.4
+
+		state=hydro_helper.evaluate_pose(self.the_hull_mesh,self.get_z(draft),0,0)
+
+		self.assertAlmostEqual(state.displaced_volume,length*beam*draft)
+		self.assertAlmostEqual(state.displaced_weight,length*beam*draft*hydro_helper.water_density)
+
+		# center of buoyancy is half way down the draft (world space - waterplane at z=0)
+		np.testing.assert_allclose(state.center_of_buoyancy,[0,0,-draft/2],atol=1e-12)
+
+		self.assertAlmostEqual(state.waterplane_area,length*beam)
+		np.testing.assert_allclose(state.waterplane_centroid,[0,0],atol=1e-12)
+
+		# Ixx (around X - uses beam) and Iyy (around Y - uses length)
+		np.testing.assert_allclose(state.waterplane_inertia,
+			[length*beam**3/12,beam*length**3/12])
+
+	def test_metacentric_heights(self):
+		draft=0.4
+
+		state=hydro_helper.evaluate_pose(self.the_hull_mesh,self.get_z(draft),0,0)
+
+		# GM = KB + BM - KG
+		kb=draft/2
+		kg=height/2
+
+		gm_transverse,gm_longitudal=state.get_metacentric_heights()
+
+		self.assertAlmostEqual(gm_transverse,kb+beam**2/(12*draft)-kg)
+		self.assertAlmostEqual(gm_longitudal,kb+length**2/(12*draft)-kg)
+
+	def test_fully_submerged_and_clear(self):
+		submerged=hydro_helper.evaluate_pose(self.the_hull_mesh,-height,0,0)
+		self.assertAlmostEqual(submerged.displaced_volume,length*beam*height)
+
+		clear=hydro_helper.evaluate_pose(self.the_hull_mesh,height,0,0)
+		self.assertEqual(clear.displaced_volume,0)
+
+	def test_solve_draft(self):
+		draft=0.3
+		weight=length*beam*draft*hydro_helper.water_density
+
+		evaluator=hydro_helper.mesh_pose_evaluator(self.the_hull_mesh)
+
+		for solve in [hydro_helper.solve_draft,hydro_helper.solve_draft_secant]:
+			state,iterations=solve(evaluator,weight,0,0,tolerance=0.01)
+
+			self.assertAlmostEqual(state.z,self.get_z(draft),places=5)
+
+	def test_hydrostatic_curves(self):
+		drafts=np.linspace(0.1,0.9,9)
+
+		table=hydro_helper.hydrostatic_curves(self.the_hull_mesh,drafts)
+
+		np.testing.assert_allclose(table.displaced_volume[0],length*beam*drafts)
+		np.testing.assert_allclose(table.get_kb()[0],drafts/2,atol=1e-12)
+		np.testing.assert_allclose(table.get_lcb()[0],0,atol=1e-12)
+		np.testing.assert_allclose(table.waterplane_area[0],length*beam)
+		np.testing.assert_allclose(table.waterplane_inertia[0,:,0],length*beam**3/12)
+
+	# the draft sweep and the single pose evaluation must agree at any trim
+	def test_hydrostatic_curves_match_evaluate_pose(self):
+		trim=(math.radians(3),math.radians(10))
+
+		table=hydro_helper.hydrostatic_curves(self.the_hull_mesh,[0.2,0.5],trims=[trim])
+
+		for draft_index in range(2):
+			state=hydro_helper.evaluate_pose(self.the_hull_mesh,table.z[0,draft_index],trim[0],trim[1])
+
+			self.assertAlmostEqual(state.displaced_volume,table.displaced_volume[0,draft_index])
+			np.testing.assert_allclose(state.center_of_buoyancy,table.center_of_buoyancy[0,draft_index],atol=1e-9)
+			self.assertAlmostEqual(state.waterplane_area,table.waterplane_area[0,draft_index])
+
+	# wall sided formula GZ = sin(heel) * (GM + BM/2 tan^2(heel)) - exact until the deck
+	# edge goes under or the bilge comes out, and GM sin(heel) at small angles
+	def test_gz_wall_sided(self):
+		draft=0.5
+		weight=length*beam*draft*hydro_helper.water_density
+
+		curve=hydro_helper.solve_gz_curve(self.the_hull_mesh,weight,max_heel=10,resolution=1,processes=1)
+
+		bm=beam**2/(12*draft)
+		gm=draft/2+bm-height/2
+
+		heel=curve.heel_angles
+
+		expected=np.sin(heel)*(gm+bm/2*np.tan(heel)**2)
+
+		self.assertTrue(curve.converged.all())
+
+		# draft is solved to weight_solve_threshold/10 kg
+		np.testing.assert_allclose(curve.gz,expected,atol=1e-4)
+
+		small=heel<=math.radians(2)
+		np.testing.assert_allclose(curve.gz[small],gm*np.sin(heel[small]),atol=1e-4)
+
+	def test_equilibrium_solvers(self):
+		draft=0.4
+		weight=length*beam*draft*hydro_helper.water_density
+
+		for solver_name in hydro_helper.equilibrium_solvers:
+			solve=hydro_helper.get_equilibrium_solver(solver_name)
+
+			evaluator=hydro_helper.mesh_pose_evaluator(self.the_hull_mesh)
+
+			result=solve(evaluator,weight,roll=math.radians(5),z=0)
+
+			self.assertTrue(result.converged,solver_name)
+			self.assertAlmostEqual(result.state.roll,0,delta=math.radians(1))
+			self.assertAlmostEqual(result.state.displaced_weight,weight,delta=5)
+
+
+if __name__=="__main__":
+	unittest.main()
@@ -0,0 +1,128 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# mesh_cache round trip and eviction in a temporary directory
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hullgen_modules import get_module
+
+mesh_cache=get_module("mesh_cache")
+
+
+# arrays like mesh_cache.get_mesh_arrays of a single quad
+def make_arrays(offset=0):
+	return {
+		"vertices": np.array([[0,0,0],[1,0,0],[1,1,0],[0,1,0]],dtype=np.float32)+offset,
+		"edges": np.array([[0,1],[1,2],[2,3],[3,0]],dtype=np.int32),
+		"loops": np.array([0,1,2,3],dtype=np.int32),
+		"loop_starts": np.array([0],dtype=np.int32),
+		"loop_totals": np.array([4],dtype=np.int32),
+		"matrix": np.eye(4)
+	}
+
+
+class test_mesh_cache(unittest.TestCase):
+
+	def setUp(self):
+		self.directory=tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory,ignore_errors=True)
+
+	def test_key(self):
+		self.assertEqual(mesh_cache.get_key(["slicer",1.0]),mesh_cache.get_key(["slicer",1.0]))
+		self.assertNotEqual(mesh_cache.get_key(["slicer",1.0]),mesh_cache.get_key(["slicer",1.5]))
+
+	def test_round_trip(self):
+		cache=mesh_cache.mesh_cache(self.directory)
+
+		key=mesh_cache.get_key(["round_trip"])
+
+		self.assertEqual(cache.get(key),None)
+
+		arrays=make_arrays()
+		cache.put(key,arrays)
+
+		stored=cache.get(key)
+
+		for array_name in mesh_cache.array_names:
+			np.testing.assert_array_equal(stored[array_name],arrays[array_name])
+			self.assertEqual(stored[array_name].dtype,arrays[array_name].dtype)
+
+		self.assertEqual((cache.hits,cache.misses,cache.stores),(1,1,1))
+
+		# a new session sees the same entry and size
+		other=mesh_cache.mesh_cache(self.directory)
+
+		self.assertNotEqual(other.get(key),None)
+		self.assertEqual(other.get_size(),cache.get_size())
+
+		cache.remove(key)
+		self.assertEqual(cache.get(key),None)
+
+	def test_eviction(self):
+		cache=mesh_cache.mesh_cache(self.directory)
+
+		keys=[mesh_cache.get_key(["entry",index]) for index in range(4)]
+
+		for index,key in enumerate(keys):
+			cache.put(key,make_arrays(index))
+
+			# oldest first - entry 0 was modified 400 seconds ago
+			os.utime(cache.get_entry_path(key),(0,1000+index*100))
+
+		entry_size=cache.get_size()/len(keys)
+
+		# a hit makes entry 0 the newest
+		self.assertNotEqual(cache.get(keys[0]),None)
+
+		# storing the 5th entry goes past max_bytes - evicts down to 90% (3 entries)
+		cache.max_bytes=entry_size*3.5
+
+		cache.put(mesh_cache.get_key(["entry",4]),make_arrays(4))
+
+		self.assertEqual(cache.evictions,2)
+		self.assertLessEqual(cache.get_size(),cache.max_bytes*0.9)
+
+		# entries 1 and 2 are the oldest
+		for key in keys[1:3]:
+			self.assertEqual(cache.get(key),None)
+
+		for key in [keys[0],keys[3]]:
+			self.assertNotEqual(cache.get(key),None)
+
+	def test_clear(self):
+		cache=mesh_cache.mesh_cache(self.directory)
+
+		key=mesh_cache.get_key(["clear"])
+		cache.put(key,make_arrays())
+
+		cache.clear()
+
+		self.assertEqual(cache.get(key),None)
+		self.assertEqual(cache.get_size(),0)
+
+
+if __name__=="__main__":
+	unittest.main()
@@ -0,0 +1,101 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# section_helper plane cuts of closed meshes with known sections
+
+import math
+import unittest
+
+import numpy as np
+
+from hullgen_modules import get_module, make_box, make_cylinder
+
+section_helper=get_module("section_helper")
+hull_kernel=get_module("hull_kernel")
+
+
+def get_area(loop):
+	return abs(hull_kernel.polygon_area(loop))
+
+
+class test_sections(unittest.TestCase):
+
+	def test_box(self):
+		vertices,triangles=make_box((6,2,1),center=(0,0,0.5))
+
+		sections=section_helper.hull_sections(vertices,triangles)
+
+		loops=sections.get_section(1.3)
+
+		self.assertEqual(len(loops),1)
+		self.assertAlmostEqual(get_area(loops[0]),2)
+
+		np.testing.assert_allclose(loops[0].min(axis=0),[-1,0])
+		np.testing.assert_allclose(loops[0].max(axis=0),[1,1])
+
+	def test_outside(self):
+		vertices,triangles=make_box((6,2,1))
+
+		sections=section_helper.hull_sections(vertices,triangles)
+
+		self.assertEqual(sections.get_section(4),[])
+
+	# a station through a ring of vertices must still give one closed loop
+	def test_cylinder(self):
+		segments=32
+
+		vertices,triangles=make_cylinder(0.5,4,segments=segments,rings=4)
+
+		sections=section_helper.hull_sections(vertices,triangles)
+
+		polygon_area=segments/2*0.5**2*math.sin(2*math.pi/segments)
+
+		# between rings the diagonals add points on the sides of the polygon
+		for station in [0.3,0,1]:
+			loops=sections.get_section(station)
+
+			self.assertEqual(len(loops),1)
+			self.assertAlmostEqual(get_area(loops[0]),polygon_area)
+
+		self.assertEqual(len(sections.get_section(1)[0]),segments)
+
+	def test_two_loops(self):
+		first,first_triangles=make_box((2,1,1),center=(0,-1,0))
+		second,second_triangles=make_box((2,1,1),center=(0,1,0))
+
+		vertices=np.concatenate([first,second])
+		triangles=np.concatenate([first_triangles,second_triangles+len(first)])
+
+		loops=section_helper.hull_sections(vertices,triangles).get_section(0.2)
+
+		self.assertEqual(len(loops),2)
+
+		for loop in loops:
+			self.assertAlmostEqual(get_area(loop),1)
+
+	def test_open_mesh(self):
+		vertices,triangles=make_box((6,2,1))
+
+		# the -Y side has no triangles - the section can't close
+		sections=section_helper.hull_sections(vertices,triangles[[0,1,2,3,4,5,8,9,10,11]])
+
+		self.assertEqual(sections.get_section(0.5),None)
+
+
+if __name__=="__main__":
+	unittest.main()